@@ -0,0 +1,44 @@
+"""Proxy bids table
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 10:00:00
+
+Stores proxy (automatic) bid registrations, which used to live in each
+worker's memory and were lost on restart. The other tables are created by
+Base.metadata.create_all() in app/main.py, which also creates this one on a
+fresh database, so the upgrade skips an existing table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('proxy_bids'):
+        return
+    op.create_table(
+        'proxy_bids',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('floor_price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('step', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('auction_id', sa.Integer(), nullable=False),
+        sa.Column('bidder_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(['auction_id'], ['auctions.id']),
+        sa.ForeignKeyConstraint(['bidder_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('auction_id', 'bidder_id', name='uq_proxy_bids_auction_bidder'),
+    )
+    op.create_index('ix_proxy_bids_id', 'proxy_bids', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_proxy_bids_id', table_name='proxy_bids')
+    op.drop_table('proxy_bids')
@@ -1,9 +1,25 @@
 from flask import request, jsonify, session
 from flask_login import login_user, logout_user, login_required, current_user
-from app import app, db
+from app import app, db, response_cache
+from cache import not_modified, conditional
+import events
+from single_flight import single_flight, flights
 from models import User, Auction, Bid
+from bid_engine import bid_engine, BidRejected
+from auction_scheduler import auction_scheduler
+import search_index
+from location_index import location_index
+from pagination import clamp_per_page, after_cursor, keyset_page, encode_cursor, approximate_counter
+from pagination import encode_distance_cursor, decode_distance_cursor, encode_rank_cursor, after_rank_cursor
+import geo
+import fieldsets
+from map_clusters import map_tiles, parse_bbox
+from gazetteer import gazetteer
 from datetime import datetime
-from sqlalchemy import or_, desc
+from sqlalchemy import desc, func, distinct
+from sqlalchemy.orm import load_only
+import hashlib
+import json
 import logging
 
 # API Routes for Frontend Integration
@@ -110,76 +126,153 @@ def api_get_auctions():
         search = request.args.get('search', '')
         category = request.args.get('category', '')
         location = request.args.get('location', '')
-        page = int(request.args.get('page', 1))
-        per_page = int(request.args.get('per_page', 10))
-        
-        # Base query for active auctions
-        query = Auction.query.filter(
-            Auction.is_active == True,
-            Auction.end_time > datetime.utcnow()
+        near = request.args.get('near', '')
+        per_page = clamp_per_page(request.args.get('per_page'))
+        cursor = request.args.get('cursor')
+        include_total = request.args.get('include_total', '').lower() in ('1', 'true')
+        try:
+            # Sparse fieldset, e.g. fields=card; limits both the columns loaded and the JSON
+            fields = fieldsets.parse_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Anonymous browsing repeats the same pages; the key changes whenever an auction opens or closes
+        cache_key = response_cache.key(
+            'auctions', response_cache.listing_generation(),
+            search=search.lower(), category=category, location=location.lower(), near=near,
+            per_page=per_page, cursor=cursor, include_total=include_total, fields=','.join(fields)
         )
+        cached, etag = response_cache.get_tagged_response('auctions', cache_key)
+        if cached is not None:
+            return conditional(cached, etag)
+        
+        # Base query for active auctions (the scheduler clears is_active at end_time)
+        query = Auction.query.filter(Auction.is_active == True)
         
         # Apply filters
         if search:
-            query = query.filter(
-                or_(
-                    Auction.title.contains(search),
-                    Auction.description.contains(search)
-                )
-            )
+            query = search_index.apply_search(query, search)
         
         if category:
             query = query.filter(Auction.category == category)
         
         if location:
-            query = query.filter(Auction.location.contains(location))
+            # Alias-aware, typo-tolerant match on the indexed canonical location
+            query = location_index.apply_filter(query, location)
+        
+        if near:
+            try:
+                latitude, longitude = geo.parse_point(near)
+            except ValueError:
+                return jsonify({'error': 'near must be "lat,lng"'}), 400
+            return _nearby_auctions(query, latitude, longitude, fields, per_page, cursor, include_total, cache_key)
+        
+        filtered = query
+        
+        # Keyset pagination: best match first on (rank, id) when searching, else on (created_at, id), newest first
+        query, rank = search_index.ranked(query, search) if search else (query, None)
+        if rank is not None:
+            query = query.order_by(rank, Auction.id)
+        else:
+            query = query.order_by(desc(Auction.created_at), desc(Auction.id))
+        if cursor:
+            try:
+                if rank is not None:
+                    query = after_rank_cursor(query, rank, Auction.id, cursor)
+                else:
+                    query = after_cursor(query, Auction.created_at, Auction.id, cursor)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        
+        # Tag check first: an unchanged page answers 304 without loading or serializing its rows
+        etag = _listing_tag(query.with_entities(Auction.id, Auction.version).limit(per_page + 1).all())
+        unchanged = not_modified(etag)
+        if unchanged is not None:
+            return unchanged
+        
+        # Creators come in the same query when asked for
+        query = query.options(*fieldsets.load_options(fields))
+        if rank is not None:
+            rows, has_next = keyset_page(query.add_columns(rank), per_page)
+            auctions = [auction for auction, _ in rows]
+            next_cursor = encode_rank_cursor(rows[-1][1], rows[-1][0].id) if has_next else None
+        else:
+            auctions, has_next = keyset_page(query, per_page)
+            next_cursor = encode_cursor(auctions[-1].created_at, auctions[-1].id) if has_next else None
         
-        # Paginate results
-        auctions = query.order_by(desc(Auction.created_at)).paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        auction_list = [fieldsets.serialize(auction, fields) for auction in auctions]
         
-        auction_list = []
-        for auction in auctions.items:
-            auction_data = {
-                'id': auction.id,
-                'title': auction.title,
-                'description': auction.description,
-                'category': auction.category,
-                'location': auction.location,
-                'starting_bid': auction.starting_bid,
-                'current_bid': auction.current_bid,
-                'end_time': auction.end_time.isoformat(),
-                'is_active': auction.is_active,
-                'is_hot_deal': auction.is_hot_deal,
-                'created_at': auction.created_at.isoformat(),
-                'creator': {
-                    'username': auction.creator.username,
-                    'email': auction.creator.email
-                },
-                'creator_id': auction.creator_id,
-                'time_remaining': auction.time_remaining.total_seconds() if not auction.is_expired else 0,
-                'lowest_bid': auction.get_lowest_bid(),
-                'bids': []  # Will be populated if needed
-            }
-            auction_list.append(auction_data)
+        pagination = {
+            'per_page': per_page,
+            'has_next': has_next,
+            'next_cursor': next_cursor
+        }
         
-        return jsonify({
+        # The total is optional and may be up to a minute stale
+        if include_total:
+            pagination['total'] = approximate_counter.count((search, category, location), filtered)
+            pagination['total_is_approximate'] = True
+        
+        return conditional(response_cache.set_tagged_response(cache_key, {
             'auctions': auction_list,
-            'pagination': {
-                'page': auctions.page,
-                'pages': auctions.pages,
-                'per_page': auctions.per_page,
-                'total': auctions.total,
-                'has_next': auctions.has_next,
-                'has_prev': auctions.has_prev
-            }
-        }), 200
+            'pagination': pagination
+        }, etag, app.config['CACHE_LISTING_TTL']), etag)
         
     except Exception as e:
         logging.error(f"Get auctions error: {str(e)}")
         return jsonify({'error': 'Failed to fetch auctions'}), 500
 
+def _listing_tag(rows):
+    # A page is tagged by the listing generation and its rows' (id, version), not by its body,
+    # which changes with time_remaining every time it is serialized
+    digest = hashlib.sha1(repr([(row.id, row.version) for row in rows]).encode()).hexdigest()[:20]
+    return f'auctions-{response_cache.listing_generation()}-{digest}'
+
+def _nearby_auctions(query, latitude, longitude, fields, per_page, cursor, include_total, cache_key):
+    # Bounded geohash range scans pick the candidates, the exact distance check and ordering happen here
+    covering = geo.covering_ids(
+        Auction.id, Auction.geohash, Auction.radius_km, latitude, longitude, Auction.is_active == True
+    )
+    query = query.join(covering, Auction.id == covering.c.id)
+    options = fieldsets.load_options(fields, extra_columns=('latitude', 'longitude', 'radius_km', 'version'))
+    ranked = geo.within_radius(query.options(*options).all(), latitude, longitude)
+    total = len(ranked)
+    
+    if cursor:
+        try:
+            position = decode_distance_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+        ranked = [item for item in ranked if (item[0], item[1].id) > position]
+    
+    page = ranked[:per_page]
+    has_next = len(ranked) > per_page
+    
+    etag = _listing_tag([auction for distance, auction in ranked[:per_page + 1]])
+    unchanged = not_modified(etag)
+    if unchanged is not None:
+        return unchanged
+    
+    auction_list = []
+    for distance, auction in page:
+        auction_data = fieldsets.serialize(auction, fields)
+        auction_data['distance_km'] = round(distance, 2)
+        auction_list.append(auction_data)
+    
+    pagination = {
+        'per_page': per_page,
+        'has_next': has_next,
+        'next_cursor': encode_distance_cursor(page[-1][0], page[-1][1].id) if has_next else None
+    }
+    if include_total:
+        pagination['total'] = total
+        pagination['total_is_approximate'] = False
+    
+    return conditional(response_cache.set_tagged_response(cache_key, {
+        'auctions': auction_list,
+        'pagination': pagination
+    }, etag, app.config['CACHE_LISTING_TTL']), etag)
+
 @app.route('/api/auctions', methods=['POST'])
 @login_required
 def api_create_auction():
@@ -210,6 +303,22 @@ def api_create_auction():
         location_type = data.get('location_type', 'city')
         radius = radius_map.get(location_type, 50)
         
+        # Coordinates make the auction visible to "near me" searches and the map
+        latitude = data.get('latitude')
+        longitude = data.get('longitude')
+        if (latitude is None) != (longitude is None):
+            return jsonify({'error': 'latitude and longitude must be given together'}), 400
+        if latitude is not None:
+            try:
+                latitude, longitude = geo.parse_point(f'{latitude},{longitude}')
+            except ValueError:
+                return jsonify({'error': 'Invalid latitude/longitude'}), 400
+        else:
+            # Fall back to the offline gazetteer for the city/state/location given
+            point = gazetteer.locate(data.get('city'), data.get('state'), data['location'])
+            if point:
+                latitude, longitude = point
+        
         # Create auction
         auction = Auction(
             title=data['title'],
@@ -222,11 +331,17 @@ def api_create_auction():
             location_type=location_type,
             city=data.get('city', ''),
             state=data.get('state', ''),
+            latitude=latitude,
+            longitude=longitude,
             radius_km=radius
         )
         
         db.session.add(auction)
         db.session.commit()
+        auction_scheduler.schedule(auction.id, auction.end_time)
+        map_tiles.invalidate(auction.geohash)
+        response_cache.invalidate_listings()
+        events.auction_created(auction)
         
         return jsonify({
             'message': 'Auction created successfully',
@@ -238,7 +353,7 @@ def api_create_auction():
                 'location': auction.location,
                 'starting_bid': auction.starting_bid,
                 'end_time': auction.end_time.isoformat(),
-                'creator': auction.creator.username
+                'creator': current_user.username
             }
         }), 201
         
@@ -247,23 +362,103 @@ def api_create_auction():
         return jsonify({'error': 'Failed to create auction'}), 500
 
 
+@app.route('/api/auctions/map', methods=['GET'])
+def api_auction_map():
+    try:
+        try:
+            bbox = parse_bbox(request.args.get('bbox', ''))
+        except ValueError:
+            return jsonify({'error': 'bbox must be "west,south,east,north"'}), 400
+        
+        zoom = request.args.get('zoom', type=int)
+        if zoom is None or not 0 <= zoom <= 22:
+            return jsonify({'error': 'zoom must be between 0 and 22'}), 400
+        
+        # Clusters come from cached per-zoom geohash tiles
+        precision, clusters = map_tiles.clusters(bbox, zoom)
+        
+        return jsonify({
+            'zoom': zoom,
+            'precision': precision,
+            'clusters': clusters,
+            'total': sum(cluster['count'] for cluster in clusters)
+        }), 200
+        
+    except Exception as e:
+        logging.error(f"Auction map error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch auction map'}), 500
+
+@app.route('/api/auctions/status', methods=['POST'])
+def api_auction_statuses():
+    try:
+        data = request.get_json(silent=True)
+        ids = data.get('ids') if isinstance(data, dict) else None
+        # Only a JSON list of integers; a string or an object would otherwise iterate as ids
+        if not isinstance(ids, list) or not all(type(auction_id) is int for auction_id in ids):
+            return jsonify({'error': 'ids must be a list of auction ids'}), 400
+        
+        # Unique ids, in the order they were asked for
+        auction_ids = list(dict.fromkeys(ids))
+        max_ids = app.config['STATUS_BATCH_MAX_IDS']
+        if len(auction_ids) > max_ids:
+            return jsonify({'error': f'At most {max_ids} auctions per request'}), 400
+        
+        # The per-auction status entries, read in one round trip
+        keys = [response_cache.key('auction_status', auction_id) for auction_id in auction_ids]
+        statuses = {}
+        missing = []
+        for auction_id, body in zip(auction_ids, response_cache.get_many('auction_status', keys)):
+            if body is None:
+                missing.append(auction_id)
+            else:
+                statuses[auction_id] = json.loads(body)
+        
+        if missing:
+            # One primary-key IN query for every miss
+            auctions = Auction.query.options(load_only(
+                Auction.id, Auction.current_bid, Auction.starting_bid, Auction.end_time, Auction.is_active
+            )).filter(Auction.id.in_(missing)).all()
+            fresh = []
+            for auction in auctions:
+                statuses[auction.id] = auction.live_status()
+                fresh.append((response_cache.key('auction_status', auction.id), json.dumps(statuses[auction.id])))
+            response_cache.set_many(fresh, app.config['CACHE_STATUS_TTL'])
+        
+        return jsonify({
+            'statuses': {str(auction_id): statuses[auction_id] for auction_id in auction_ids if auction_id in statuses},
+            'not_found': [auction_id for auction_id in auction_ids if auction_id not in statuses]
+        }), 200
+        
+    except Exception as e:
+        logging.error(f"Auction statuses error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch auction statuses'}), 500
+
 @app.route('/api/auctions/<int:auction_id>', methods=['GET'])
+@single_flight
 def api_get_auction(auction_id):
     try:
+        # Version check first: an unchanged auction answers 304 without loading bids or serializing
+        version = db.session.query(Auction.version, Auction.updated_at, Auction.created_at).filter(
+            Auction.id == auction_id
+        ).first()
+        if version is None:
+            return jsonify({'error': 'Auction not found'}), 404
+        
+        etag = f'auction-{auction_id}-v{version.version}'
+        last_modified = version.updated_at or version.created_at
+        unchanged = not_modified(etag, last_modified)
+        if unchanged is not None:
+            return unchanged
+        
+        cache_key = response_cache.key('auction', auction_id, version.version)
+        cached = response_cache.get_response('auction', cache_key)
+        if cached is not None:
+            return conditional(cached, etag, last_modified)
+        
         auction = Auction.query.get_or_404(auction_id)
         
-        # Get bid history
-        bids = Bid.query.filter_by(auction_id=auction_id).order_by(desc(Bid.created_at)).all()
-        
-        bid_list = []
-        for bid in bids:
-            bid_data = {
-                'id': bid.id,
-                'amount': bid.amount,
-                'created_at': bid.created_at.isoformat(),
-                'bidder': 'Anonymous'  # Keep bidder anonymous for privacy
-            }
-            bid_list.append(bid_data)
+        # Summary plus the latest bids; older ones come from the bid history endpoint
+        bids, has_more = keyset_page(_bid_history_query(auction_id), app.config['DETAIL_RECENT_BIDS'])
         
         auction_data = {
             'id': auction.id,
@@ -284,62 +479,96 @@ def api_get_auction(auction_id):
             'creator_id': auction.creator_id,
             'time_remaining': auction.time_remaining.total_seconds() if not auction.is_expired else 0,
             'lowest_bid': auction.get_lowest_bid(),
-            'bids': bid_list
+            'bid_summary': _bid_summary(auction_id),
+            'bids': [_bid_row(bid) for bid in bids],
+            'bids_next_cursor': encode_cursor(bids[-1].created_at, bids[-1].id) if has_more else None
         }
         
-        return jsonify({'auction': auction_data}), 200
+        response = response_cache.set_response(cache_key, {'auction': auction_data}, app.config['CACHE_DETAIL_TTL'])
+        return conditional(response, etag, last_modified)
         
     except Exception as e:
         logging.error(f"Get auction error: {str(e)}")
         return jsonify({'error': 'Failed to fetch auction'}), 500
 
-@app.route('/api/auctions/<int:auction_id>/bid', methods=['POST'])
-@login_required
-def api_place_bid(auction_id):
+def _bid_row(bid):
+    return {
+        'id': bid.id,
+        'amount': bid.amount,
+        'created_at': bid.created_at.isoformat(),
+        'bidder': 'Anonymous'  # Keep bidder anonymous for privacy
+    }
+
+def _bid_history_query(auction_id):
+    # Newest first, served from ix_bid_auction_created
+    return Bid.query.filter_by(auction_id=auction_id).order_by(desc(Bid.created_at), desc(Bid.id))
+
+def _bid_summary(auction_id):
+    # One aggregate over the auction's bids instead of loading them
+    count, lowest, first_at, last_at, bidders = db.session.query(
+        func.count(Bid.id),
+        func.min(Bid.amount),
+        func.min(Bid.created_at),
+        func.max(Bid.created_at),
+        func.count(distinct(Bid.bidder_id))
+    ).filter(Bid.auction_id == auction_id).one()
+    return {
+        'count': count,
+        'lowest': lowest,
+        'first_bid_at': first_at.isoformat() if first_at else None,
+        'last_bid_at': last_at.isoformat() if last_at else None,
+        'distinct_bidders': bidders
+    }
+
+@app.route('/api/auctions/<int:auction_id>/bids', methods=['GET'])
+def api_get_auction_bids(auction_id):
     try:
-        auction = Auction.query.get_or_404(auction_id)
+        if db.session.query(Auction.id).filter(Auction.id == auction_id).first() is None:
+            return jsonify({'error': 'Auction not found'}), 404
+        
+        per_page = clamp_per_page(request.args.get('per_page'))
+        since_bid_id = request.args.get('since_bid_id', type=int)
+        if since_bid_id is not None:
+            # Delta mode for reconnecting clients: bids after the last one seen, oldest first
+            query = Bid.query.filter(Bid.auction_id == auction_id, Bid.id > since_bid_id).order_by(Bid.id)
+            bids, has_more = keyset_page(query, per_page)
+            return jsonify({
+                'bids': [_bid_row(bid) for bid in bids],
+                'last_bid_id': bids[-1].id if bids else since_bid_id,
+                'has_more': has_more
+            }), 200
         
-        # Check if auction is still active
-        if auction.is_expired or not auction.is_active:
-            return jsonify({'error': 'This auction has ended'}), 400
+        query = _bid_history_query(auction_id)
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                query = after_cursor(query, Bid.created_at, Bid.id, cursor)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
         
-        # Check if user is trying to bid on their own auction
-        if auction.creator_id == current_user.id:
-            return jsonify({'error': 'You cannot bid on your own auction'}), 400
+        bids, has_more = keyset_page(query, per_page)
+        return jsonify({
+            'bids': [_bid_row(bid) for bid in bids],
+            'next_cursor': encode_cursor(bids[-1].created_at, bids[-1].id) if has_more else None,
+            'has_more': has_more
+        }), 200
         
+    except Exception as e:
+        logging.error(f"Get auction bids error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch bids'}), 500
+
+@app.route('/api/auctions/<int:auction_id>/bid', methods=['POST'])
+@login_required
+def api_place_bid(auction_id):
+    try:
         data = request.get_json()
         bid_amount = float(data.get('amount', 0))
         
-        if bid_amount <= 0:
-            return jsonify({'error': 'Bid amount must be positive'}), 400
+        # Validation and the current-lowest check happen inside the per-auction engine
+        bid = bid_engine.place_bid(auction_id, current_user.id, bid_amount)
         
-        current_lowest = auction.get_lowest_bid()
-        
-        # Validate bid amount (must be lower than current bid in reverse auction)
-        if bid_amount >= current_lowest:
-            return jsonify({'error': f'Your bid must be lower than the current bid of ₹{current_lowest:.2f}'}), 400
-        
-        # Create new bid
-        bid = Bid(
-            amount=bid_amount,
-            auction_id=auction_id,
-            bidder_id=current_user.id
-        )
-        
-        # Update auction's current bid
-        auction.current_bid = bid_amount
-        
-        db.session.add(bid)
-        db.session.commit()
-        
-        # Emit socket event for real-time update
-        from app import socketio
-        socketio.emit('new_bid', {
-            'auction_id': auction_id,
-            'amount': bid_amount,
-            'bidder': 'Anonymous',
-            'timestamp': bid.created_at.strftime('%H:%M:%S')
-        }, room=f'auction_{auction_id}')
+        # Emit socket event for real-time update, through the message queue when one is configured
+        events.new_bid(auction_id, bid)
         
         return jsonify({
             'message': 'Bid placed successfully',
@@ -350,6 +579,8 @@ def api_place_bid(auction_id):
             }
         }), 201
         
+    except BidRejected as e:
+        return jsonify({'error': e.message}), e.status_code
     except Exception as e:
         logging.error(f"Place bid error: {str(e)}")
         return jsonify({'error': 'Failed to place bid'}), 500
@@ -361,8 +592,13 @@ def api_dashboard():
         # Get user's auctions if they're a service provider
         my_auctions = []
         if current_user.is_service_provider:
-            auctions = Auction.query.filter_by(creator_id=current_user.id).order_by(desc(Auction.created_at)).all()
-            for auction in auctions:
+            # Bid counts come from one grouped aggregate instead of loading every bid
+            auctions = db.session.query(Auction, func.count(Bid.id)).outerjoin(
+                Bid, Bid.auction_id == Auction.id
+            ).filter(
+                Auction.creator_id == current_user.id
+            ).group_by(Auction.id).order_by(desc(Auction.created_at)).all()
+            for auction, bid_count in auctions:
                 auction_data = {
                     'id': auction.id,
                     'title': auction.title,
@@ -372,13 +608,13 @@ def api_dashboard():
                     'end_time': auction.end_time.isoformat(),
                     'is_active': auction.is_active,
                     'time_remaining': auction.time_remaining.total_seconds() if not auction.is_expired else 0,
-                    'bid_count': len(auction.bids)
+                    'bid_count': bid_count
                 }
                 my_auctions.append(auction_data)
         
         # Get user's bids
         my_bids = []
-        bids = db.session.query(Bid, Auction).join(Auction).filter(
+        bids = db.session.query(Bid, Auction).join(Auction, Bid.auction_id == Auction.id).filter(
             Bid.bidder_id == current_user.id
         ).order_by(desc(Bid.created_at)).all()
         
@@ -407,6 +643,13 @@ def api_dashboard():
         logging.error(f"Dashboard error: {str(e)}")
         return jsonify({'error': 'Failed to fetch dashboard data'}), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def api_cache_stats():
+    # Hit/miss counters of this process, plus requests answered by another request's load
+    stats = response_cache.stats()
+    stats['coalesced'] = flights.shared
+    return jsonify(stats), 200
+
 @app.route('/api/categories', methods=['GET'])
 def api_get_categories():
     categories = [
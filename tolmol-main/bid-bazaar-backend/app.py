@@ -7,6 +7,8 @@ from flask_socketio import SocketIO
 from flask_cors import CORS
 from werkzeug.middleware.proxy_fix import ProxyFix
 from sqlalchemy.orm import DeclarativeBase
+from cache import build_cache
+from message_queue import socketio_options, watch_deliveries
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -38,6 +40,32 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
 }
 
+# Bid engine: 'memory' decides bids in-process, 'direct' relies on the conditional UPDATE alone
+app.config["BID_ENGINE_MODE"] = os.environ.get("BID_ENGINE_MODE", "memory")
+# Accepted bids are group-committed: wait this long for more bids before writing a batch
+app.config["BID_FLUSH_INTERVAL_MS"] = float(os.environ.get("BID_FLUSH_INTERVAL_MS", 5))
+app.config["BID_FLUSH_MAX_BATCH"] = int(os.environ.get("BID_FLUSH_MAX_BATCH", 500))
+# Auction detail carries a bid summary and only this many of the latest bids
+app.config["DETAIL_RECENT_BIDS"] = int(os.environ.get("DETAIL_RECENT_BIDS", 10))
+
+# Response cache: 'memory' (per process), 'redis' (shared, REDIS_URL) or 'none'
+app.config["CACHE_BACKEND"] = os.environ.get("CACHE_BACKEND", "memory")
+app.config["REDIS_URL"] = os.environ.get("REDIS_URL", "redis://localhost:6379")
+app.config["CACHE_LISTING_TTL"] = float(os.environ.get("CACHE_LISTING_TTL", 5))
+app.config["CACHE_DETAIL_TTL"] = float(os.environ.get("CACHE_DETAIL_TTL", 10))
+app.config["CACHE_STATUS_TTL"] = float(os.environ.get("CACHE_STATUS_TTL", 2))
+# Socket.IO fan-out across workers and nodes: redis://host:port (or message_broker.py), amqp://...
+# Unset, events only reach clients of the process that emits them
+app.config["SOCKETIO_MESSAGE_QUEUE"] = os.environ.get("SOCKETIO_MESSAGE_QUEUE", "")
+app.config["SOCKETIO_CHANNEL"] = os.environ.get("SOCKETIO_CHANNEL", "bidbazaar-socketio")
+# Socket status requests are answered from memory; entries are reloaded from the database after this long
+app.config["LIVE_STATE_TTL"] = float(os.environ.get("LIVE_STATE_TTL", 5))
+# Bid updates are coalesced into one new_bid frame per auction room per tick; 0 sends every bid at once
+app.config["BROADCAST_TICK_MS"] = float(os.environ.get("BROADCAST_TICK_MS", 150))
+
+# Largest number of auctions POST /api/auctions/status answers at once
+app.config["STATUS_BATCH_MAX_IDS"] = int(os.environ.get("STATUS_BATCH_MAX_IDS", 200))
+
 # Initialize extensions
 db = SQLAlchemy(app, model_class=Base)
 login_manager = LoginManager()
@@ -45,16 +73,23 @@ login_manager.init_app(app)
 login_manager.login_view = 'login'
 login_manager.login_message = 'Please log in to access this page.'
 
-# Initialize SocketIO
-socketio = SocketIO(app, cors_allowed_origins="*")
+# Initialize SocketIO; the socket takes cookie-authenticated bids, so only the CORS origins may connect
+socketio = SocketIO(app, cors_allowed_origins=allowed_origins, **socketio_options(app.config))
+watch_deliveries(socketio.server.manager)
+
+# Response cache for the hot read endpoints
+response_cache = build_cache(app.config)
 
 @login_manager.user_loader
 def load_user(user_id):
     from models import User
     return User.query.get(int(user_id))
 
-# Create tables
+# Create tables (migrations/env.py turns this off so Alembic owns the schema)
 with app.app_context():
     import models  # noqa: F401
-    db.create_all()
-    logging.info("Database tables created")
+    if os.environ.get("AUTO_CREATE_TABLES", "1") == "1":
+        db.create_all()
+        import search_index
+        search_index.install()
+        logging.info("Database tables created")
@@ -6,15 +6,25 @@ This module contains auction-related API endpoints including
 auction creation, listing, and management.
 """
 
+import hashlib
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, func
 
+from app.core.config import settings
+from app.core.conditional import is_not_modified, make_etag, not_modified_response, set_validators
+from app.core.pagination import MAX_PAGE_SIZE, after_cursor, decode_cursor, encode_cursor
 from app.core.security import get_current_user_id
+from app.core.single_flight import request_key, single_flight
 from app.db.database import get_db
 from app.db.models.auction import Auction, AuctionStatus, ServiceCategory
 from app.db.models.user import User
+from app.services.bid_history import bid_stats, history_page
+from app.services.location_index import location_index
+from app.services.view_counter import view_counter
 from app.schemas.auction import (
     AuctionCreate, 
     Auction as AuctionSchema, 
@@ -48,13 +58,17 @@ def create_auction(
     db.add(auction)
     db.commit()
     db.refresh(auction)
+    location_index.add(auction.location)
     return auction
 
 
 @router.get("/", response_model=List[AuctionSummary])
 def read_auctions(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    skip: int = Query(0, ge=0, deprecated=True),
     category: Optional[ServiceCategory] = None,
     status: Optional[AuctionStatus] = None,
     location: Optional[str] = None,
@@ -62,7 +76,14 @@ def read_auctions(
     sort_order: str = Query("desc", regex="^(asc|desc)$"),
     db: Session = Depends(get_db),
 ) -> Any:
-    """Get auctions list with filtering and sorting."""
+    """Get auctions list with filtering and sorting.
+    
+    Pages are keyset-paginated on (sort_by, id); the cursor for the next page
+    is returned in the X-Next-Cursor header. The page is tagged by the ids
+    and versions of its rows, so an unchanged page answers 304 before the
+    rows are loaded. skip is deprecated: it still offsets the page for older
+    callers, at the cost of reading the skipped rows.
+    """
     query = db.query(Auction)
     
     # Apply filters
@@ -71,33 +92,95 @@ def read_auctions(
     if status:
         query = query.filter(Auction.status == status)
     if location:
-        query = query.filter(Auction.location.ilike(f"%{location}%"))
+        # Alias-aware, typo-tolerant match against the indexed location column
+        query = location_index.apply_filter(db, query, location)
     
-    # Apply sorting
-    if sort_order == "desc":
-        query = query.order_by(desc(getattr(Auction, sort_by)))
+    # Apply sorting, with id as the tie-breaker so the cursor is unambiguous;
+    # a NULL bid_count sorts and compares as 0
+    sort_column = getattr(Auction, sort_by)
+    if sort_by == "bid_count":
+        sort_column = func.coalesce(sort_column, 0)
+    descending = sort_order == "desc"
+    if descending:
+        query = query.order_by(desc(sort_column), desc(Auction.id))
     else:
-        query = query.order_by(asc(getattr(Auction, sort_by)))
+        query = query.order_by(asc(sort_column), asc(Auction.id))
+    
+    if cursor:
+        try:
+            value, row_id = decode_cursor(cursor, sort_by)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = after_cursor(query, sort_column, Auction.id, value, row_id, descending)
+    if skip:
+        query = query.offset(skip)
     
-    auctions = query.offset(skip).limit(limit).all()
+    versions = query.with_entities(
+        Auction.id, Auction.version, Auction.updated_at, Auction.created_at
+    ).limit(limit + 1).all()
+    page_tag = hashlib.sha1(repr([(row.id, row.version) for row in versions]).encode()).hexdigest()
+    etag = make_etag("auctions", page_tag[:20])
+    last_modified = max((row.updated_at or row.created_at for row in versions), default=None)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    set_validators(response, etag, last_modified)
+    
+    rows = query.limit(limit + 1).all()
+    auctions = rows[:limit]
+    if len(rows) > limit:
+        last = auctions[-1]
+        value = getattr(last, sort_by)
+        if sort_by == "bid_count":
+            value = value or 0
+        response.headers["X-Next-Cursor"] = encode_cursor(sort_by, value, last.id)
     return auctions
 
 
-@router.get("/{auction_id}", response_model=AuctionWithBids)
+def count_view(auction_id: int, db: Session = Depends(get_db)) -> None:
+    """Count a view of an auction in memory, writing the pending views when a batch is due."""
+    if view_counter.add(auction_id):
+        view_counter.flush(db)
+
+
+@router.get("/{auction_id}", response_model=AuctionWithBids, dependencies=[Depends(count_view)])
+@single_flight(lambda request, **_: request_key(request))
 def read_auction(
     auction_id: int,
+    request: Request,
     db: Session = Depends(get_db),
 ) -> Any:
-    """Get auction by ID with bids."""
-    auction = db.query(Auction).filter(Auction.id == auction_id).first()
-    if not auction:
+    """Get auction by ID with bids.
+    
+    Answers 304 from the auction's version when the client's copy is current.
+    Concurrent identical requests share one load; views are counted per request
+    by count_view and written in batches.
+    """
+    version = (
+        db.query(Auction.version, Auction.updated_at, Auction.created_at)
+        .filter(Auction.id == auction_id)
+        .first()
+    )
+    if not version:
         raise HTTPException(status_code=404, detail="Auction not found")
     
-    # Increment view count
-    auction.view_count += 1
-    db.commit()
+    etag = make_etag("auction", auction_id, version.version)
+    last_modified = version.updated_at or version.created_at
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(etag, last_modified)
     
-    return auction
+    auction = db.query(Auction).filter(Auction.id == auction_id).first()
+    # A summary and the latest bids; older ones come from the bid history endpoint
+    recent = history_page(db, auction_id, settings.DETAIL_RECENT_BIDS)
+    detail = AuctionWithBids(
+        **AuctionSchema.from_orm(auction).dict(),
+        bid_summary=bid_stats(db, auction_id),
+        bids=recent.bids,
+        bids_next_cursor=recent.next_cursor,
+    )
+    # Serialized here so the shared response does not hold this request's session
+    response = JSONResponse(content=jsonable_encoder(detail))
+    set_validators(response, etag, last_modified)
+    return response
 
 
 @router.put("/{auction_id}", response_model=AuctionSchema)
@@ -121,9 +204,11 @@ def update_auction(
     update_data = auction_in.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(auction, field, value)
+    auction.version += 1
     
     db.commit()
     db.refresh(auction)
+    location_index.add(auction.location)
     return auction
 
 
@@ -145,6 +230,7 @@ def delete_auction(
     
     # Mark as cancelled instead of deleting
     auction.status = AuctionStatus.CANCELLED
+    auction.version += 1
     db.commit()
     return {"message": "Auction cancelled successfully"}
 
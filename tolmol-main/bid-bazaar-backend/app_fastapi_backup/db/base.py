@@ -9,4 +9,4 @@ from app.db.database import Base  # noqa
 from app.db.models.user import User  # noqa
 from app.db.models.auction import Auction  # noqa
 from app.db.models.bid import Bid  # noqa
-
+from app.db.models.proxy_bid import ProxyBid  # noqa
@@ -47,7 +47,7 @@ class Auction(Base):
     category = Column(Enum(ServiceCategory), nullable=False, index=True)
     
     # Location information
-    location = Column(String(255), nullable=False)
+    location = Column(String(255), nullable=False, index=True)
     latitude = Column(String(20), nullable=True)
     longitude = Column(String(20), nullable=True)
     
@@ -65,6 +65,8 @@ class Auction(Base):
     is_featured = Column(Boolean, default=False)
     view_count = Column(Integer, default=0)
     bid_count = Column(Integer, default=0)
+    # Bumped by every bid or edit; drives the ETag of the auction endpoints
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Requirements and preferences
     requirements = Column(Text, nullable=True)
@@ -6,7 +6,7 @@ This module contains the Bid SQLAlchemy model for bid management.
 Includes bid amounts, status tracking, and bidder information.
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Numeric, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Numeric, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -26,6 +26,8 @@ class Bid(Base):
     """Bid model for auction bidding management."""
     
     __tablename__ = "bids"
+    # Bid history pages walk (created_at, id) within one auction
+    __table_args__ = (Index("ix_bids_auction_created", "auction_id", "created_at"),)
     
     id = Column(Integer, primary_key=True, index=True)
     amount = Column(Numeric(10, 2), nullable=False)
@@ -17,8 +17,10 @@ from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.api.api_v1.api import api_router
-from app.db.database import engine
+from app.db.database import engine, SessionLocal
 from app.db.base import Base
+from app.services.bid_book import bid_books
+from app.services.view_counter import view_counter
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -37,8 +39,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let cross-origin clients read the listing cursor and the cache validators
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
+@app.on_event("startup")
+def load_bid_books() -> None:
+    """Rebuild the in-memory bid books from the bids table."""
+    db = SessionLocal()
+    try:
+        bid_books.rebuild(db)
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def flush_view_counts() -> None:
+    """Write the detail views still counted in memory."""
+    db = SessionLocal()
+    try:
+        view_counter.flush(db)
+    finally:
+        db.close()
+
 # Build ID for audit trail
 BUILD_ID = os.environ.get("BUILD_ID", f"local-{int(time.time())}")
 
@@ -86,11 +86,13 @@ class Auction(AuctionInDB):
     pass
 
 
-from app.schemas.bid import Bid
+from app.schemas.bid import Bid, BidStats
 
 class AuctionWithBids(Auction):
-    """Auction schema with bids included."""
+    """Auction schema with a bid summary and the latest bids."""
+    bid_summary: BidStats = BidStats()
     bids: List[Bid] = []
+    bids_next_cursor: Optional[str] = None
 
 
 class AuctionSummary(BaseModel):
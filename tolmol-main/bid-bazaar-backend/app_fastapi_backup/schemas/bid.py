@@ -5,13 +5,16 @@ Bid Schemas
 This module contains Pydantic schemas for bid-related API requests and responses.
 """
 
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 from pydantic import BaseModel, validator
 
 from app.db.models.bid import BidStatus
 
+# Proxy steps are whole paise
+MIN_PROXY_STEP = Decimal("0.01")
+
 
 class BidBase(BaseModel):
     """Base bid schema."""
@@ -69,6 +72,23 @@ class Bid(BidInDB):
     pass
 
 
+class BidStats(BaseModel):
+    """Aggregate figures over all of an auction's bids."""
+    count: int = 0
+    lowest: Optional[Decimal] = None
+    first_bid_at: Optional[datetime] = None
+    last_bid_at: Optional[datetime] = None
+    distinct_bidders: int = 0
+
+
+class BidHistoryPage(BaseModel):
+    """One page of an auction's bid history."""
+    bids: List[Bid]
+    next_cursor: Optional[str] = None
+    last_bid_id: Optional[int] = None
+    has_more: bool = False
+
+
 from app.schemas.user import User
 
 class BidWithBidder(Bid):
@@ -76,6 +96,43 @@ class BidWithBidder(Bid):
     bidder: User
 
 
+class ProxyBidCreate(BaseModel):
+    """Schema for registering a proxy (automatic) bid."""
+    auction_id: int
+    floor_price: Decimal
+    step: Decimal
+    
+    @validator('floor_price')
+    def validate_floor_price(cls, v):
+        if v <= 0:
+            raise ValueError('Floor price must be positive')
+        return v
+    
+    @validator('step')
+    def validate_step(cls, v):
+        if v < MIN_PROXY_STEP:
+            raise ValueError(f'Step must be at least {MIN_PROXY_STEP}')
+        if v != v.quantize(MIN_PROXY_STEP):
+            raise ValueError(f'Step must be a multiple of {MIN_PROXY_STEP}')
+        return v
+
+
+class ProxyBid(BaseModel):
+    """Schema for a registered proxy bid and where it stands."""
+    auction_id: int
+    floor_price: Decimal
+    step: Decimal
+    current_lowest_bid: Optional[Decimal] = None
+    is_leading: bool = False
+
+
+class BidRank(BaseModel):
+    """Schema for a bidder's rank in an auction (1 is the lowest bid)."""
+    auction_id: int
+    rank: Optional[int] = None
+    total: int
+
+
 class BidSummary(BaseModel):
     """Summary bid schema for listings."""
     id: int
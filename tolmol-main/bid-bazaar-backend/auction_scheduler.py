@@ -0,0 +1,123 @@
+import heapq
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import update
+from app import app, db, socketio, response_cache
+from models import Auction, Bid
+from bid_engine import bid_engine
+from map_clusters import map_tiles
+import events
+from live_state import live_state
+
+# Closes auctions at their end_time.
+#
+# A min-heap of (end_time, auction_id) drives a single background task that
+# sleeps until the earliest deadline, flips is_active off, records the
+# winning (lowest) bid, drops the auction's cached map tiles and responses
+# and broadcasts auction_ended to the auction's room.
+# New auctions are pushed onto the heap when they are created.
+
+
+class AuctionScheduler:
+    # Upper bound on one sleep, so a missed wake-up only delays a close briefly
+    MAX_SLEEP_SECONDS = 30
+
+    def __init__(self):
+        self._heap = []
+        self._lock = threading.Lock()
+        self._wakeup = None
+        self._started = False
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._wakeup = socketio.server.eio.create_event()
+
+        with app.app_context():
+            rows = db.session.query(Auction.id, Auction.end_time).filter(Auction.is_active == True).all()
+        for auction_id, end_time in rows:
+            self.schedule(auction_id, end_time)
+        socketio.start_background_task(self._run)
+        logging.info(f"Auction scheduler started with {len(rows)} active auctions")
+
+    def schedule(self, auction_id, end_time):
+        with self._lock:
+            is_earliest = not self._heap or end_time < self._heap[0][0]
+            heapq.heappush(self._heap, (end_time, auction_id))
+        if is_earliest and self._wakeup is not None:
+            self._wakeup.set()
+
+    def run_due(self):
+        # Close the auctions whose end_time has passed; returns the seconds to sleep before the next
+        due = []
+        with self._lock:
+            now = datetime.utcnow()
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+            timeout = self.MAX_SLEEP_SECONDS
+            if self._heap:
+                timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+
+        if not due:
+            return timeout
+        with app.app_context():
+            for auction_id in due:
+                self._close(auction_id)
+        # Look again at once, in case more fell due while these closed
+        return 0
+
+    def _run(self):
+        while True:
+            self._wakeup.clear()
+            timeout = self.run_due()
+            if timeout:
+                self._wakeup.wait(timeout)
+
+    def _close(self, auction_id):
+        try:
+            auction = db.session.get(Auction, auction_id)
+            if auction is None or not auction.is_active:
+                return
+
+            # The end time was moved after this entry was scheduled
+            if auction.end_time > datetime.utcnow():
+                self.schedule(auction.id, auction.end_time)
+                return
+
+            winner = (
+                Bid.query.filter_by(auction_id=auction_id)
+                .order_by(Bid.amount, Bid.created_at)
+                .first()
+            )
+            result = db.session.execute(
+                update(Auction)
+                .where(Auction.id == auction_id, Auction.is_active == True)
+                .values(
+                    is_active=False,
+                    winning_bid_id=winner.id if winner else None,
+                    version=Auction.version + 1,
+                    updated_at=datetime.utcnow()
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            if result.rowcount != 1:
+                return
+
+            bid_engine.close_auction(auction_id)
+            live_state.close(auction_id)
+            map_tiles.invalidate(auction.geohash)
+            response_cache.invalidate_auction(auction_id)
+            response_cache.invalidate_listings()
+            events.auction_ended(auction_id, winner)
+            logging.info(f"Auction {auction_id} closed")
+
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Close auction error: {str(e)}")
+
+
+auction_scheduler = AuctionScheduler()
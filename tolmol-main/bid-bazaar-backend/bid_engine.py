@@ -0,0 +1,307 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import update, func
+from app import app, db, socketio, response_cache
+from models import Auction, Bid
+from live_state import live_state
+
+# Per-auction bid engine shared by the HTML and JSON bid routes.
+#
+# Acceptance decisions are made against an in-memory copy of each auction's
+# current lowest price while holding that auction's lock, so two bidders can
+# never both win the same price and hot auctions do not contend with each
+# other. Accepted bids are handed to a background writer in acceptance order
+# and the caller waits only for its own bid to be stored.
+#
+# Every write goes through accept_bid(), a single conditional UPDATE plus the
+# Bid insert in one transaction, so the database still refuses a stale price
+# when several processes bid on the same auction. With BID_ENGINE_MODE=direct
+# the in-memory step is skipped and accept_bid() is the whole decision.
+#
+# The writer group-commits: it gathers accepted bids for BID_FLUSH_INTERVAL_MS
+# and stores them with one multi-row insert, one current_bid update per
+# touched auction and a single commit. Callers are acknowledged only after
+# that commit, so the acknowledgement stays durable. Each stored bid drops
+# its auction's cached detail and status responses and updates its live
+# state. Auction.version moves by one per stored bid, batched or not, and
+# each stored bid carries the version it produced (auction_version) so the
+# broadcast frames can be ordered across workers.
+
+
+class BidRejected(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _price_guard(auction_id, amount, now):
+    return [
+        Auction.id == auction_id,
+        Auction.is_active == True,
+        Auction.end_time > now,
+        func.coalesce(Auction.current_bid, Auction.starting_bid) > amount
+    ]
+
+
+def accept_bid(auction_id, bidder_id, amount, created_at=None):
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(Auction)
+        .where(*_price_guard(auction_id, amount, now), Auction.creator_id != bidder_id)
+        .values(current_bid=amount, version=Auction.version + 1, updated_at=now)
+        .returning(Auction.version)
+        .execution_options(synchronize_session=False)
+    )
+    version = result.scalar_one_or_none()
+    if version is None:
+        db.session.rollback()
+        return None
+
+    bid = Bid(
+        amount=amount,
+        auction_id=auction_id,
+        bidder_id=bidder_id,
+        created_at=created_at or now
+    )
+    bid.auction_version = version
+    db.session.add(bid)
+    db.session.commit()
+    return bid
+
+
+def explain_rejection(auction_id, bidder_id):
+    # Only runs after accept_bid() refused a bid, to tell the bidder why
+    auction = db.session.get(Auction, auction_id)
+    if auction is None:
+        return BidRejected('Auction not found', 404)
+    if auction.is_expired or not auction.is_active:
+        return BidRejected('This auction has ended')
+    if auction.creator_id == bidder_id:
+        return BidRejected('You cannot bid on your own auction')
+    current_lowest = auction.get_lowest_bid()
+    return BidRejected(f'Your bid must be lower than the current bid of ₹{current_lowest:.2f}')
+
+
+class AuctionState:
+    __slots__ = ('auction_id', 'creator_id', 'end_time', 'is_active', 'lowest', 'lock')
+
+    def __init__(self, auction):
+        self.auction_id = auction.id
+        self.creator_id = auction.creator_id
+        self.end_time = auction.end_time
+        self.is_active = auction.is_active
+        self.lowest = auction.get_lowest_bid()
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.is_active and self.end_time > datetime.utcnow()
+
+
+class PendingBid:
+    __slots__ = ('id', 'auction_id', 'bidder_id', 'amount', 'created_at', 'auction_version', 'error', 'done')
+
+    def __init__(self, auction_id, bidder_id, amount):
+        self.id = None
+        self.auction_id = auction_id
+        self.bidder_id = bidder_id
+        self.amount = amount
+        self.created_at = datetime.utcnow()
+        self.auction_version = None
+        self.error = None
+        self.done = socketio.server.eio.create_event()
+
+
+class BidEngine:
+    def __init__(self, mode='memory', persist_timeout=10, flush_interval_ms=5, max_batch=500):
+        self.mode = mode
+        self.persist_timeout = persist_timeout
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_batch = max_batch
+        self._states = {}
+        self._states_lock = threading.Lock()
+        self._queue = None
+        self._writer_lock = threading.Lock()
+
+    def place_bid(self, auction_id, bidder_id, amount):
+        if self.mode == 'direct':
+            return self._place_bid_direct(auction_id, bidder_id, amount)
+
+        state = self._get_state(auction_id)
+
+        with state.lock:
+            if not state.is_open:
+                raise BidRejected('This auction has ended')
+
+            if state.creator_id == bidder_id:
+                raise BidRejected('You cannot bid on your own auction')
+
+            if amount <= 0:
+                raise BidRejected('Bid amount must be positive')
+
+            # Must be lower than the current bid in a reverse auction
+            if amount >= state.lowest:
+                raise BidRejected(f'Your bid must be lower than the current bid of ₹{state.lowest:.2f}')
+
+            state.lowest = amount
+            pending = PendingBid(auction_id, bidder_id, amount)
+            # Enqueue while still holding the lock so bids are stored in the order they were accepted
+            self._enqueue(pending)
+
+        if not pending.done.wait(self.persist_timeout):
+            raise BidRejected('Bid could not be confirmed, please retry', 503)
+        if pending.error:
+            raise pending.error
+        return pending
+
+    def _place_bid_direct(self, auction_id, bidder_id, amount):
+        if amount <= 0:
+            raise BidRejected('Bid amount must be positive')
+
+        bid = accept_bid(auction_id, bidder_id, amount)
+        if bid is None:
+            raise explain_rejection(auction_id, bidder_id)
+        response_cache.invalidate_auction(auction_id)
+        live_state.record_bid(auction_id, amount)
+        return bid
+
+    def close_auction(self, auction_id):
+        state = self._states.get(auction_id)
+        if state:
+            with state.lock:
+                state.is_active = False
+
+    def forget(self, auction_id):
+        with self._states_lock:
+            self._states.pop(auction_id, None)
+
+    def _get_state(self, auction_id):
+        state = self._states.get(auction_id)
+        if state is not None:
+            return state
+
+        # Load outside the states lock so a slow query does not block other auctions
+        auction = db.session.get(Auction, auction_id)
+        if auction is None:
+            raise BidRejected('Auction not found', 404)
+
+        with self._states_lock:
+            return self._states.setdefault(auction_id, AuctionState(auction))
+
+    def _enqueue(self, pending):
+        if self._queue is None:
+            with self._writer_lock:
+                if self._queue is None:
+                    self._queue = socketio.server.eio.create_queue()
+                    socketio.start_background_task(self._run_writer)
+        self._queue.put(pending)
+
+    def _run_writer(self):
+        queue_empty = socketio.server.eio.get_queue_empty_exception()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue_empty:
+                    break
+            with app.app_context():
+                self._flush(batch)
+
+    def _flush(self, batch):
+        by_auction = {}
+        for pending in batch:
+            by_auction.setdefault(pending.auction_id, []).append(pending)
+
+        accepted = []
+        refused = []
+        try:
+            now = datetime.utcnow()
+            for auction_id, pendings in by_auction.items():
+                # Usually in falling order, but not after forget(): bids accepted against the old price
+                # can still be queued ahead of ones accepted against the reloaded one. The whole batch
+                # must beat the stored price, and the lowest bid becomes it.
+                amounts = [pending.amount for pending in pendings]
+                result = db.session.execute(
+                    update(Auction)
+                    .where(*_price_guard(auction_id, max(amounts), now))
+                    .values(current_bid=min(amounts), version=Auction.version + len(pendings), updated_at=now)
+                    .returning(Auction.version)
+                    .execution_options(synchronize_session=False)
+                )
+                version = result.scalar_one_or_none()
+                if version is not None:
+                    # One version per bid, the last bid's is the version the update left
+                    first = version - len(pendings) + 1
+                    for offset, pending in enumerate(pendings):
+                        pending.auction_version = first + offset
+                    accepted.extend(pendings)
+                else:
+                    refused.extend(pendings)
+
+            bids = [
+                Bid(
+                    amount=pending.amount,
+                    auction_id=pending.auction_id,
+                    bidder_id=pending.bidder_id,
+                    created_at=pending.created_at
+                )
+                for pending in accepted
+            ]
+            db.session.add_all(bids)
+            db.session.commit()
+            for auction_id in {pending.auction_id for pending in accepted}:
+                response_cache.invalidate_auction(auction_id)
+            for pending, bid in zip(accepted, bids):
+                pending.id = bid.id
+                live_state.record_bid(pending.auction_id, pending.amount)
+                pending.done.set()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Flush bids error: {str(e)}")
+            for auction_id in by_auction:
+                self.forget(auction_id)
+            for pending in batch:
+                pending.error = BidRejected('Failed to place bid', 500)
+                pending.done.set()
+            return
+
+        # Another process moved these prices first, decide each bid on its own
+        for pending in refused:
+            self._persist(pending)
+
+    def _persist(self, pending):
+        try:
+            bid = accept_bid(pending.auction_id, pending.bidder_id, pending.amount, pending.created_at)
+            if bid is None:
+                # Another process moved the price or closed the auction first
+                pending.error = explain_rejection(pending.auction_id, pending.bidder_id)
+                self.forget(pending.auction_id)
+            else:
+                pending.id = bid.id
+                pending.auction_version = bid.auction_version
+                response_cache.invalidate_auction(pending.auction_id)
+                live_state.record_bid(pending.auction_id, pending.amount)
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Persist bid error: {str(e)}")
+            pending.error = BidRejected('Failed to place bid', 500)
+            # The in-memory price is ahead of the database now, reload it on the next bid
+            self.forget(pending.auction_id)
+        finally:
+            pending.done.set()
+
+
+bid_engine = BidEngine(
+    mode=app.config.get('BID_ENGINE_MODE', 'memory'),
+    persist_timeout=app.config.get('BID_PERSIST_TIMEOUT', 10),
+    flush_interval_ms=app.config.get('BID_FLUSH_INTERVAL_MS', 5),
+    max_batch=app.config.get('BID_FLUSH_MAX_BATCH', 500)
+)
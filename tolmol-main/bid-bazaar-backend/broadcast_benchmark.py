@@ -0,0 +1,113 @@
+import argparse
+import statistics
+import threading
+import time
+import socketio
+import message_broker
+from message_queue import RespPubSubManager
+
+# Broadcast latency through the Socket.IO message queue.
+#
+#     python broadcast_benchmark.py [--clients 10000] [--nodes 4] [--rounds 50]
+#                                   [--queue redis://host:port]
+#
+# Starts --nodes Socket.IO servers, each standing for one worker, attached to
+# the queue (a local message_broker unless --queue is given). --clients
+# connections are spread over them, all in one auction room. A write-only
+# publisher, standing for an API worker handling a bid, emits new_bid into
+# the room; the time from emit to each connection's packet being handed to
+# the transport is recorded.
+#
+# Connections are registered with each server's client manager directly, so
+# the numbers cover the queue hop, the per-node fan-out and packet encoding,
+# but not the kernel writes to 10k real sockets.
+
+ROOM = 'auction_1'
+
+
+class Node:
+    def __init__(self, url, channel, write_only=False):
+        self.server = socketio.Server(
+            async_mode='threading',
+            client_manager=RespPubSubManager(url, channel=channel, write_only=write_only)
+        )
+        self.server.manager_initialized = True
+        self.server.manager.initialize()
+        self.received = []
+        self._lock = threading.Lock()
+        # Record instead of writing to a transport
+        self.server._send_eio_packet = self._record
+
+    def _record(self, eio_sid, packet):
+        now = time.perf_counter()
+        with self._lock:
+            self.received.append(now)
+
+    def connect(self, count, first_id):
+        manager = self.server.manager
+        for eio_sid in range(first_id, first_id + count):
+            sid = manager.connect(f'eio-{eio_sid}', '/')
+            manager.enter_room(sid, '/', ROOM)
+
+    def take(self):
+        with self._lock:
+            received, self.received = self.received, []
+        return received
+
+
+def run(clients, nodes, rounds, url, channel, timeout=10):
+    workers = [Node(url, channel) for _ in range(nodes)]
+    for index, node in enumerate(workers):
+        share = clients // nodes + (1 if index < clients % nodes else 0)
+        node.connect(share, index * (clients // nodes + 1))
+    publisher = Node(url, channel, write_only=True)
+    # Let the subscribers attach before the first round
+    time.sleep(0.5)
+
+    latencies = []
+    completions = []
+    for round_number in range(rounds):
+        sent = time.perf_counter()
+        publisher.server.emit('new_bid', {'auction_id': 1, 'round': round_number}, to=ROOM)
+
+        deadline = sent + timeout
+        delivered = []
+        while len(delivered) < clients and time.perf_counter() < deadline:
+            time.sleep(0.001)
+            for node in workers:
+                delivered.extend(node.take())
+        if len(delivered) < clients:
+            raise SystemExit(f'Round {round_number}: {len(delivered)} of {clients} deliveries')
+        latencies.extend(received - sent for received in delivered)
+        completions.append(max(delivered) - sent)
+    return latencies, completions
+
+
+def _ms(seconds):
+    return f'{seconds * 1000:.2f} ms'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Socket.IO broadcast latency through the message queue')
+    parser.add_argument('--clients', type=int, default=10000)
+    parser.add_argument('--nodes', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--queue', help='redis://host:port; a local broker is started when omitted')
+    parser.add_argument('--channel', default='bidbazaar-benchmark')
+    args = parser.parse_args()
+
+    url = args.queue
+    if not url:
+        broker = message_broker.start()
+        url = f'redis://127.0.0.1:{broker.server_address[1]}'
+
+    latencies, completions = run(args.clients, args.nodes, args.rounds, url, args.channel)
+    latencies.sort()
+    print(f'{args.clients} clients on {args.nodes} nodes, {args.rounds} broadcasts via {url}')
+    print(f'  per-client latency  p50 {_ms(latencies[len(latencies) // 2])}'
+          f'  p99 {_ms(latencies[int(len(latencies) * 0.99)])}  max {_ms(latencies[-1])}')
+    print(f'  full fan-out        mean {_ms(statistics.mean(completions))}  max {_ms(max(completions))}')
+
+
+if __name__ == '__main__':
+    main()
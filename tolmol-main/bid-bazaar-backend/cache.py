@@ -0,0 +1,396 @@
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode, urlparse
+from flask import current_app, jsonify, request
+
+# Response cache for the hot read endpoints.
+#
+# Cached values are finished JSON bodies, so a hit skips both the queries and
+# the serializer. Two interchangeable backends: MemoryBackend, an in-process
+# LRU with per-entry TTL, and RedisBackend, a minimal RESP client for a shared
+# Redis (CACHE_BACKEND=redis, REDIS_URL).
+#
+# Invalidation is targeted: detail entries are keyed by the auction's version,
+# so a bid or close makes them unreachable, a bid drops the auction's status
+# entry, and creating or closing an auction bumps the listing generation,
+# which is part of every listing key, so all listing pages miss at once
+# without enumerating them. Listings are not dropped on bids; their short TTL
+# bounds how stale a price on a listing page gets.
+#
+# Backend errors are logged and treated as misses; the cache never fails a
+# request.
+#
+# not_modified() and conditional() add ETag / Last-Modified handling, so a
+# client that already holds the current representation gets a 304.
+
+DEFAULT_MAX_ENTRIES = 10000
+# After a backend error, skip the backend this long instead of timing out on every request
+BACKEND_RETRY_SECONDS = 5
+
+
+class MemoryBackend:
+    name = 'memory'
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Counters live apart from the LRU so they are never evicted
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if key in self._counters:
+                    values.append(str(self._counters[key]))
+                elif entry is None:
+                    values.append(None)
+                elif entry[1] is not None and entry[1] <= now:
+                    del self._entries[key]
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    values.append(entry[0])
+        return values
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set_many(self, items, ttl=None):
+        for key, value in items:
+            self.set(key, value, ttl)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._counters.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisBackend:
+    """Just enough of the Redis protocol (RESP) for GET/MGET/SET/DEL/INCR and PUBLISH/SUBSCRIBE."""
+
+    name = 'redis'
+
+    def __init__(self, url, timeout=0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or 'localhost'
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip('/') or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _open(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        conn = (sock, sock.makefile('rb'))
+        if self.password:
+            self._send(conn, 'AUTH', self.password)
+        if self.db:
+            self._send(conn, 'SELECT', self.db)
+        return conn
+
+    def _connect(self):
+        conn = self._open()
+        self._local.conn = conn
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn:
+            try:
+                conn[1].close()
+                conn[0].close()
+            except OSError:
+                pass
+
+    def execute(self, *args):
+        conn = getattr(self._local, 'conn', None)
+        try:
+            return self._send(conn or self._connect(), *args)
+        except (OSError, EOFError):
+            # A dropped connection gets one reconnect
+            self._close()
+            return self._send(self._connect(), *args)
+
+    def execute_many(self, commands):
+        conn = getattr(self._local, 'conn', None)
+        try:
+            return self._send_many(conn or self._connect(), commands)
+        except (OSError, EOFError):
+            self._close()
+            return self._send_many(self._connect(), commands)
+
+    def _send(self, conn, *args):
+        return self._send_many(conn, [args])[0]
+
+    def _send_many(self, conn, commands):
+        parts = []
+        for args in commands:
+            parts.append(f'*{len(args)}\r\n'.encode())
+            for arg in args:
+                data = arg if isinstance(arg, bytes) else str(arg).encode()
+                parts.append(f'${len(data)}\r\n'.encode() + data + b'\r\n')
+        conn[0].sendall(b''.join(parts))
+        # Every reply is read, even after an error reply, so the connection stays in step
+        replies = []
+        error = None
+        for _ in commands:
+            try:
+                replies.append(self._read(conn[1]))
+            except RedisError as e:
+                error = error or e
+                replies.append(None)
+        if error:
+            raise error
+        return replies
+
+    def _read(self, f):
+        line = f.readline()
+        if not line:
+            raise EOFError('Connection closed')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode()
+        if kind == b'-':
+            raise RedisError(rest.decode())
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = f.read(length + 2)
+            return data[:-2].decode()
+        if kind == b'*':
+            length = int(rest)
+            return None if length < 0 else [self._read(f) for _ in range(length)]
+        raise RedisError(f'Unexpected reply {line!r}')
+
+    def get(self, key):
+        return self.execute('GET', key)
+
+    def get_many(self, keys):
+        return self.execute('MGET', *keys) if keys else []
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self.execute('SET', key, value, 'PX', int(ttl * 1000))
+        else:
+            self.execute('SET', key, value)
+
+    def set_many(self, items, ttl=None):
+        # Pipelined: all SETs go out in one write and the replies are read back together
+        commands = [
+            ('SET', key, value, 'PX', int(ttl * 1000)) if ttl else ('SET', key, value)
+            for key, value in items
+        ]
+        if commands:
+            self.execute_many(commands)
+
+    def delete(self, *keys):
+        if keys:
+            self.execute('DEL', *keys)
+
+    def incr(self, key):
+        return self.execute('INCR', key)
+
+    def publish(self, channel, message):
+        return self.execute('PUBLISH', channel, message)
+
+    def subscribe(self, channel):
+        """Yield the messages published on a channel, blocking on a connection of its own."""
+        conn = self._open()
+        try:
+            self._send(conn, 'SUBSCRIBE', channel)
+            # A subscriber idles until something is published
+            conn[0].settimeout(None)
+            while True:
+                reply = self._read(conn[1])
+                if reply and reply[0] == 'message':
+                    yield reply[2]
+        finally:
+            conn[1].close()
+            conn[0].close()
+
+
+class ResponseCache:
+    def __init__(self, backend=None, prefix='bidbazaar:'):
+        self.backend = backend
+        self.prefix = prefix
+        self.errors = 0
+        self._counters = {}
+        self._down_until = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def key(self, namespace, *parts, **params):
+        # The same filters in any order or spacing give the same key
+        normalized = sorted(
+            (name, ' '.join(str(value).split()))
+            for name, value in params.items()
+            if value not in (None, '', False)
+        )
+        key = ':'.join([self.prefix + namespace] + [str(part) for part in parts])
+        return f'{key}?{urlencode(normalized)}' if normalized else key
+
+    def _count(self, namespace, hit):
+        with self._lock:
+            counters = self._counters.setdefault(namespace, [0, 0])
+            counters[0 if hit else 1] += 1
+
+    def _call(self, method, *args):
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return getattr(self.backend, method)(*args)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self._down_until = time.monotonic() + BACKEND_RETRY_SECONDS
+            logging.error(f"Cache {method} error: {str(e)}")
+            return None
+
+    def get(self, namespace, key):
+        if not self.enabled:
+            return None
+        value = self._call('get', key)
+        self._count(namespace, value is not None)
+        return value
+
+    def get_many(self, namespace, keys):
+        if not self.enabled:
+            return [None] * len(keys)
+        values = self._call('get_many', keys) or [None] * len(keys)
+        for value in values:
+            self._count(namespace, value is not None)
+        return values
+
+    def set(self, key, value, ttl):
+        if self.enabled:
+            self._call('set', key, value, ttl)
+
+    def set_many(self, items, ttl):
+        if self.enabled and items:
+            self._call('set_many', items, ttl)
+
+    def delete(self, *keys):
+        if self.enabled:
+            self._call('delete', *keys)
+
+    def get_response(self, namespace, key):
+        body = self.get(namespace, key)
+        if body is None:
+            return None
+        return current_app.response_class(body, mimetype='application/json')
+
+    def set_response(self, key, payload, ttl):
+        response = jsonify(payload)
+        self.set(key, response.get_data(as_text=True), ttl)
+        return response
+
+    def get_tagged_response(self, namespace, key):
+        # A response stored by set_tagged_response and its ETag, or (None, None)
+        if not self.enabled:
+            return None, None
+        body, etag = self._call('get_many', [key, key + '#etag']) or (None, None)
+        self._count(namespace, body is not None and etag is not None)
+        if body is None or etag is None:
+            return None, None
+        return current_app.response_class(body, mimetype='application/json'), etag
+
+    def set_tagged_response(self, key, payload, etag, ttl):
+        # The tag is stored next to the body, so a cache hit is answered without recomputing it
+        response = jsonify(payload)
+        self.set_many([(key, response.get_data(as_text=True)), (key + '#etag', etag)], ttl)
+        return response
+
+    def listing_generation(self):
+        if not self.enabled:
+            return 0
+        return self._call('get', self.prefix + 'auctions:generation') or 0
+
+    def invalidate_listings(self):
+        if self.enabled:
+            self._call('incr', self.prefix + 'auctions:generation')
+
+    def invalidate_auction(self, auction_id):
+        # Detail entries carry the version in their key and need no delete
+        self.delete(self.key('auction_status', auction_id))
+
+    def stats(self):
+        with self._lock:
+            namespaces = {
+                namespace: {
+                    'hits': hits,
+                    'misses': misses,
+                    'hit_rate': round(hits / (hits + misses), 3) if hits + misses else None
+                }
+                for namespace, (hits, misses) in self._counters.items()
+            }
+        return {
+            'backend': self.backend.name if self.backend else None,
+            'errors': self.errors,
+            'namespaces': namespaces
+        }
+
+
+def not_modified(etag, last_modified=None):
+    """Return a 304 response when the request's validators still match, else None."""
+    if request.if_none_match:
+        matches = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        matches = last_modified.replace(microsecond=0, tzinfo=None) <= request.if_modified_since.replace(tzinfo=None)
+    else:
+        matches = False
+    if not matches:
+        return None
+    response = current_app.response_class(status=304)
+    return conditional(response, etag, last_modified)
+
+
+def conditional(response, etag=None, last_modified=None):
+    # Without an explicit tag the body is hashed; make_conditional turns a match into a 304
+    if etag:
+        response.set_etag(etag, weak=True)
+    else:
+        response.add_etag()
+    if last_modified:
+        response.last_modified = last_modified
+    return response.make_conditional(request)
+
+
+def build_cache(config):
+    backend = config.get('CACHE_BACKEND', 'memory')
+    if backend == 'redis':
+        return ResponseCache(RedisBackend(config.get('REDIS_URL', 'redis://localhost:6379')))
+    if backend == 'memory':
+        return ResponseCache(MemoryBackend(config.get('CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)))
+    return ResponseCache(None)
@@ -0,0 +1,173 @@
+import logging
+import threading
+from app import app, db, socketio
+from models import Auction
+import feed
+from message_queue import on_delivery
+
+# Real-time events pushed to Socket.IO clients.
+#
+# Every server-side emit goes through publish(), so they all take the same
+# path: with SOCKETIO_MESSAGE_QUEUE set, the client manager relays the event
+# through the queue and every worker delivers it to its own clients in the
+# room (see message_queue.py).
+#
+# Bids are not emitted one by one. BidBroadcaster gathers them per auction
+# room and sends one new_bid frame per BROADCAST_TICK_MS with the current
+# price and the bids since the previous frame, so a watcher receives at most
+# one frame per tick (per worker) however fast the bidding gets.
+#
+# Workers tick independently, so with a message queue a frame from one worker
+# can reach a client after a newer frame from another. Every frame carries
+# the auction version of its newest bid; clients keep the frame with the
+# highest version and drop any that arrive with a lower one.
+#
+# Listing pages subscribe to the feed instead (see feed.py): auction_created,
+# price_changed (once per tick, with the frame) and auction_ended go to the
+# feed rooms whose filter the auction matches. Each worker forgets an
+# auction's feed rooms when it delivers its auction_ended.
+
+# Older bids in a very busy tick are left out of the frame; bid_count still counts them
+MAX_BIDS_PER_FRAME = 50
+
+
+def auction_room(auction_id):
+    return f'auction_{auction_id}'
+
+
+def publish(event, data, room=None):
+    socketio.emit(event, data, to=room)
+
+
+# auction_id -> the feed rooms it matches; the filter attributes never change
+_feed_rooms = {}
+
+
+def feed_rooms(auction_id, auction=None):
+    rooms = _feed_rooms.get(auction_id)
+    if rooms is None:
+        if auction is None:
+            with app.app_context():
+                auction = db.session.query(
+                    *(getattr(Auction, name) for name in feed.FEED_ATTRIBUTES)
+                ).filter(Auction.id == auction_id).first()
+        rooms = _feed_rooms[auction_id] = feed.auction_rooms(auction) if auction else []
+    return rooms
+
+
+def publish_feed(event, data, auction_id, auction=None):
+    rooms = feed_rooms(auction_id, auction)
+    if rooms:
+        publish(event, data, room=rooms)
+
+
+class BidBroadcaster:
+    def __init__(self, tick_ms=150):
+        self.tick = tick_ms / 1000.0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = None
+
+    def add(self, auction_id, bid):
+        update = {
+            'id': bid.id,
+            'amount': bid.amount,
+            'version': bid.auction_version,
+            'timestamp': bid.created_at.strftime('%H:%M:%S')
+        }
+        if self.tick <= 0:
+            self._emit(auction_id, [update])
+            return
+
+        with self._lock:
+            self._pending.setdefault(auction_id, []).append(update)
+            if self._wakeup is None:
+                self._wakeup = socketio.server.eio.create_event()
+                socketio.start_background_task(self._run)
+            self._wakeup.set()
+
+    def _run(self):
+        while True:
+            # Sleep until a bid arrives, then let the tick fill up before sending
+            self._wakeup.wait()
+            socketio.sleep(self.tick)
+            with self._lock:
+                self._wakeup.clear()
+                pending, self._pending = self._pending, {}
+            for auction_id, updates in pending.items():
+                try:
+                    self._emit(auction_id, updates)
+                except Exception as e:
+                    logging.error(f"Bid broadcast error: {str(e)}")
+
+    def flush(self, auction_id):
+        # Send an auction's pending bids now, so they go out before its auction_ended
+        with self._lock:
+            updates = self._pending.pop(auction_id, None)
+        if updates:
+            self._emit(auction_id, updates)
+
+    def _emit(self, auction_id, updates):
+        # Accepted prices only fall, so falling amount is acceptance order and the last is current
+        updates.sort(key=lambda update: -update['amount'])
+        latest = updates[-1]
+        versions = [update['version'] for update in updates if update['version'] is not None]
+        version = max(versions) if versions else None
+        publish('new_bid', {
+            'auction_id': auction_id,
+            'version': version,
+            'amount': latest['amount'],
+            'bidder': 'Anonymous',
+            'timestamp': latest['timestamp'],
+            'bids': updates[-MAX_BIDS_PER_FRAME:],
+            'bid_count': len(updates)
+        }, room=auction_room(auction_id))
+        publish_feed('price_changed', {
+            'auction_id': auction_id,
+            'version': version,
+            'current_bid': latest['amount'],
+            'bid_count': len(updates)
+        }, auction_id)
+
+
+bid_broadcaster = BidBroadcaster(app.config['BROADCAST_TICK_MS'])
+
+
+def new_bid(auction_id, bid):
+    bid_broadcaster.add(auction_id, bid)
+
+
+def auction_created(auction):
+    # To the matching feed subscribers, so listing pages can show new auctions as they open
+    publish_feed('auction_created', {
+        'auction_id': auction.id,
+        'title': auction.title,
+        'category': auction.category,
+        'location': auction.location,
+        'city': auction.city,
+        'state': auction.state,
+        'location_type': auction.location_type,
+        'starting_bid': auction.starting_bid,
+        'end_time': auction.end_time.isoformat()
+    }, auction.id, auction)
+
+
+def auction_ended(auction_id, winner):
+    bid_broadcaster.flush(auction_id)
+    data = {
+        'auction_id': auction_id,
+        'winning_bid': winner.amount if winner else None,
+        'winning_bid_id': winner.id if winner else None
+    }
+    # One emit to the room and the feed, so a client in both receives it once
+    publish('auction_ended', data, room=[auction_room(auction_id)] + feed_rooms(auction_id))
+    # Without a message queue the delivery handlers never run
+    _feed_rooms.pop(auction_id, None)
+
+
+def _forget_feed_rooms(data):
+    # Every worker that delivers auction_ended drops the auction's rooms, not just the one that closed it
+    _feed_rooms.pop(data['auction_id'], None)
+
+
+on_delivery('auction_ended', _forget_feed_rooms)
@@ -0,0 +1,55 @@
+from itertools import combinations
+
+# Listing feed subscriptions.
+#
+# A client subscribes with a filter over FEED_ATTRIBUTES, e.g.
+# {"category": "cleaning", "city": "Pune"}; attributes left out match
+# anything, so {} follows every auction. Each distinct filter is a Socket.IO
+# room, and the client manager's room table (room -> sids) is the inverted
+# index from filter to subscribers.
+#
+# An auction with k of the attributes set matches exactly the filters made
+# of a subset of its own attribute values, so publishing emits to those 2^k
+# rooms (at most 16) in one call, whatever the number of subscribers. A
+# client in several matching rooms still receives the event once, and with
+# SOCKETIO_MESSAGE_QUEUE set the room list travels with the event, so every
+# worker delivers it to its own subscribers.
+
+FEED_ATTRIBUTES = ('category', 'city', 'state', 'location_type')
+
+FEED_ROOM_PREFIX = 'feed'
+
+
+def _normalize(value):
+    return str(value).strip().lower()
+
+
+def parse_filter(data):
+    """Return the filter as sorted (attribute, value) pairs; raises ValueError for unknown attributes."""
+    data = data or {}
+    unknown = sorted(set(data) - set(FEED_ATTRIBUTES))
+    if unknown:
+        raise ValueError(f"Unknown feed filter: {', '.join(unknown)}")
+    return tuple(
+        (name, _normalize(data[name]))
+        for name in FEED_ATTRIBUTES
+        if data.get(name) not in (None, '')
+    )
+
+
+def filter_room(pairs):
+    return FEED_ROOM_PREFIX + ''.join(f'|{name}={value}' for name, value in pairs)
+
+
+def is_feed_room(room):
+    return room == FEED_ROOM_PREFIX or room.startswith(FEED_ROOM_PREFIX + '|')
+
+
+def auction_rooms(auction):
+    """Return the rooms of every filter the auction matches."""
+    pairs = parse_filter({name: getattr(auction, name) for name in FEED_ATTRIBUTES})
+    return [
+        filter_room(subset)
+        for size in range(len(pairs) + 1)
+        for subset in combinations(pairs, size)
+    ]
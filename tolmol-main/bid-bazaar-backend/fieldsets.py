@@ -0,0 +1,78 @@
+from sqlalchemy.orm import joinedload, load_only
+from models import Auction, User
+
+# Sparse fieldsets for the auction listing.
+#
+# fields= names the attributes a client wants, one by one ("id,title") or
+# through a profile: "card" for listing cards, "full" for everything (the
+# default, matching the payload before fields= existed). Profiles and names
+# can be mixed ("card,description"). The same choice limits the columns
+# loaded (load_only, plus the creator join only when creator is asked for)
+# and the keys serialized.
+
+# name -> (columns it reads, serializer)
+FIELDS = {
+    'id': (('id',), lambda auction: auction.id),
+    'title': (('title',), lambda auction: auction.title),
+    'description': (('description',), lambda auction: auction.description),
+    'category': (('category',), lambda auction: auction.category),
+    'location': (('location',), lambda auction: auction.location),
+    'starting_bid': (('starting_bid',), lambda auction: auction.starting_bid),
+    'current_bid': (('current_bid',), lambda auction: auction.current_bid),
+    'end_time': (('end_time',), lambda auction: auction.end_time.isoformat()),
+    'is_active': (('is_active',), lambda auction: auction.is_active),
+    'is_hot_deal': (('is_hot_deal',), lambda auction: auction.is_hot_deal),
+    'created_at': (('created_at',), lambda auction: auction.created_at.isoformat()),
+    'creator': (('creator_id',), lambda auction: {
+        'username': auction.creator.username,
+        'email': auction.creator.email
+    }),
+    'creator_id': (('creator_id',), lambda auction: auction.creator_id),
+    'time_remaining': (('end_time',), lambda auction: (
+        auction.time_remaining.total_seconds() if not auction.is_expired else 0
+    )),
+    'lowest_bid': (('current_bid', 'starting_bid'), lambda auction: auction.get_lowest_bid()),
+    'bids': ((), lambda auction: []),  # Will be populated if needed
+}
+
+PROFILES = {
+    'card': ('id', 'title', 'category', 'location', 'lowest_bid', 'end_time', 'time_remaining',
+             'is_active', 'is_hot_deal'),
+    'full': tuple(FIELDS),
+}
+
+DEFAULT_PROFILE = 'full'
+
+# Pagination reads these whatever the client asked for
+PAGINATION_COLUMNS = ('id', 'created_at')
+
+
+def parse_fields(value):
+    """Return the requested field names in a fixed order; raises ValueError for unknown names."""
+    names = {'id'}
+    for name in (value or DEFAULT_PROFILE).split(','):
+        name = name.strip()
+        if not name:
+            continue
+        if name in PROFILES:
+            names.update(PROFILES[name])
+        elif name in FIELDS:
+            names.add(name)
+        else:
+            raise ValueError(f'Unknown field: {name}')
+    return tuple(name for name in FIELDS if name in names)
+
+
+def load_options(fields, extra_columns=()):
+    """Query options loading only what the fields need."""
+    columns = set(PAGINATION_COLUMNS) | set(extra_columns)
+    for name in fields:
+        columns.update(FIELDS[name][0])
+    options = [load_only(*(getattr(Auction, column) for column in sorted(columns)))]
+    if 'creator' in fields:
+        options.append(joinedload(Auction.creator).load_only(User.username, User.email))
+    return options
+
+
+def serialize(auction, fields):
+    return {name: FIELDS[name][1](auction) for name in fields}
@@ -0,0 +1,150 @@
+import os
+import re
+import threading
+from array import array
+
+# Offline geocoding of the city/state/location an auction is created with.
+#
+# data/gazetteer_in.tsv lists Indian states, cities and city localities with
+# their alternate names. It is loaded once into dictionaries of normalized
+# name -> row number plus one flat array of coordinates, so a lookup is a few
+# dict hits with no network call.
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gazetteer_in.tsv')
+
+# Entries of forms.AuctionForm.state that are cities rather than states
+CITY_STATE_SLUGS = {
+    'mumbai': 'maharashtra',
+    'kolkata': 'west-bengal',
+    'chennai': 'tamil-nadu',
+}
+
+
+def normalize(name):
+    name = re.sub(r'[-_./]', ' ', (name or '').lower())
+    name = re.sub(r'[^a-z0-9 ]', '', name)
+    return ' '.join(name.split())
+
+
+class Gazetteer:
+    def __init__(self, path=DATA_PATH):
+        self.path = path
+        self.names = []
+        self.kinds = []
+        self._coords = array('d')
+        self._states = {}
+        self._state_slugs = {}
+        self._cities = {}
+        self._cities_by_name = {}
+        self._localities = {}
+        self._localities_by_name = {}
+        self._aliases = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.path, encoding='utf-8') as f:
+                rows = [line.rstrip('\n').split('\t') for line in f if line.strip() and not line.startswith('#')]
+
+            # States and cities first so localities can refer to their city
+            for kind in ('state', 'city', 'locality'):
+                for row_kind, name, aliases, state, city, latitude, longitude in rows:
+                    if row_kind == kind:
+                        self._add(kind, name, aliases, state, city, float(latitude), float(longitude))
+            self._loaded = True
+
+    def _add(self, kind, name, aliases, state, city, latitude, longitude):
+        index = len(self.names)
+        self.names.append(name)
+        self.kinds.append(kind)
+        self._coords.extend((latitude, longitude))
+
+        keys = [normalize(name)] + [normalize(alias) for alias in aliases.split('|') if alias]
+        for key in keys:
+            self._aliases.setdefault(key, keys[0])
+        if kind == 'state':
+            self._states[state] = index
+            for key in keys + [normalize(state)]:
+                self._state_slugs.setdefault(key, state)
+            return
+        for key in keys:
+            if kind == 'city':
+                self._cities.setdefault((state, key), index)
+                self._cities_by_name.setdefault(key, index)
+            else:
+                parent = self._cities.get((state, normalize(city)))
+                self._localities.setdefault((parent, key), index)
+                self._localities_by_name.setdefault(key, []).append(index)
+
+    def aliases(self):
+        """Map every normalized name and alternate name to its canonical name."""
+        self.load()
+        return self._aliases
+
+    def coordinates(self, index):
+        return self._coords[2 * index], self._coords[2 * index + 1]
+
+    def find_city(self, name, state=None):
+        key = normalize(name)
+        if not key:
+            return None
+        if state:
+            index = self._cities.get((state, key))
+            if index is not None:
+                return index
+        return self._cities_by_name.get(key)
+
+    def find_locality(self, name, city_index=None):
+        key = normalize(name)
+        if city_index is not None:
+            return self._localities.get((city_index, key))
+        matches = self._localities_by_name.get(key, [])
+        # An ambiguous locality name without a city says nothing
+        return matches[0] if len(matches) == 1 else None
+
+    def resolve(self, city=None, state=None, location=None):
+        """Return (index, kind) of the most precise match, or None."""
+        self.load()
+        state = (state or '').strip().lower()
+        if state in CITY_STATE_SLUGS:
+            city = city or state
+            state = CITY_STATE_SLUGS[state]
+        # "Tamil Nadu", "tamil nadu" and alternate names stand for the slug "tamil-nadu"
+        state = self._state_slugs.get(normalize(state), state)
+
+        parts = [part for part in (location or '').split(',') if part.strip()]
+        city_index = self.find_city(city, state) if city else None
+        if city_index is None:
+            # "Andheri, Mumbai" carries the city in the free-text location
+            for part in reversed(parts):
+                city_index = self.find_city(part, state)
+                if city_index is not None:
+                    break
+
+        for part in parts:
+            # "Koramangala 5th Block" and "Andheri West" fall back to their leading words
+            words = normalize(part).split()
+            for end in range(len(words), 0, -1):
+                index = self.find_locality(' '.join(words[:end]), city_index)
+                if index is not None:
+                    return index, 'locality'
+        if city_index is not None:
+            return city_index, 'city'
+        if state in self._states:
+            return self._states[state], 'state'
+        return None
+
+    def locate(self, city=None, state=None, location=None):
+        """Return (latitude, longitude) for an auction's place fields, or None."""
+        match = self.resolve(city, state, location)
+        if match is None:
+            return None
+        return self.coordinates(match[0])
+
+
+gazetteer = Gazetteer()
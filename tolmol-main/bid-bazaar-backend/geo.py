@@ -0,0 +1,163 @@
+import math
+from sqlalchemy import and_, func, select, union_all
+
+# Geohash helpers for location queries.
+#
+# Auctions store the geohash of their coordinates in an indexed column. A
+# "near me" query turns the service radius of each auction into a geohash
+# precision whose cells are at least that wide, so the auctions that can
+# cover a point all sit in the point's cell or one of its 8 neighbours at
+# that precision. Each radius band is then a handful of indexed prefix range
+# scans, and the exact distance check only runs on those candidates.
+#
+# Every (band, cell range) pair is its own SELECT bounded on both sides
+# (geohash >= lo AND geohash < hi), joined with UNION ALL, and the listing
+# joins auctions to those ids by primary key. One OR over all of them would
+# leave the planner a single geohash IS NOT NULL range over every active
+# auction, checked row by row. Bands and cells do not overlap, so no id comes
+# back twice.
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+MAX_PRECISION = 9
+STORED_PRECISION = 9
+
+
+def encode(latitude, longitude, precision=STORED_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_degrees(precision):
+    # Height and width of a cell in degrees; longitude gets the extra odd bit
+    total_bits = 5 * precision
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lng_bits)
+
+
+def cell_km(precision, latitude):
+    height, width = cell_degrees(precision)
+    return height * KM_PER_DEGREE, width * KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+
+
+def neighbours(latitude, longitude, precision):
+    # The point's own cell and the 8 around it
+    height, width = cell_degrees(precision)
+    cells = set()
+    for dlat in (-height, 0, height):
+        lat = min(max(latitude + dlat, -89.999999), 89.999999)
+        for dlng in (-width, 0, width):
+            lng = (longitude + dlng + 180.0) % 360.0 - 180.0
+            cells.add(encode(lat, lng, precision))
+    return cells
+
+
+def radius_bands(latitude):
+    # (precision, min_radius_km, max_radius_km): a 3x3 block at this precision covers any radius in the band
+    bands = []
+    upper = None
+    for precision in range(1, MAX_PRECISION + 1):
+        reach = min(cell_km(precision, latitude))
+        if upper is not None:
+            bands.append((precision - 1, reach, upper))
+        upper = reach
+    bands.append((MAX_PRECISION, 0.0, upper))
+    return bands
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def parse_point(value):
+    latitude, longitude = (float(part) for part in value.split(','))
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError('Coordinates out of range')
+    return latitude, longitude
+
+
+def prefix_match(column, prefix):
+    # Index-friendly "starts with" as a range scan
+    return and_(column >= prefix, column < prefix + '~')
+
+
+def prefix_ranges(cells):
+    # Sorted [lo, hi) geohash ranges covering the cells, neighbouring cells merged into one range
+    ranges = []
+    for cell in sorted(cells):
+        if ranges:
+            lo, last = ranges[-1]
+            if last[:-1] == cell[:-1] and BASE32.index(last[-1]) + 1 == BASE32.index(cell[-1]):
+                ranges[-1] = (lo, cell)
+                continue
+        ranges.append((cell, cell))
+    return [(lo, last + '~') for lo, last in ranges]
+
+
+def covering_ids(id_column, geohash_column, radius_column, latitude, longitude, *filters, default_radius=50):
+    """Subquery of the ids that can cover the point: one bounded range scan per band and cell range.
+
+    filters are applied in every scan, so they should lead the geohash index (e.g. is_active).
+    """
+    radius = func.coalesce(radius_column, default_radius)
+    bands = radius_bands(latitude)
+    scans = []
+    for precision, low, high in bands:
+        for lo, hi in prefix_ranges(neighbours(latitude, longitude, precision)):
+            scans.append(select(id_column).where(
+                *filters, geohash_column >= lo, geohash_column < hi, radius > low, radius <= high
+            ))
+    # Radii wider than the coarsest cell can reach anywhere; a range on the radius index finds them
+    reach = bands[0][2]
+    scans.append(select(id_column).where(*filters, radius_column > reach, geohash_column.isnot(None)))
+    if default_radius > reach:
+        scans.append(select(id_column).where(*filters, radius_column.is_(None), geohash_column.isnot(None)))
+    return union_all(*scans).subquery('covering')
+
+
+def within_radius(auctions, latitude, longitude, default_radius=50):
+    # Exact check on the candidates, nearest first
+    ranked = []
+    for auction in auctions:
+        if auction.latitude is None or auction.longitude is None:
+            continue
+        distance = haversine_km(latitude, longitude, auction.latitude, auction.longitude)
+        if distance <= (auction.radius_km or default_radius):
+            ranked.append((distance, auction))
+    ranked.sort(key=lambda item: (item[0], item[1].id))
+    return ranked
@@ -0,0 +1,58 @@
+import sys
+import logging
+from sqlalchemy import update
+from app import app, db
+from models import Auction
+from gazetteer import gazetteer
+import geo
+
+# Fills latitude/longitude for auctions created without coordinates.
+#
+#     python geocode_backfill.py [batch_size]
+#
+# Walks auctions missing coordinates in id order, geocodes each batch with
+# the offline gazetteer and writes it back with one bulk UPDATE and commit.
+# Rows the gazetteer cannot place are left as they are, so the job can be
+# rerun after the data file grows.
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def backfill(batch_size=DEFAULT_BATCH_SIZE):
+    last_id = 0
+    scanned = 0
+    located = 0
+    while True:
+        rows = db.session.query(Auction.id, Auction.city, Auction.state, Auction.location).filter(
+            Auction.latitude.is_(None),
+            Auction.id > last_id
+        ).order_by(Auction.id).limit(batch_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        scanned += len(rows)
+
+        changes = []
+        for row in rows:
+            point = gazetteer.locate(row.city, row.state, row.location)
+            if point:
+                # Bulk updates skip the ORM hooks, so the geohash is set here
+                changes.append({
+                    'id': row.id,
+                    'latitude': point[0],
+                    'longitude': point[1],
+                    'geohash': geo.encode(*point)
+                })
+        if changes:
+            db.session.execute(update(Auction), changes)
+            db.session.commit()
+            located += len(changes)
+        logging.info(f"Geocoded {located} of {scanned} auctions")
+    return scanned, located
+
+
+if __name__ == '__main__':
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BATCH_SIZE
+    with app.app_context():
+        scanned, located = backfill(batch_size)
+    print(f"Geocoded {located} of {scanned} auctions without coordinates")
@@ -0,0 +1,107 @@
+import threading
+import time
+from datetime import datetime
+from app import app, db
+from models import Auction
+from message_queue import on_delivery
+
+# In-memory state of live auctions for the socket status requests.
+#
+# Each entry holds an auction's current (lowest) bid, end time, active flag
+# and version. Entries are loaded from the database on first use and then
+# kept current by the bid engine (record_bid, after each stored bid) and the
+# scheduler (close), so request_auction_update is answered without a query.
+#
+# The version counts changes like Auction.version does, one per stored bid
+# and one for the close, so a client can send the version it holds and get
+# a short "unchanged" reply.
+#
+# Bids stored by other processes do not reach this table, so an entry is
+# reloaded once it is LIVE_STATE_TTL seconds old. A reload never moves an
+# entry back to an older version.
+#
+# Ended auctions leave the table: close() evicts the entry, in every worker
+# that delivers the auction_ended event, and a load that finds the auction
+# inactive does not store it.
+
+DEFAULT_TTL_SECONDS = 5
+
+
+class LiveEntry:
+    __slots__ = ('current_bid', 'end_time', 'is_active', 'version', 'expires_at')
+
+    def __init__(self, current_bid, end_time, is_active, version, expires_at):
+        self.current_bid = current_bid
+        self.end_time = end_time
+        self.is_active = is_active
+        self.version = version
+        self.expires_at = expires_at
+
+    def status(self):
+        # The same fields as Auction.live_status(), plus the version
+        now = datetime.utcnow()
+        is_open = self.is_active and self.end_time > now
+        return {
+            'current_bid': self.current_bid,
+            'time_remaining': (self.end_time - now).total_seconds() if is_open else 0,
+            'is_active': is_open,
+            'version': self.version
+        }
+
+
+class LiveState:
+    def __init__(self, ttl=DEFAULT_TTL_SECONDS):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, auction_id):
+        """Return the auction's live entry, loading it if missing or old; None if there is no such auction."""
+        entry = self._entries.get(auction_id)
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry
+        return self._load(auction_id)
+
+    def _load(self, auction_id):
+        row = db.session.query(
+            Auction.current_bid, Auction.starting_bid, Auction.end_time, Auction.is_active, Auction.version
+        ).filter(Auction.id == auction_id).first()
+        if row is None:
+            return None
+
+        loaded = LiveEntry(
+            row.current_bid or row.starting_bid, row.end_time, row.is_active, row.version,
+            time.monotonic() + self.ttl
+        )
+        with self._lock:
+            if not row.is_active:
+                self._entries.pop(auction_id, None)
+                return loaded
+            entry = self._entries.get(auction_id)
+            if entry is not None and entry.version > loaded.version:
+                # Bids recorded here after the read began are newer than the row
+                entry.expires_at = loaded.expires_at
+                return entry
+            self._entries[auction_id] = loaded
+            return loaded
+
+    def record_bid(self, auction_id, amount):
+        with self._lock:
+            entry = self._entries.get(auction_id)
+            if entry is None:
+                return
+            # Prices only fall; a stored bid reported late still counts as a change
+            entry.current_bid = min(entry.current_bid, amount)
+            entry.version += 1
+
+    def close(self, auction_id):
+        with self._lock:
+            entry = self._entries.pop(auction_id, None)
+            # Whoever still holds the entry sees the auction closed
+            if entry is not None and entry.is_active:
+                entry.is_active = False
+                entry.version += 1
+
+
+live_state = LiveState(app.config['LIVE_STATE_TTL'])
+on_delivery('auction_ended', lambda data: live_state.close(data['auction_id']))
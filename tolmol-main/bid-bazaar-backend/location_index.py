@@ -0,0 +1,156 @@
+import threading
+import time
+from sqlalchemy import or_
+from app import db
+from gazetteer import gazetteer, normalize
+from trigram import closest, postings, similarity, trigrams
+
+# Alias-aware, typo-tolerant location filter.
+#
+# Every auction stores a canonical location_key: its free-text location, city
+# and state, normalized, with alternate place names from the gazetteer
+# rewritten to one spelling ("bombay" -> "mumbai"). location_key is indexed.
+#
+# A location search is canonicalized the same way, and a misspelt place name
+# is corrected to the closest gazetteer name ("gurgoan" -> "gurugram"). The
+# result is matched against the distinct keys in memory through a trigram
+# index, and the query becomes an indexed location_key IN (...) filter
+# instead of a substring scan over every row. A popular place can match more
+# keys than fit a sensible IN list; then the keys with a word starting with
+# the search go through a LIKE on location_key and only the rest are listed.
+#
+# The key vocabulary is loaded lazily, grows as this process writes auctions
+# and is reloaded every VOCABULARY_TTL_SECONDS to pick up other processes.
+
+MAX_ALIAS_WORDS = 4
+SIMILARITY_THRESHOLD = 0.6
+# Looser, as for pg_trgm: only the single closest place name is taken
+CORRECTION_THRESHOLD = 0.3
+# Longest IN list before keys containing the search are matched with LIKE instead
+MAX_IN_KEYS = 200
+VOCABULARY_TTL_SECONDS = 60
+
+
+def canonicalize(text):
+    # Rewrite the longest known place name at each position to its canonical spelling
+    words = normalize(text).split()
+    aliases = gazetteer.aliases()
+    result = []
+    i = 0
+    while i < len(words):
+        for size in range(min(MAX_ALIAS_WORDS, len(words) - i), 0, -1):
+            phrase = ' '.join(words[i:i + size])
+            if phrase in aliases:
+                result.append(aliases[phrase])
+                i += size
+                break
+        else:
+            result.append(words[i])
+            i += 1
+    return ' '.join(result)
+
+
+def location_key(location, city=None, state=None):
+    parts = []
+    for part in (location or '').split(',') + [city or '', state or '']:
+        part = canonicalize(part)
+        if part and part not in parts:
+            parts.append(part)
+    return ', '.join(parts)[:255]
+
+
+class LocationIndex:
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, ttl=VOCABULARY_TTL_SECONDS):
+        self.threshold = threshold
+        self.ttl = ttl
+        self._keys = set()
+        self._postings = {}
+        self._expires_at = 0
+        self._lock = threading.Lock()
+        self._places = None
+
+    def add(self, key):
+        if not key or key in self._keys:
+            return
+        with self._lock:
+            self._add(key)
+
+    def _add(self, key):
+        self._keys.add(key)
+        for gram in trigrams(key):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def _refresh(self):
+        if time.monotonic() < self._expires_at:
+            return
+        from models import Auction
+        rows = db.session.query(Auction.location_key).filter(
+            Auction.location_key.isnot(None)
+        ).distinct().all()
+        with self._lock:
+            self._keys = set()
+            self._postings = {}
+            for (key,) in rows:
+                self._add(key)
+            self._expires_at = time.monotonic() + self.ttl
+
+    def correct(self, text):
+        """Return the canonical gazetteer name closest to a misspelt place, or None."""
+        if self._places is None:
+            self._places = postings(gazetteer.aliases())
+        best = closest(normalize(text), self._places, CORRECTION_THRESHOLD)
+        return gazetteer.aliases()[best] if best else None
+
+    def match(self, text):
+        """Return the stored location keys that match a location search."""
+        return self._lookup(text)[1]
+
+    def _lookup(self, text):
+        # (the canonical search the keys matched, the keys)
+        self._refresh()
+        query = canonicalize(text)
+        if not query:
+            return query, []
+
+        keys = self._match(query)
+        if not keys:
+            corrected = self.correct(text)
+            if corrected and corrected != query:
+                return corrected, self._match(corrected)
+        return query, keys
+
+    def _match(self, query):
+        query_grams = trigrams(query)
+        hits = {}
+        with self._lock:
+            for gram in query_grams:
+                for key in self._postings.get(gram, ()):
+                    hits[key] = hits.get(key, 0) + 1
+
+        # Too few shared trigrams cannot reach the threshold, skip scoring those keys
+        needed = max(1, int(len(query_grams) * self.threshold / 2))
+        scored = []
+        for key, count in hits.items():
+            if count < needed:
+                continue
+            score = similarity(query, key)
+            if score >= self.threshold:
+                scored.append((score, key))
+        scored.sort(reverse=True)
+        return [key for score, key in scored]
+
+    def apply_filter(self, query, text):
+        from models import Auction
+        term, keys = self._lookup(text)
+        if len(keys) <= MAX_IN_KEYS:
+            return query.filter(Auction.location_key.in_(keys))
+        # Canonical keys and searches are plain words, nothing to escape; a match starts a word
+        others = [key for key in keys if not key.startswith(term) and f' {term}' not in key]
+        return query.filter(or_(
+            Auction.location_key.like(f'{term}%'),
+            Auction.location_key.like(f'% {term}%'),
+            Auction.location_key.in_(others)
+        ))
+
+
+location_index = LocationIndex()
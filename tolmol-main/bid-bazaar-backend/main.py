@@ -2,6 +2,9 @@ from app import app, socketio
 import routes  # noqa: F401
 import api_routes  # noqa: F401
 import socket_events  # noqa: F401
+from auction_scheduler import auction_scheduler
+
+auction_scheduler.start()
 
 if __name__ == "__main__":
     socketio.run(app, host="0.0.0.0", port=5050, debug=True)
@@ -0,0 +1,153 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import func
+from app import db
+from models import Auction
+import geo
+
+# Server-side marker clustering for the map view.
+#
+# Tiles and clusters are geohash cells: a zoom level picks a tile precision,
+# and every tile is split into the 32 cells one character deeper. A tile is
+# one grouped query over the (is_active, geohash) index returning a count and
+# centroid per cluster cell, so the response size depends on the viewport,
+# not on how many auctions it holds.
+#
+# Tiles are cached per process. Creating or closing an auction drops only the
+# tiles that contain it; the TTL bounds how stale another process's tiles get.
+
+MAX_TILES = 64
+TILE_TTL_SECONDS = 300
+MAX_CACHED_TILES = 4096
+
+
+def tile_precision(zoom):
+    # A geohash cell of precision p is about 360 / 2**(5p/2) degrees wide, as is a map tile at zoom 5p/2
+    return max(1, min(geo.STORED_PRECISION - 1, int(zoom * 2 / 5) + 1))
+
+
+def parse_bbox(value):
+    west, south, east, north = (float(part) for part in value.split(','))
+    if not (-90 <= south < north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError('Invalid bbox')
+    return west, south, east, north
+
+
+def _lng_spans(west, east):
+    # A box crossing the antimeridian is two boxes
+    if west <= east:
+        return [(west, east)]
+    return [(west, 180.0), (-180.0, east)]
+
+
+def tile_count(bbox, precision):
+    # How many tiles covering_tiles returns, without building them (an upper bound across the antimeridian)
+    west, south, east, north = bbox
+    height, width = geo.cell_degrees(precision)
+    rows = math.ceil((north + 90) / height) - math.floor((south + 90) / height)
+    columns = sum(
+        math.ceil((span_east + 180) / width) - math.floor((span_west + 180) / width)
+        for span_west, span_east in _lng_spans(west, east)
+    )
+    return max(rows, 1) * max(columns, 1)
+
+
+def covering_tiles(bbox, precision):
+    west, south, east, north = bbox
+    height, width = geo.cell_degrees(precision)
+    tiles = set()
+    lat = math.floor((south + 90) / height) * height - 90
+    while lat < north:
+        for span_west, span_east in _lng_spans(west, east):
+            lng = math.floor((span_west + 180) / width) * width - 180
+            while lng < span_east:
+                tiles.add(geo.encode(lat + height / 2, lng + width / 2, precision))
+                lng += width
+        lat += height
+    return tiles
+
+
+def _in_bbox(latitude, longitude, bbox):
+    west, south, east, north = bbox
+    if not south <= latitude <= north:
+        return False
+    return any(span_west <= longitude <= span_east for span_west, span_east in _lng_spans(west, east))
+
+
+class MapTileCache:
+    def __init__(self, ttl=TILE_TTL_SECONDS, max_tiles=MAX_CACHED_TILES):
+        self.ttl = ttl
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clusters(self, bbox, zoom):
+        precision = tile_precision(zoom)
+        # Very wide boxes at a high zoom fall back to coarser tiles, chosen before any tile is built
+        while precision > 1 and tile_count(bbox, precision) > MAX_TILES:
+            precision -= 1
+        tiles = covering_tiles(bbox, precision)
+
+        clusters = []
+        for tile in sorted(tiles):
+            for cluster in self._tile(tile):
+                if _in_bbox(cluster['latitude'], cluster['longitude'], bbox):
+                    clusters.append(cluster)
+        return precision, clusters
+
+    def invalidate(self, geohash):
+        if not geohash:
+            return
+        with self._lock:
+            for precision in range(1, geo.STORED_PRECISION):
+                self._tiles.pop(geohash[:precision], None)
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+
+    def _tile(self, tile):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._tiles.get(tile)
+            if cached and cached[1] > now:
+                self._tiles.move_to_end(tile)
+                return cached[0]
+
+        clusters = self._load(tile)
+        with self._lock:
+            self._tiles[tile] = (clusters, now + self.ttl)
+            self._tiles.move_to_end(tile)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return clusters
+
+    def _load(self, tile):
+        cell = func.substr(Auction.geohash, 1, len(tile) + 1)
+        rows = db.session.query(
+            cell,
+            func.count(Auction.id),
+            func.avg(Auction.latitude),
+            func.avg(Auction.longitude),
+            func.min(Auction.id)
+        ).filter(
+            Auction.is_active == True,
+            geo.prefix_match(Auction.geohash, tile)
+        ).group_by(cell).all()
+
+        return [
+            {
+                'geohash': geohash,
+                'count': count,
+                'latitude': latitude,
+                'longitude': longitude,
+                # Lone markers link straight to their auction
+                'auction_id': auction_id if count == 1 else None
+            }
+            for geohash, count, latitude, longitude, auction_id in rows
+        ]
+
+
+map_tiles = MapTileCache()
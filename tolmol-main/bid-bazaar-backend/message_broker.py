@@ -0,0 +1,119 @@
+import sys
+import logging
+import socketserver
+import threading
+
+# Local stand-in for Redis pub/sub, for development and benchmarks.
+#
+#     python message_broker.py [port]
+#
+# Speaks the subset of RESP that message_queue.RespPubSubManager uses:
+# SUBSCRIBE, PUBLISH, PING, and AUTH/SELECT (accepted and ignored). Point
+# every worker at it with SOCKETIO_MESSAGE_QUEUE=redis://127.0.0.1:<port>.
+
+DEFAULT_PORT = 6380
+
+
+def _bulk(value):
+    data = value if isinstance(value, bytes) else str(value).encode()
+    return b'$%d\r\n%s\r\n' % (len(data), data)
+
+
+def _array(*values):
+    return b'*%d\r\n' % len(values) + b''.join(
+        b':%d\r\n' % value if isinstance(value, int) else _bulk(value) for value in values
+    )
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+        self.channels = set()
+
+    def _command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def send(self, data):
+        with self.write_lock:
+            self.wfile.write(data)
+
+    def handle(self):
+        broker = self.server
+        try:
+            while True:
+                args = self._command()
+                if args is None:
+                    return
+                name = args[0].decode().upper()
+                if name == 'SUBSCRIBE':
+                    for channel in args[1:]:
+                        broker.subscribe(channel, self)
+                        self.channels.add(channel)
+                        self.send(_array(b'subscribe', channel, len(self.channels)))
+                elif name == 'PUBLISH':
+                    self.send(b':%d\r\n' % broker.publish(args[1], args[2]))
+                elif name == 'PING':
+                    self.send(b'+PONG\r\n')
+                elif name in ('AUTH', 'SELECT'):
+                    self.send(b'+OK\r\n')
+                else:
+                    self.send(b'-ERR unknown command\r\n')
+        except (OSError, ValueError):
+            pass
+        finally:
+            for channel in self.channels:
+                broker.unsubscribe(channel, self)
+
+
+class MessageBroker(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, _Handler)
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, handler):
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(handler)
+
+    def unsubscribe(self, channel, handler):
+        with self._lock:
+            self._subscribers.get(channel, set()).discard(handler)
+
+    def publish(self, channel, message):
+        with self._lock:
+            handlers = list(self._subscribers.get(channel, ()))
+        frame = _array(b'message', channel, message)
+        delivered = 0
+        for handler in handlers:
+            try:
+                handler.send(frame)
+                delivered += 1
+            except OSError:
+                self.unsubscribe(channel, handler)
+        return delivered
+
+
+def start(port=0, host='127.0.0.1'):
+    """Run a broker in a background thread; returns it (server_address has the port)."""
+    broker = MessageBroker((host, port))
+    threading.Thread(target=broker.serve_forever, daemon=True).start()
+    return broker
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    broker = MessageBroker(('0.0.0.0', port))
+    logging.info(f"Message broker listening on port {port}")
+    broker.serve_forever()
@@ -0,0 +1,101 @@
+import json
+import logging
+import socketio
+from cache import RedisBackend, RedisError
+
+# Cross-process Socket.IO fan-out.
+#
+# Without a message queue each worker only reaches the clients connected to
+# it. With SOCKETIO_MESSAGE_QUEUE set, every emit is delivered to this
+# worker's own clients and published on SOCKETIO_CHANNEL; every other worker
+# and node subscribed to the channel delivers it to its clients in the room.
+#
+#   redis://host:6379/0  Redis, or any server speaking its PUBLISH/SUBSCRIBE
+#                        (message_broker.py is a local stand-in); spoken
+#                        through the cache's RESP client, no extra package
+#   rediss://, amqp://, kafka://, zmq+tcp://
+#                        handed to Flask-SocketIO's own managers, which need
+#                        their client libraries installed
+#
+# The subscriber blocks on a socket in a background task, so eventlet
+# deployments must run monkey-patched (gunicorn's eventlet worker does this).
+#
+# Per-worker state tied to an event (e.g. events._feed_rooms for an ended
+# auction) is cleaned by handlers registered with on_delivery(): every
+# worker runs them as it delivers the event, whichever worker emitted it.
+
+RECONNECT_SECONDS = 1
+
+# event -> handlers called with the event's data on delivery
+_delivery_handlers = {}
+
+
+def on_delivery(event, handler):
+    _delivery_handlers.setdefault(event, []).append(handler)
+
+
+def delivered(message):
+    for handler in _delivery_handlers.get(message.get('event'), ()):
+        try:
+            handler(message.get('data'))
+        except Exception as e:
+            logging.error(f"Delivery handler error: {str(e)}")
+
+
+def watch_deliveries(manager):
+    """Run the delivery handlers for emits handled by a queue manager Flask-SocketIO built."""
+    if not isinstance(manager, socketio.PubSubManager) or isinstance(manager, RespPubSubManager):
+        return
+    handle_emit = manager._handle_emit
+
+    def _handle_emit(message):
+        delivered(message)
+        handle_emit(message)
+
+    manager._handle_emit = _handle_emit
+
+
+class RespPubSubManager(socketio.PubSubManager):
+    name = 'resp'
+
+    def __init__(self, url, channel='socketio', write_only=False, logger=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+        self.url = url
+        self.publisher = RedisBackend(url)
+        self.published = 0
+        self.errors = 0
+
+    def _publish(self, data):
+        # The emit already reached this worker's clients; a queue outage must not fail the request
+        try:
+            self.publisher.publish(self.channel, json.dumps(data))
+            self.published += 1
+        except (OSError, EOFError, RedisError) as e:
+            self.errors += 1
+            logging.error(f"Message queue publish error: {str(e)}")
+
+    def _handle_emit(self, message):
+        # Emits from this worker and from the others both arrive here
+        delivered(message)
+        super()._handle_emit(message)
+
+    def _listen(self):
+        subscriber = RedisBackend(self.url)
+        while True:
+            try:
+                yield from subscriber.subscribe(self.channel)
+            except (OSError, EOFError, RedisError) as e:
+                logging.error(f"Message queue subscribe error: {str(e)}")
+                self.server.sleep(RECONNECT_SECONDS)
+
+
+def socketio_options(config):
+    """Keyword arguments for SocketIO() that attach the configured message queue."""
+    url = config.get('SOCKETIO_MESSAGE_QUEUE')
+    channel = config.get('SOCKETIO_CHANNEL', 'socketio')
+    if not url:
+        return {}
+    if url.startswith('redis://'):
+        return {'client_manager': RespPubSubManager(url, channel=channel)}
+    # Flask-SocketIO picks the manager for these from the URL scheme
+    return {'message_queue': url, 'channel': channel}
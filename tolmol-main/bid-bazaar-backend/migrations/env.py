@@ -0,0 +1,68 @@
+"""
+Alembic Environment for the Flask application
+
+Runs migrations against the live Flask schema (models.py). Select it with
+the [flask] section of alembic.ini:
+
+    alembic -n flask upgrade head
+
+Databases created by db.create_all() before this chain existed should be
+stamped at the baseline first: ``alembic -n flask stamp 0001``.
+"""
+
+import os
+from logging.config import fileConfig
+
+from alembic import context
+
+# Importing the app must not create tables behind Alembic's back
+os.environ["AUTO_CREATE_TABLES"] = "0"
+
+from app import app, db  # noqa: E402
+import models  # noqa: F401,E402
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = db.metadata
+
+
+def get_url():
+    """Use the same database URL as the running Flask app."""
+    return app.config["SQLALCHEMY_DATABASE_URI"]
+
+
+def run_migrations_offline() -> None:
+    """Run migrations in 'offline' mode, emitting SQL to the script output."""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode on the Flask-SQLAlchemy engine."""
+    with app.app_context():
+        with db.engine.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                render_as_batch=True,
+            )
+
+            with context.begin_transaction():
+                context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,74 @@
+"""Flask schema baseline
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-16 09:00:00
+
+The user, auction and bid tables as db.create_all() created them before
+migrations were introduced.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('password_hash', sa.String(length=256), nullable=False),
+        sa.Column('is_service_provider', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username'),
+        sa.UniqueConstraint('email'),
+    )
+    op.create_table(
+        'auction',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('location', sa.String(length=200), nullable=False),
+        sa.Column('starting_bid', sa.Float(), nullable=False),
+        sa.Column('current_bid', sa.Float(), nullable=True),
+        sa.Column('end_time', sa.DateTime(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_hot_deal', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('location_type', sa.String(length=20), nullable=True),
+        sa.Column('city', sa.String(length=100), nullable=True),
+        sa.Column('state', sa.String(length=100), nullable=True),
+        sa.Column('latitude', sa.Float(), nullable=True),
+        sa.Column('longitude', sa.Float(), nullable=True),
+        sa.Column('radius_km', sa.Integer(), nullable=True),
+        sa.Column('creator_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['creator_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'bid',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('auction_id', sa.Integer(), nullable=False),
+        sa.Column('bidder_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['auction_id'], ['auction.id']),
+        sa.ForeignKeyConstraint(['bidder_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('bid')
+    op.drop_table('auction')
+    op.drop_table('user')
@@ -0,0 +1,53 @@
+"""Winning bid column and hot-path indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16 09:30:00
+
+Adds auction.winning_bid_id (set by the expiry scheduler) and the composite
+indexes behind the listing, scheduler, dashboard and bid-history queries.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('auction') as batch_op:
+        batch_op.add_column(sa.Column('winning_bid_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_auction_winning_bid_id', 'bid', ['winning_bid_id'], ['id'])
+
+    # Listing: WHERE is_active ORDER BY created_at DESC, id DESC
+    op.create_index('ix_auction_active_created', 'auction', ['is_active', 'created_at', 'id'])
+    # Listing filtered by category, same order
+    op.create_index('ix_auction_category_active_created', 'auction', ['category', 'is_active', 'created_at', 'id'])
+    # Expiry scheduler: active auctions by end_time
+    op.create_index('ix_auction_active_end_time', 'auction', ['is_active', 'end_time'])
+    # Provider dashboard: WHERE creator_id ORDER BY created_at DESC
+    op.create_index('ix_auction_creator_created', 'auction', ['creator_id', 'created_at'])
+    # Bid history: WHERE auction_id ORDER BY created_at DESC
+    op.create_index('ix_bid_auction_created', 'bid', ['auction_id', 'created_at'])
+    # Lowest bid / winner: WHERE auction_id ORDER BY amount
+    op.create_index('ix_bid_auction_amount', 'bid', ['auction_id', 'amount'])
+    # Bidder dashboard: WHERE bidder_id ORDER BY created_at DESC
+    op.create_index('ix_bid_bidder_created', 'bid', ['bidder_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bid_bidder_created', table_name='bid')
+    op.drop_index('ix_bid_auction_amount', table_name='bid')
+    op.drop_index('ix_bid_auction_created', table_name='bid')
+    op.drop_index('ix_auction_creator_created', table_name='auction')
+    op.drop_index('ix_auction_active_end_time', table_name='auction')
+    op.drop_index('ix_auction_category_active_created', table_name='auction')
+    op.drop_index('ix_auction_active_created', table_name='auction')
+
+    with op.batch_alter_table('auction') as batch_op:
+        batch_op.drop_constraint('fk_auction_winning_bid_id', type_='foreignkey')
+        batch_op.drop_column('winning_bid_id')
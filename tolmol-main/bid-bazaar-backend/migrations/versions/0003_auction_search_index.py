@@ -0,0 +1,68 @@
+"""Full-text search index on auction title and description
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16 10:00:00
+
+SQLite: an external-content FTS5 table kept in step by triggers.
+PostgreSQL: a generated, weighted tsvector column with a GIN index.
+Must stay in line with search_index.py.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS auction_fts USING fts5(
+                title, description,
+                content='auction', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS auction_fts_ai AFTER INSERT ON auction BEGIN
+                INSERT INTO auction_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS auction_fts_ad AFTER DELETE ON auction BEGIN
+                INSERT INTO auction_fts(auction_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS auction_fts_au AFTER UPDATE OF title, description ON auction BEGIN
+                INSERT INTO auction_fts(auction_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO auction_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+            END
+        """)
+        op.execute("INSERT INTO auction_fts(auction_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute("""
+            ALTER TABLE auction ADD COLUMN IF NOT EXISTS search_vector tsvector
+                GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+                ) STORED
+        """)
+        op.execute("CREATE INDEX IF NOT EXISTS ix_auction_search_vector ON auction USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS auction_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS auction_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS auction_fts_ai")
+        op.execute("DROP TABLE IF EXISTS auction_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_auction_search_vector")
+        op.execute("ALTER TABLE auction DROP COLUMN IF EXISTS search_vector")
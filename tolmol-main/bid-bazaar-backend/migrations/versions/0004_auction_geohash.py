@@ -0,0 +1,49 @@
+"""Geohash column for "near me" auction search
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16 10:30:00
+
+Adds auction.geohash, indexed together with is_active, and fills it for
+auctions that already have coordinates. The column is derived with
+geo.encode(); models.py keeps it up to date from then on.
+"""
+from alembic import op
+import sqlalchemy as sa
+import geo
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Plain ADD COLUMN: batch mode would rebuild the table and drop the FTS triggers
+    op.add_column('auction', sa.Column('geohash', sa.String(length=12), nullable=True))
+    op.create_index('ix_auction_active_geohash', 'auction', ['is_active', 'geohash'])
+
+    auction = sa.table(
+        'auction',
+        sa.column('id', sa.Integer),
+        sa.column('latitude', sa.Float),
+        sa.column('longitude', sa.Float),
+        sa.column('geohash', sa.String)
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(auction.c.id, auction.c.latitude, auction.c.longitude)
+        .where(auction.c.latitude.isnot(None), auction.c.longitude.isnot(None))
+    ).fetchall()
+    for row in rows:
+        bind.execute(
+            auction.update().where(auction.c.id == row.id)
+            .values(geohash=geo.encode(row.latitude, row.longitude))
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_auction_active_geohash', table_name='auction')
+    op.drop_column('auction', 'geohash')
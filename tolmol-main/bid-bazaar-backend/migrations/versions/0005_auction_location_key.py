@@ -0,0 +1,48 @@
+"""Canonical location key for the location filter
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16 11:00:00
+
+Adds auction.location_key, the normalized, alias-resolved form of an
+auction's location, city and state, with an index, and fills it for
+existing auctions. Computed by location_index.location_key(); models.py
+keeps it up to date from then on.
+"""
+from alembic import op
+import sqlalchemy as sa
+from location_index import location_key
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Plain ADD COLUMN: batch mode would rebuild the table and drop the FTS triggers
+    op.add_column('auction', sa.Column('location_key', sa.String(length=255), nullable=True))
+    op.create_index('ix_auction_location_key', 'auction', ['location_key'])
+
+    auction = sa.table(
+        'auction',
+        sa.column('id', sa.Integer),
+        sa.column('location', sa.String),
+        sa.column('city', sa.String),
+        sa.column('state', sa.String),
+        sa.column('location_key', sa.String)
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(auction.c.id, auction.c.location, auction.c.city, auction.c.state)).fetchall()
+    for row in rows:
+        bind.execute(
+            auction.update().where(auction.c.id == row.id)
+            .values(location_key=location_key(row.location, row.city, row.state))
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_auction_location_key', table_name='auction')
+    op.drop_column('auction', 'location_key')
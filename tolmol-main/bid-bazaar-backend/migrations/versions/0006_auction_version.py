@@ -0,0 +1,30 @@
+"""Auction version and last-modified time
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16 11:30:00
+
+Adds auction.version, bumped by every bid and state change, and
+auction.updated_at. Together they back the ETag and Last-Modified headers
+of the auction detail endpoint.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Plain ADD COLUMN: batch mode would rebuild the table and drop the FTS triggers
+    op.add_column('auction', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('auction', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('auction', 'updated_at')
+    op.drop_column('auction', 'version')
@@ -0,0 +1,26 @@
+"""Radius index for "near me" auction search
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 09:00:00
+
+Adds an index on (is_active, radius_km). The near-me filter finds auctions
+whose service radius is wider than the coarsest geohash cell with a range on
+it, instead of checking every active auction.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_auction_active_radius', 'auction', ['is_active', 'radius_km'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_auction_active_radius', table_name='auction')
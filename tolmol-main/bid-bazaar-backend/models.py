@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta
 from app import db
+from sqlalchemy import event
+import geo
+from location_index import location_key, location_index
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -26,17 +29,32 @@ class User(UserMixin, db.Model):
         return f'<User {self.username}>'
 
 class Auction(db.Model):
+    # Indexes mirror migrations/versions/0002_hot_path_indexes.py
+    __table_args__ = (
+        db.Index('ix_auction_active_created', 'is_active', 'created_at', 'id'),
+        db.Index('ix_auction_category_active_created', 'category', 'is_active', 'created_at', 'id'),
+        db.Index('ix_auction_active_end_time', 'is_active', 'end_time'),
+        db.Index('ix_auction_creator_created', 'creator_id', 'created_at'),
+        db.Index('ix_auction_active_geohash', 'is_active', 'geohash'),
+        db.Index('ix_auction_active_radius', 'is_active', 'radius_km'),
+        db.Index('ix_auction_location_key', 'location_key'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(100), nullable=False)
     location = db.Column(db.String(200), nullable=False)
+    location_key = db.Column(db.String(255), nullable=True)  # Canonical location, see location_index.py
     starting_bid = db.Column(db.Float, nullable=False)
     current_bid = db.Column(db.Float, nullable=True)
     end_time = db.Column(db.DateTime, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
     is_hot_deal = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped with every bid or state change; drives ETag / Last-Modified
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, nullable=True)
     
     # GPS Location Fields
     location_type = db.Column(db.String(20), default='city')  # 'local', 'city', 'state'
@@ -45,12 +63,16 @@ class Auction(db.Model):
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
     radius_km = db.Column(db.Integer, default=50)  # Service radius in kilometers
+    geohash = db.Column(db.String(12), nullable=True)  # Derived from latitude/longitude, see geo.py
     
-    # Foreign key
+    # Foreign keys
     creator_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    winning_bid_id = db.Column(db.Integer, db.ForeignKey('bid.id', use_alter=True, name='fk_auction_winning_bid_id'), nullable=True)  # Set when the auction closes
     
     # Relationships
-    bids = db.relationship('Bid', backref='auction', lazy=True, cascade='all, delete-orphan')
+    bids = db.relationship('Bid', backref='auction', lazy=True, cascade='all, delete-orphan',
+                           foreign_keys='Bid.auction_id')
+    winning_bid = db.relationship('Bid', foreign_keys=[winning_bid_id], post_update=True)
 
     @property
     def time_remaining(self):
@@ -65,10 +87,39 @@ class Auction(db.Model):
     def get_lowest_bid(self):
         return self.current_bid or self.starting_bid
 
+    def live_status(self):
+        # Body of the status endpoints, cached per auction under the same key
+        return {
+            'current_bid': self.get_lowest_bid(),
+            'time_remaining': self.time_remaining.total_seconds() if not self.is_expired else 0,
+            'is_active': self.is_active and not self.is_expired
+        }
+
     def __repr__(self):
         return f'<Auction {self.title}>'
 
+@event.listens_for(Auction, 'before_insert')
+@event.listens_for(Auction, 'before_update')
+def _sync_geohash(mapper, connection, target):
+    # Keep the indexed geohash in step with the coordinates
+    if target.latitude is None or target.longitude is None:
+        target.geohash = None
+    else:
+        target.geohash = geo.encode(target.latitude, target.longitude)
+
+@event.listens_for(Auction, 'before_insert')
+@event.listens_for(Auction, 'before_update')
+def _sync_location_key(mapper, connection, target):
+    target.location_key = location_key(target.location, target.city, target.state)
+    location_index.add(target.location_key)
+
 class Bid(db.Model):
+    __table_args__ = (
+        db.Index('ix_bid_auction_created', 'auction_id', 'created_at'),
+        db.Index('ix_bid_auction_amount', 'auction_id', 'amount'),
+        db.Index('ix_bid_bidder_created', 'bidder_id', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Float, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -77,5 +128,8 @@ class Bid(db.Model):
     auction_id = db.Column(db.Integer, db.ForeignKey('auction.id'), nullable=False)
     bidder_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
+    # Auction.version right after this bid was stored; set by the bid engine, not loaded
+    auction_version = None
+
     def __repr__(self):
         return f'<Bid {self.amount} for auction {self.auction_id}>'
@@ -0,0 +1,110 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import or_, and_
+from cache import MemoryBackend
+
+# Keyset (cursor) pagination helpers for listing endpoints.
+#
+# A cursor is the opaque, url-safe encoding of the (created_at, id) of the
+# last row on a page; the next page continues strictly after it, so every
+# page costs the same index range scan however deep the client goes.
+
+MAX_PER_PAGE = 100
+DEFAULT_PER_PAGE = 10
+COUNT_TTL_SECONDS = 60
+COUNT_MAX_ENTRIES = 1024
+
+
+def clamp_per_page(value, default=DEFAULT_PER_PAGE):
+    try:
+        per_page = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        per_page = default
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+
+def _encode(values):
+    raw = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded))
+
+
+def encode_cursor(created_at, row_id):
+    return _encode([created_at.isoformat(), row_id])
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, row_id = _decode(cursor)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def encode_distance_cursor(distance, row_id):
+    # Distance-sorted listings continue after (distance, id) instead
+    return _encode([distance, row_id])
+
+
+def decode_distance_cursor(cursor):
+    try:
+        distance, row_id = _decode(cursor)
+        return float(distance), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+
+def encode_rank_cursor(rank, row_id):
+    # Search results ordered by relevance continue after (rank, id)
+    return _encode([rank, row_id])
+
+
+def after_rank_cursor(query, rank, id_column, cursor):
+    # Best match (lowest rank) first, ties by id
+    try:
+        last_rank, row_id = _decode(cursor)
+        last_rank, row_id = float(last_rank), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    return query.filter(or_(rank > last_rank, and_(rank == last_rank, id_column > row_id)))
+
+
+def after_cursor(query, created_at_column, id_column, cursor):
+    # Rows are ordered newest first, so "after" means older
+    created_at, row_id = decode_cursor(cursor)
+    return query.filter(or_(
+        created_at_column < created_at,
+        and_(created_at_column == created_at, id_column < row_id)
+    ))
+
+
+def keyset_page(query, per_page):
+    rows = query.limit(per_page + 1).all()
+    return rows[:per_page], len(rows) > per_page
+
+
+class ApproximateCounter:
+    """Caches COUNT(*) results per filter set for a short time."""
+
+    def __init__(self, ttl=COUNT_TTL_SECONDS, max_entries=COUNT_MAX_ENTRIES):
+        self.ttl = ttl
+        # Keys come from user-supplied filters, so the LRU bounds how many are kept
+        self._counts = MemoryBackend(max_entries)
+
+    def count(self, key, query):
+        key = repr(key)
+        total = self._counts.get(key)
+        if total is not None:
+            return total
+
+        total = query.order_by(None).count()
+        self._counts.set(key, total, self.ttl)
+        return total
+
+
+approximate_counter = ApproximateCounter()
@@ -0,0 +1,99 @@
+import sys
+import logging
+from sqlalchemy import desc
+from app import app, db
+from models import Auction, Bid
+import geo
+
+# Checks that the listing and dashboard queries are served by the indexes
+# from migrations/versions/0002_hot_path_indexes.py, 0004_auction_geohash.py
+# and 0007_auction_active_radius.py.
+#
+#     python query_plans.py
+#
+# Prints each query plan and exits non-zero when a query does not use its
+# expected index. Supports SQLite (EXPLAIN QUERY PLAN) and PostgreSQL
+# (EXPLAIN), which may still choose a sequential scan on a tiny table.
+#
+# On SQLite, range queries are also checked step by step: every step that
+# reads the table must be a primary key lookup or carry one of the expected
+# bounds. An index used with is_active=? alone, or with one side of a range,
+# reads a share of the table that grows with the table.
+
+# query -> (table, bounds a step may carry); a step passes with all bounds of one entry
+RANGE_BOUNDS = {
+    'near me': ('auction', (('geohash>?', 'geohash<?'), ('radius_km>?',))),
+}
+
+
+def hot_queries():
+    yield 'listing', 'ix_auction_active_created', (
+        Auction.query.filter(Auction.is_active == True)
+        .order_by(desc(Auction.created_at), desc(Auction.id))
+        .limit(20)
+    )
+    yield 'listing by category', 'ix_auction_category_active_created', (
+        Auction.query.filter(Auction.is_active == True, Auction.category == 'cleaning')
+        .order_by(desc(Auction.created_at), desc(Auction.id))
+        .limit(20)
+    )
+    covering = geo.covering_ids(
+        Auction.id, Auction.geohash, Auction.radius_km, 12.9716, 77.5946, Auction.is_active == True
+    )
+    yield 'near me', 'ix_auction_active_geohash', (
+        Auction.query.filter(Auction.is_active == True).join(covering, Auction.id == covering.c.id)
+    )
+    yield 'dashboard auctions', 'ix_auction_creator_created', (
+        Auction.query.filter_by(creator_id=1).order_by(desc(Auction.created_at))
+    )
+    yield 'dashboard bids', 'ix_bid_bidder_created', (
+        db.session.query(Bid, Auction).join(Auction, Bid.auction_id == Auction.id)
+        .filter(Bid.bidder_id == 1).order_by(desc(Bid.created_at))
+    )
+    yield 'bid history', 'ix_bid_auction_created', (
+        Bid.query.filter_by(auction_id=1).order_by(desc(Bid.created_at))
+    )
+
+
+def unbounded_steps(plan, table, bounds):
+    return [
+        line for line in plan.splitlines()
+        if line.startswith((f'SCAN {table}', f'SEARCH {table} '))
+        and 'PRIMARY KEY' not in line
+        and not any(all(bound in line for bound in entry) for entry in bounds)
+    ]
+
+
+def explain(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    prefix = 'EXPLAIN QUERY PLAN ' if db.engine.dialect.name == 'sqlite' else 'EXPLAIN '
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    rows = db.session.connection().exec_driver_sql(prefix + str(compiled), params).fetchall()
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def check_query_plans():
+    failures = []
+    for name, index_name, query in hot_queries():
+        plan = explain(query)
+        used = index_name in plan
+        unbounded = []
+        if name in RANGE_BOUNDS and db.engine.dialect.name == 'sqlite':
+            unbounded = unbounded_steps(plan, *RANGE_BOUNDS[name])
+        logging.info(f"{name}: {'uses' if used else 'MISSING'} {index_name}\n{plan}")
+        for step in unbounded:
+            logging.info(f"{name}: unbounded step: {step}")
+        if not used or unbounded:
+            failures.append(name)
+    return failures
+
+
+if __name__ == '__main__':
+    with app.app_context():
+        failed = check_query_plans()
+    if failed:
+        print(f"Queries not using their index: {', '.join(failed)}")
+        sys.exit(1)
+    print("All hot-path queries use their indexes")
@@ -1,10 +1,18 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import render_template, redirect, url_for, flash, request, abort
 from flask_login import login_user, logout_user, login_required, current_user
-from app import app, db
+from app import app, db, response_cache
 from models import User, Auction, Bid
 from forms import RegistrationForm, LoginForm, AuctionForm, BidForm
-from datetime import datetime
-from sqlalchemy import or_, desc
+import search_index
+from location_index import location_index
+from bid_engine import bid_engine, BidRejected
+from auction_scheduler import auction_scheduler
+from map_clusters import map_tiles
+from gazetteer import gazetteer
+import events
+from single_flight import single_flight
+from sqlalchemy import desc
+from sqlalchemy.orm import joinedload
 
 @app.route('/')
 def index():
@@ -13,28 +21,24 @@ def index():
     category = request.args.get('category', '')
     location = request.args.get('location', '')
     
-    # Base query for active auctions
-    query = Auction.query.filter(
-        Auction.is_active == True,
-        Auction.end_time > datetime.utcnow()
-    )
+    # Base query for active auctions (the scheduler clears is_active at end_time)
+    query = Auction.query.filter(Auction.is_active == True)
     
     # Apply filters
     if search:
-        query = query.filter(
-            or_(
-                Auction.title.contains(search),
-                Auction.description.contains(search)
-            )
-        )
+        query = search_index.apply_search(query, search)
     
     if category:
         query = query.filter(Auction.category == category)
     
     if location:
-        query = query.filter(Auction.location.contains(location))
+        # Alias-aware, typo-tolerant match on the indexed canonical location
+        query = location_index.apply_filter(query, location)
     
-    # Order by creation time (newest first)
+    # Best matches first when searching, otherwise newest first; creators load in the same query
+    query = query.options(joinedload(Auction.creator))
+    if search:
+        query = search_index.order_by_rank(query, search)
     auctions = query.order_by(desc(Auction.created_at)).all()
     
     # Get categories for filter dropdown
@@ -107,7 +111,7 @@ def dashboard():
         my_auctions = Auction.query.filter_by(creator_id=current_user.id).order_by(desc(Auction.created_at)).all()
     
     # Get user's bids
-    my_bids = db.session.query(Bid, Auction).join(Auction).filter(
+    my_bids = db.session.query(Bid, Auction).join(Auction, Bid.auction_id == Auction.id).filter(
         Bid.bidder_id == current_user.id
     ).order_by(desc(Bid.created_at)).all()
     
@@ -126,6 +130,9 @@ def create_auction():
         radius_map = {'local': 10, 'city': 50, 'state': 500}
         radius = radius_map.get(form.location_type.data, 50)
         
+        # Coordinates come from the offline gazetteer, no network call
+        point = gazetteer.locate(form.city.data, form.state.data, form.location.data)
+        
         auction = Auction(
             title=form.title.data,
             description=form.description.data,
@@ -137,10 +144,16 @@ def create_auction():
             location_type=form.location_type.data,
             city=form.city.data,
             state=form.state.data,
+            latitude=point[0] if point else None,
+            longitude=point[1] if point else None,
             radius_km=radius
         )
         db.session.add(auction)
         db.session.commit()
+        auction_scheduler.schedule(auction.id, auction.end_time)
+        map_tiles.invalidate(auction.geohash)
+        response_cache.invalidate_listings()
+        events.auction_created(auction)
         flash('Auction created successfully with GPS location!', 'success')
         return redirect(url_for('auction_detail', auction_id=auction.id))
     
@@ -161,59 +174,31 @@ def auction_detail(auction_id):
 @app.route('/place_bid/<int:auction_id>', methods=['POST'])
 @login_required
 def place_bid(auction_id):
-    auction = Auction.query.get_or_404(auction_id)
-    
-    # Check if auction is still active
-    if auction.is_expired or not auction.is_active:
-        flash('This auction has ended.', 'warning')
-        return redirect(url_for('auction_detail', auction_id=auction_id))
-    
-    # Check if user is trying to bid on their own auction
-    if auction.creator_id == current_user.id:
-        flash('You cannot bid on your own auction.', 'warning')
-        return redirect(url_for('auction_detail', auction_id=auction_id))
-    
     form = BidForm()
     if form.validate_on_submit():
-        bid_amount = form.amount.data
-        current_lowest = auction.get_lowest_bid()
-        
-        # Validate bid amount (must be lower than current bid in reverse auction)
-        if bid_amount >= current_lowest:
-            flash(f'Your bid must be lower than the current bid of ₹{current_lowest:.2f}', 'warning')
+        # Validation and the current-lowest check happen inside the per-auction engine
+        try:
+            bid = bid_engine.place_bid(auction_id, current_user.id, form.amount.data)
+        except BidRejected as e:
+            if e.status_code == 404:
+                abort(404)
+            flash(f'{e.message}.', 'warning')
             return redirect(url_for('auction_detail', auction_id=auction_id))
         
-        # Create new bid
-        bid = Bid(
-            amount=bid_amount,
-            auction_id=auction_id,
-            bidder_id=current_user.id
-        )
-        
-        # Update auction's current bid
-        auction.current_bid = bid_amount
-        
-        db.session.add(bid)
-        db.session.commit()
-        
         flash('Bid placed successfully!', 'success')
         
-        # Emit socket event for real-time update
-        from app import socketio
-        socketio.emit('new_bid', {
-            'auction_id': auction_id,
-            'amount': bid_amount,
-            'bidder': 'Anonymous',
-            'timestamp': bid.created_at.strftime('%H:%M:%S')
-        }, room=f'auction_{auction_id}')
+        # Emit socket event for real-time update, through the message queue when one is configured
+        events.new_bid(auction_id, bid)
         
     return redirect(url_for('auction_detail', auction_id=auction_id))
 
 @app.route('/api/auction/<int:auction_id>/status')
+@single_flight
 def auction_status(auction_id):
+    cache_key = response_cache.key('auction_status', auction_id)
+    cached = response_cache.get_response('auction_status', cache_key)
+    if cached is not None:
+        return cached
+    
     auction = Auction.query.get_or_404(auction_id)
-    return jsonify({
-        'current_bid': auction.get_lowest_bid(),
-        'time_remaining': auction.time_remaining.total_seconds() if not auction.is_expired else 0,
-        'is_active': auction.is_active and not auction.is_expired
-    })
+    return response_cache.set_response(cache_key, auction.live_status(), app.config['CACHE_STATUS_TTL'])
@@ -0,0 +1,117 @@
+import re
+import logging
+from sqlalchemy import text, func, literal_column, or_
+from app import db
+from models import Auction
+
+# Full-text search over auction title and description.
+#
+# SQLite keeps an external-content FTS5 table (auction_fts) in step with the
+# auction table through triggers, so creates and title/description edits are
+# indexed incrementally and bid updates never touch it. PostgreSQL uses a
+# generated tsvector column with a GIN index (migration 0003). Every search
+# token is matched as a prefix, and title matches rank above description
+# matches. Other databases fall back to a substring filter and no ranking.
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS auction_fts USING fts5(
+        title, description,
+        content='auction', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS auction_fts_ai AFTER INSERT ON auction BEGIN
+        INSERT INTO auction_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS auction_fts_ad AFTER DELETE ON auction BEGIN
+        INSERT INTO auction_fts(auction_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS auction_fts_au AFTER UPDATE OF title, description ON auction BEGIN
+        INSERT INTO auction_fts(auction_fts, rowid, title, description) VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO auction_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE auction ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+        ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_auction_search_vector ON auction USING GIN (search_vector)",
+]
+
+
+def tokenize(term):
+    return TOKEN_RE.findall(term.lower())
+
+
+def install():
+    # Idempotent; used when tables come from db.create_all() rather than migrations
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as connection:
+        if dialect == 'sqlite':
+            exists = connection.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'auction_fts'")
+            ).first()
+            for statement in SQLITE_DDL:
+                connection.execute(text(statement))
+            if not exists:
+                connection.execute(text("INSERT INTO auction_fts(auction_fts) VALUES ('rebuild')"))
+                logging.info("Built auction full-text index")
+        elif dialect == 'postgresql':
+            for statement in POSTGRES_DDL:
+                connection.execute(text(statement))
+
+
+def _sqlite_match(tokens):
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _postgres_tsquery(tokens):
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def apply_search(query, term):
+    tokens = tokenize(term)
+    if not tokens:
+        return query
+
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        matches = text("SELECT rowid FROM auction_fts WHERE auction_fts MATCH :match").bindparams(
+            match=_sqlite_match(tokens)
+        ).columns(rowid=db.Integer)
+        return query.filter(Auction.id.in_(matches))
+    if dialect == 'postgresql':
+        tsquery = func.to_tsquery('simple', _postgres_tsquery(tokens))
+        return query.filter(literal_column('auction.search_vector').op('@@')(tsquery))
+
+    return query.filter(or_(Auction.title.contains(term), Auction.description.contains(term)))
+
+
+def ranked(query, term):
+    # The query with each match's relevance, and that relevance as a sort key, best match first;
+    # no key on dialects without a full-text index
+    tokens = tokenize(term)
+    if not tokens:
+        return query, None
+
+    dialect = db.engine.dialect.name
+    if dialect == 'sqlite':
+        ranks = text(
+            "SELECT rowid, bm25(auction_fts, 10.0, 1.0) AS rank FROM auction_fts WHERE auction_fts MATCH :match"
+        ).bindparams(match=_sqlite_match(tokens)).columns(rowid=db.Integer, rank=db.Float).subquery('ranked')
+        return query.join(ranks, ranks.c.rowid == Auction.id), ranks.c.rank
+    if dialect == 'postgresql':
+        tsquery = func.to_tsquery('simple', _postgres_tsquery(tokens))
+        return query, -func.ts_rank(literal_column('auction.search_vector'), tsquery)
+
+    return query, None
+
+
+def order_by_rank(query, term):
+    # Best match first; callers without a search term keep their own order
+    query, rank = ranked(query, term)
+    return query.order_by(rank) if rank is not None else query
@@ -0,0 +1,88 @@
+import threading
+from functools import wraps
+from flask import current_app, request
+from app import socketio
+
+# Request coalescing for hot reads.
+#
+# When many requests for the same resource miss the response cache together,
+# only the first (the leader) runs the view. The others wait for it and are
+# answered with a copy of its response, so a burst on a shared auction costs
+# one set of queries and one serialization. The flight ends when the leader
+# returns, so later requests go back to the response cache.
+#
+# Requests are grouped by path, query string and conditional headers, since
+# together those decide the response. A follower that waits longer than
+# FOLLOWER_TIMEOUT_SECONDS runs the view itself.
+
+FOLLOWER_TIMEOUT_SECONDS = 10
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = socketio.server.eio.create_event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, timeout=FOLLOWER_TIMEOUT_SECONDS):
+        self.timeout = timeout
+        self.shared = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Run fn once for all concurrent callers with the same key."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.shared += 1
+
+        if not leader:
+            if not flight.done.wait(self.timeout):
+                return fn()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+
+flights = SingleFlight()
+
+
+def single_flight(view):
+    """Coalesce concurrent identical requests to a view into one run."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = (
+            request.method,
+            request.path,
+            request.query_string,
+            request.headers.get('If-None-Match'),
+            request.headers.get('If-Modified-Since')
+        )
+
+        def run():
+            # Responses are per request, so the flight shares the parts and each caller builds its own
+            response = current_app.make_response(view(*args, **kwargs))
+            return response.status_code, response.get_data(), list(response.headers)
+
+        status, body, headers = flights.do(key, run)
+        return current_app.response_class(body, status=status, headers=headers)
+    return wrapper
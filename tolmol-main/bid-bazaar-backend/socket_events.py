@@ -1,6 +1,10 @@
-from flask_socketio import emit, join_room, leave_room
+from flask_socketio import emit, join_room, leave_room, rooms
 from flask_login import current_user
 from app import socketio
+from live_state import live_state
+from bid_engine import bid_engine, BidRejected
+import events
+import feed
 import logging
 
 @socketio.on('connect')
@@ -27,15 +31,82 @@ def handle_leave_auction(data):
     emit('status', {'msg': f'Left auction {auction_id} room'})
     logging.info(f'User left auction {auction_id} room')
 
+@socketio.on('subscribe_feed')
+def handle_subscribe_feed(data):
+    # A client may hold several filters; each one is a room (see feed.py)
+    try:
+        pairs = feed.parse_filter(data)
+    except ValueError as e:
+        emit('status', {'msg': str(e)})
+        return {'error': str(e)}
+    join_room(feed.filter_room(pairs))
+    emit('status', {'msg': 'Subscribed to auction feed'})
+    return {'subscribed': dict(pairs)}
+
+@socketio.on('unsubscribe_feed')
+def handle_unsubscribe_feed(data=None):
+    # With a filter, drops that one; without, every feed subscription
+    subscribed = [room for room in rooms() if feed.is_feed_room(room)]
+    if data:
+        try:
+            room = feed.filter_room(feed.parse_filter(data))
+        except ValueError as e:
+            return {'error': str(e)}
+        subscribed = [room] if room in subscribed else []
+    for room in subscribed:
+        leave_room(room)
+    emit('status', {'msg': 'Unsubscribed from auction feed'})
+    return {'unsubscribed': len(subscribed)}
+
 @socketio.on('request_auction_update')
 def handle_auction_update(data):
-    auction_id = data['auction_id']
-    from models import Auction
-    auction = Auction.query.get(auction_id)
+    # Entries are keyed by the integer id the bid engine records bids under
+    try:
+        auction_id = int(data['auction_id'])
+    except (KeyError, TypeError, ValueError):
+        return {'error': 'auction_id must be an integer', 'status': 400}
+    # Answered from memory; the database is only read when the entry is missing or old
+    state = live_state.get(auction_id)
+    
+    if state:
+        status = state.status()
+        status['auction_id'] = auction_id
+        if data.get('version') == state.version:
+            # The client already holds this state, only its countdown needs the time
+            emit('auction_update', {
+                'auction_id': auction_id,
+                'version': state.version,
+                'time_remaining': status['time_remaining'],
+                'unchanged': True
+            })
+            return
+        emit('auction_update', status)
+
+@socketio.on('place_bid')
+def handle_place_bid(data):
+    # Same checks as POST /api/auctions/<id>/bid, answered through the acknowledgement
+    if not current_user.is_authenticated:
+        return {'error': 'Login required', 'status': 401}
+    try:
+        auction_id = int(data['auction_id'])
+        bid_amount = float(data['amount'])
+    except (KeyError, TypeError, ValueError):
+        return {'error': 'auction_id and a numeric amount are required', 'status': 400}
+    
+    try:
+        bid = bid_engine.place_bid(auction_id, current_user.id, bid_amount)
+    except BidRejected as e:
+        return {'error': e.message, 'status': e.status_code}
+    except Exception as e:
+        logging.error(f"Socket place bid error: {str(e)}")
+        return {'error': 'Failed to place bid', 'status': 500}
     
-    if auction:
-        emit('auction_update', {
-            'current_bid': auction.get_lowest_bid(),
-            'time_remaining': auction.time_remaining.total_seconds() if not auction.is_expired else 0,
-            'is_active': auction.is_active and not auction.is_expired
-        })
+    events.new_bid(auction_id, bid)
+    return {
+        'message': 'Bid placed successfully',
+        'bid': {
+            'id': bid.id,
+            'amount': bid.amount,
+            'created_at': bid.created_at.isoformat()
+        }
+    }
